@@ -1,4 +1,11 @@
-"""ASGI config placeholder."""
+"""ASGI entry point, for the notification stream only.
+
+The REST API runs under WSGI (see Procfile). A separate ASGI process
+(``stream`` in the Procfile, ``sellefli-stream`` in render.yaml) serves
+``/api/notifications/stream/`` so one uvicorn worker can hold many idle
+connections. Run it with ``DB_CONN_MAX_AGE=0``: ASGI gives each request
+its own thread, so a persistent connection would never be reused.
+"""
 import os
 from django.core.asgi import get_asgi_application
 
@@ -0,0 +1,202 @@
+"""Item availability: overlap detection for bookings and free/busy lookups.
+
+A booking holds its item from ``start_date`` up to, but not including,
+``return_by_date`` (the item is back and can go out again that day).
+Only ACCEPTED and ACTIVE bookings hold an item; pending requests may
+overlap freely until the owner accepts one of them.
+
+Overlaps are rejected atomically in two layers:
+
+* ``reserving()`` locks the item row and checks for a conflicting booking
+  before the status change is saved, which serializes concurrent accepts
+  of the same item on every backend;
+* on PostgreSQL the ``bookings_no_overlap`` exclusion constraint (see
+  migration 0003) guarantees it for any writer, including raw SQL and
+  the Supabase clients. A violation surfaces as ``BookingConflict`` too.
+
+The constraint cannot be added while overlaps already exist; migration
+0003 then skips it. ``find_overlaps`` lists them and
+``add_overlap_constraint`` adds it afterwards (``python manage.py
+booking_overlaps``).
+"""
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, OuterRef
+
+from .models import Booking, BookingStatus
+
+BLOCKING_STATUSES = (BookingStatus.ACCEPTED, BookingStatus.ACTIVE)
+
+# SQLSTATE exclusion_violation
+EXCLUSION_VIOLATION = "23P01"
+
+OVERLAP_CONSTRAINT = "bookings_no_overlap"
+CREATE_OVERLAP_CONSTRAINT_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    f"""
+    ALTER TABLE bookings ADD CONSTRAINT {OVERLAP_CONSTRAINT}
+    EXCLUDE USING gist (
+        item_id WITH =,
+        daterange(start_date, return_by_date, '[)') WITH &&
+    )
+    WHERE (status IN ('accepted', 'active'))
+    """,
+]
+
+DEFAULT_WINDOW_DAYS = 90
+MAX_WINDOW_DAYS = 366
+
+
+class BookingConflict(Exception):
+    """The booking's dates overlap an accepted or active booking of the same item."""
+
+    def __init__(self, conflicting: Optional[Booking] = None):
+        self.conflicting = conflicting
+        super().__init__("This item is already booked for the selected dates.")
+
+
+def overlapping(item_id, start_date: date, end_date: date):
+    """Blocking bookings of ``item_id`` that intersect [start_date, end_date)."""
+    return Booking.objects.filter(
+        item_id=item_id,
+        status__in=BLOCKING_STATUSES,
+        start_date__lt=end_date,
+        return_by_date__gt=start_date,
+    )
+
+
+def find_overlaps() -> List[tuple]:
+    """Pairs of blocking bookings of the same item whose dates intersect."""
+    later = Booking.objects.filter(
+        item_id=OuterRef("item_id"),
+        status__in=BLOCKING_STATUSES,
+        pk__gt=OuterRef("pk"),
+        start_date__lt=OuterRef("return_by_date"),
+        return_by_date__gt=OuterRef("start_date"),
+    )
+    pairs = []
+    conflicted = (
+        Booking.objects.filter(status__in=BLOCKING_STATUSES)
+        .filter(Exists(later))
+        .order_by("item_id", "start_date", "pk")
+    )
+    for booking in conflicted:
+        others = (
+            overlapping(booking.item_id, booking.start_date, booking.return_by_date)
+            .filter(pk__gt=booking.pk)
+            .order_by("start_date", "pk")
+        )
+        pairs.extend((booking, other) for other in others)
+    return pairs
+
+
+def has_overlap_constraint() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_constraint WHERE conname = %s", [OVERLAP_CONSTRAINT])
+        return cursor.fetchone() is not None
+
+
+def add_overlap_constraint() -> bool:
+    """
+    Add ``bookings_no_overlap`` on PostgreSQL; False if it already exists.
+
+    Raises BookingConflict (for the first pair) while overlaps remain.
+    """
+    if connection.vendor != "postgresql" or has_overlap_constraint():
+        return False
+    with transaction.atomic():
+        # Stop new accepts from slipping in between the check and the ALTER
+        with connection.cursor() as cursor:
+            cursor.execute("LOCK TABLE bookings IN SHARE ROW EXCLUSIVE MODE")
+        overlaps = find_overlaps()
+        if overlaps:
+            raise BookingConflict(overlaps[0][0])
+        with connection.cursor() as cursor:
+            for statement in CREATE_OVERLAP_CONSTRAINT_SQL:
+                cursor.execute(statement)
+    return True
+
+
+def _is_exclusion_violation(exc: IntegrityError) -> bool:
+    cause = exc.__cause__
+    return EXCLUSION_VIOLATION in (
+        getattr(cause, "pgcode", None),
+        getattr(cause, "sqlstate", None),
+    )
+
+
+@contextmanager
+def reserving(booking: Booking):
+    """
+    Wrap the save that moves ``booking`` into a blocking status.
+
+    Runs in a transaction holding a row lock on the item, and raises
+    BookingConflict instead of entering the block when the dates are taken.
+    """
+    from items.models import Item
+
+    try:
+        with transaction.atomic():
+            Item.objects.select_for_update().filter(pk=booking.item_id).values_list("pk").first()
+            conflict = (
+                overlapping(booking.item_id, booking.start_date, booking.return_by_date)
+                .exclude(pk=booking.pk)
+                .order_by("start_date")
+                .first()
+            )
+            if conflict is not None:
+                raise BookingConflict(conflict)
+            yield
+    except IntegrityError as exc:
+        if _is_exclusion_violation(exc):
+            raise BookingConflict() from exc
+        raise
+
+
+def item_availability(item_id, date_from: date, date_to: date) -> Dict[str, List[Dict[str, date]]]:
+    """
+    Busy and free intervals for ``item_id`` within [date_from, date_to).
+
+    One range query over the partial (item_id, start_date) index; the
+    intervals are half-open, like the bookings themselves.
+    """
+    rows = (
+        overlapping(item_id, date_from, date_to)
+        .order_by("start_date")
+        .values_list("start_date", "return_by_date")
+    )
+
+    busy: List[Dict[str, date]] = []
+    for start, end in rows:
+        start, end = max(start, date_from), min(end, date_to)
+        if busy and start <= busy[-1]["end"]:
+            busy[-1]["end"] = max(busy[-1]["end"], end)
+        else:
+            busy.append({"start": start, "end": end})
+
+    free: List[Dict[str, date]] = []
+    cursor = date_from
+    for interval in busy:
+        if interval["start"] > cursor:
+            free.append({"start": cursor, "end": interval["start"]})
+        cursor = max(cursor, interval["end"])
+    if cursor < date_to:
+        free.append({"start": cursor, "end": date_to})
+
+    return {"busy": busy, "free": free}
+
+
+def availability_window(raw_from: Optional[str], raw_to: Optional[str], today: date):
+    """Parse ``from``/``to`` query params (YYYY-MM-DD); raises ValueError."""
+    date_from = date.fromisoformat(raw_from) if raw_from else today
+    date_to = date.fromisoformat(raw_to) if raw_to else date_from + timedelta(days=DEFAULT_WINDOW_DAYS)
+    if date_to <= date_from:
+        raise ValueError("to must be after from")
+    if (date_to - date_from).days > MAX_WINDOW_DAYS:
+        raise ValueError(f"The window may span at most {MAX_WINDOW_DAYS} days")
+    return date_from, date_to
@@ -0,0 +1,171 @@
+"""Booking reference codes (``SF-XXXXXX``) that never collide.
+
+A code is a sequence number pushed through a keyed Feistel permutation of
+the 30-bit space and written as six Crockford base32 characters (no I, L,
+O or U, so codes read back unambiguously). Distinct sequence numbers give
+distinct codes, and consecutive bookings still get unrelated-looking ones.
+
+Sequence numbers are handed out in blocks: each worker reserves
+``BOOKING_CODE_BLOCK_SIZE`` numbers with one query and then allocates
+locally, so accepting a booking costs no extra round trip for its code.
+
+* PostgreSQL reserves from the ``booking_code_seq`` sequence (migration
+  0004). Sequences are not transactional, so a rolled-back reservation is
+  never handed out again.
+* Other backends increment the ``BookingCodeCounter`` row under a lock.
+
+Each reserved block is checked once against existing codes, so codes
+issued by the earlier random generator are skipped rather than reused.
+
+``BOOKING_CODE_KEY`` selects the permutation. Changing it after codes
+have been issued can produce duplicates; set it once per deployment.
+"""
+import os
+import threading
+from functools import lru_cache
+from typing import List, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+PREFIX = "SF-"
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford base32
+CODE_LENGTH = 6
+CODE_BITS = 5 * CODE_LENGTH
+CODE_SPACE = 1 << CODE_BITS
+SEQUENCE_NAME = "booking_code_seq"
+COUNTER_NAME = "booking_code"
+
+_HALF_BITS = CODE_BITS // 2
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+
+
+@lru_cache(maxsize=8)
+def _round_keys(key: int) -> Tuple[int, ...]:
+    keys = []
+    for _ in range(_ROUNDS):
+        # splitmix-style step to spread a single integer key over the rounds
+        key = (key + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        mixed = (key ^ (key >> 30)) * 0xBF58476D1CE4E5B9 & 0xFFFFFFFFFFFFFFFF
+        keys.append(mixed & 0xFFFFFFFF)
+    return tuple(keys)
+
+
+def _f(half: int, round_key: int) -> int:
+    value = ((half ^ round_key) * 0x2C1B3C6D + (round_key >> 7)) & 0xFFFFFFFF
+    return (value ^ (value >> 15)) & _HALF_MASK
+
+
+def permute(number: int, key: int) -> int:
+    """Keyed bijection of [0, 2**30)."""
+    left, right = number >> _HALF_BITS, number & _HALF_MASK
+    for round_key in _round_keys(key):
+        left, right = right, left ^ _f(right, round_key)
+    return (left << _HALF_BITS) | right
+
+
+def unpermute(number: int, key: int) -> int:
+    """Inverse of ``permute``."""
+    left, right = number >> _HALF_BITS, number & _HALF_MASK
+    for round_key in reversed(_round_keys(key)):
+        left, right = right ^ _f(left, round_key), left
+    return (left << _HALF_BITS) | right
+
+
+def encode(number: int) -> str:
+    chars = []
+    for _ in range(CODE_LENGTH):
+        chars.append(ALPHABET[number & 31])
+        number >>= 5
+    return PREFIX + "".join(reversed(chars))
+
+
+def decode(code: str) -> int:
+    """Parse ``SF-XXXXXX`` back to its permuted number; raises ValueError."""
+    body = code.upper().removeprefix(PREFIX)
+    if len(body) != CODE_LENGTH:
+        raise ValueError(f"Invalid booking code: {code!r}")
+    number = 0
+    for char in body:
+        if char not in _DECODE:
+            raise ValueError(f"Invalid booking code: {code!r}")
+        number = (number << 5) | _DECODE[char]
+    return number
+
+
+def code_for(sequence: int, key: int) -> str:
+    if not 0 <= sequence < CODE_SPACE:
+        raise OverflowError("Booking code space exhausted")
+    return encode(permute(sequence, key))
+
+
+def reserve_sequence(count: int) -> List[int]:
+    """Reserve ``count`` unused sequence numbers in one query."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT nextval('{SEQUENCE_NAME}') FROM generate_series(1, %s)",
+                [count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    from .models import BookingCodeCounter
+
+    with transaction.atomic():
+        counter, _ = BookingCodeCounter.objects.select_for_update().get_or_create(name=COUNTER_NAME)
+        start = counter.next_value
+        BookingCodeCounter.objects.filter(pk=counter.pk).update(next_value=F("next_value") + count)
+    return list(range(start, start + count))
+
+
+class BookingCodeAllocator:
+    """Per-process, thread-safe source of unique booking codes."""
+
+    def __init__(self, block_size: int = None, key: int = None):
+        self._block_size = block_size
+        self._key = key
+        self._codes: List[str] = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def block_size(self) -> int:
+        return self._block_size or getattr(settings, "BOOKING_CODE_BLOCK_SIZE", 100)
+
+    @property
+    def key(self) -> int:
+        return self._key if self._key is not None else getattr(settings, "BOOKING_CODE_KEY", 0x5EF1)
+
+    def _reserve_block(self, count: int) -> List[str]:
+        from .models import Booking
+
+        codes = [code_for(sequence, self.key) for sequence in reserve_sequence(count)]
+        # Codes from the old random generator may occupy some of these
+        taken = set()
+        for i in range(0, len(codes), 1000):
+            taken.update(
+                Booking.objects.filter(booking_code__in=codes[i:i + 1000])
+                .values_list("booking_code", flat=True)
+            )
+        return [code for code in codes if code not in taken]
+
+    def allocate(self, count: int) -> List[str]:
+        """Return ``count`` unique codes, e.g. for bulk_create."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Never share a block with a forked parent
+                self._codes = []
+                self._pid = os.getpid()
+            while len(self._codes) < count:
+                self._codes.extend(self._reserve_block(max(self.block_size, count - len(self._codes))))
+            codes, self._codes = self._codes[:count], self._codes[count:]
+            return codes
+
+    def next_code(self) -> str:
+        return self.allocate(1)[0]
+
+
+booking_codes = BookingCodeAllocator()
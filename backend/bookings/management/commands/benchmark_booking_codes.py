@@ -0,0 +1,64 @@
+"""Benchmark booking code generation and check it never repeats.
+
+Usage:
+    python manage.py benchmark_booking_codes --count 5000000
+    python manage.py benchmark_booking_codes --db-blocks 50 --block-size 100
+
+--db-blocks times real block reservations; the sequence numbers it
+reserves are consumed for good (there are about a billion of them).
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.codes import CODE_SPACE, code_for, decode, reserve_sequence, unpermute
+
+
+class Command(BaseCommand):
+    help = "Generate millions of booking codes, timing them and verifying uniqueness."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=2_000_000, help="Codes to generate in memory.")
+        parser.add_argument("--start", type=int, default=0, help="First sequence number.")
+        parser.add_argument("--key", type=int, default=None, help="Permutation key (default: BOOKING_CODE_KEY).")
+        parser.add_argument("--db-blocks", type=int, default=0, help="Block reservations to time.")
+        parser.add_argument("--block-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        key = options["key"] if options["key"] is not None else settings.BOOKING_CODE_KEY
+        start, count = options["start"], options["count"]
+        if start + count > CODE_SPACE:
+            raise CommandError(f"Only {CODE_SPACE} codes exist")
+
+        began = time.perf_counter()
+        codes = [code_for(sequence, key) for sequence in range(start, start + count)]
+        elapsed = time.perf_counter() - began
+        self.stdout.write(
+            f"Generated {count} codes in {elapsed:.2f}s "
+            f"({count / elapsed:,.0f} codes/s, {elapsed / count * 1e6:.2f} us/code)"
+        )
+        self.stdout.write(f"Sample: {', '.join(codes[:5])}")
+
+        unique = len(set(codes))
+        if unique != count:
+            raise CommandError(f"{count - unique} duplicate codes")
+        step = max(1, count // 10_000)
+        for sequence in range(start, start + count, step):
+            if unpermute(decode(codes[sequence - start]), key) != sequence:
+                raise CommandError(f"Code for {sequence} does not decode back")
+        self.stdout.write(self.style.SUCCESS("All codes unique and reversible"))
+
+        if options["db_blocks"]:
+            block_size = options["block_size"] or settings.BOOKING_CODE_BLOCK_SIZE
+            timings = []
+            for _ in range(options["db_blocks"]):
+                began = time.perf_counter()
+                reserve_sequence(block_size)
+                timings.append((time.perf_counter() - began) * 1000)
+            self.stdout.write(
+                f"Reserved {options['db_blocks']} blocks of {block_size}: "
+                f"median {statistics.median(timings):.2f} ms/block, "
+                f"{statistics.median(timings) / block_size * 1000:.1f} us/code amortized"
+            )
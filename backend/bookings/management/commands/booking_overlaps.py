@@ -0,0 +1,61 @@
+"""List overlapping accepted/active bookings and add the overlap constraint.
+
+Usage:
+    python manage.py booking_overlaps
+    python manage.py booking_overlaps --add-constraint
+
+Migration 0003 skips the ``bookings_no_overlap`` exclusion constraint
+when accepted/active bookings of the same item already overlap, because
+PostgreSQL cannot add it NOT VALID. To finish the migration:
+
+1. run this command to list the conflicting pairs;
+2. have the owners decline or reschedule one booking of each pair
+   (or fix the dates in the admin);
+3. run it again with --add-constraint, which re-checks under a table
+   lock and adds the constraint once nothing overlaps.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.availability import (
+    BookingConflict,
+    OVERLAP_CONSTRAINT,
+    add_overlap_constraint,
+    find_overlaps,
+    has_overlap_constraint,
+)
+
+
+class Command(BaseCommand):
+    help = "Report overlapping accepted/active bookings and add the no-overlap constraint."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--add-constraint",
+            action="store_true",
+            help=f"Add {OVERLAP_CONSTRAINT} (PostgreSQL) if nothing overlaps.",
+        )
+
+    def handle(self, *args, **options):
+        overlaps = find_overlaps()
+        for booking, other in overlaps:
+            self.stdout.write(
+                f"item {booking.item_id}: "
+                f"{booking.id} ({booking.status}, {booking.start_date}..{booking.return_by_date}) overlaps "
+                f"{other.id} ({other.status}, {other.start_date}..{other.return_by_date})"
+            )
+        self.stdout.write(f"{len(overlaps)} overlapping pair(s)")
+
+        if not options["add_constraint"]:
+            if not overlaps and not has_overlap_constraint():
+                self.stdout.write(f"Run with --add-constraint to add {OVERLAP_CONSTRAINT}.")
+            return
+        if overlaps:
+            raise CommandError(f"Resolve the overlaps above before adding {OVERLAP_CONSTRAINT}")
+        try:
+            added = add_overlap_constraint()
+        except BookingConflict as exc:
+            raise CommandError(f"A new overlap appeared ({exc.conflicting.id}); run again") from exc
+        if added:
+            self.stdout.write(self.style.SUCCESS(f"Added {OVERLAP_CONSTRAINT}"))
+        else:
+            self.stdout.write(f"Nothing to add: {OVERLAP_CONSTRAINT} exists or the database is not PostgreSQL")
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["owner", "-created_at"], name="bookings_owner_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["borrower", "-created_at"], name="bookings_borrower_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:40
+
+import logging
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+# Accepted/active bookings of the same item may not share a day. Only
+# PostgreSQL can enforce this declaratively; elsewhere bookings.availability
+# serializes acceptance with a row lock on the item instead.
+#
+# Exclusion constraints cannot be added NOT VALID, so existing overlaps
+# would make ALTER TABLE fail. They are looked for first; if any exist the
+# constraint is skipped with a warning listing them, and is added by
+# `python manage.py booking_overlaps --add-constraint` once the owners
+# have resolved them (see that command).
+OVERLAPS_SQL = """
+    SELECT a.item_id, a.id, b.id
+    FROM bookings a
+    JOIN bookings b
+      ON b.item_id = a.item_id
+     AND b.id > a.id
+     AND b.start_date < a.return_by_date
+     AND a.start_date < b.return_by_date
+    WHERE a.status IN ('accepted', 'active')
+      AND b.status IN ('accepted', 'active')
+    ORDER BY a.item_id, a.id, b.id
+"""
+
+CREATE_CONSTRAINT_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    """
+    ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap
+    EXCLUDE USING gist (
+        item_id WITH =,
+        daterange(start_date, return_by_date, '[)') WITH &&
+    )
+    WHERE (status IN ('accepted', 'active'))
+    """,
+]
+
+DROP_CONSTRAINT_SQL = [
+    "ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_no_overlap",
+]
+
+
+def create_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPS_SQL)
+        overlaps = cursor.fetchall()
+    if overlaps:
+        logger.warning(
+            "Not adding bookings_no_overlap: %d pair(s) of accepted/active "
+            "bookings overlap (item, booking, booking): %s. Resolve them, then "
+            "run `python manage.py booking_overlaps --add-constraint`.",
+            len(overlaps), overlaps[:50],
+        )
+        return
+    for statement in CREATE_CONSTRAINT_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in DROP_CONSTRAINT_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0002_booking_inbox_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("status__in", ["accepted", "active"])),
+                fields=["item", "start_date"],
+                name="bookings_item_busy_idx",
+            ),
+        ),
+        migrations.RunPython(create_overlap_constraint, drop_overlap_constraint),
+    ]
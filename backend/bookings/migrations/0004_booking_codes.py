@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:05
+
+from django.db import migrations, models
+
+
+def create_code_sequence(apps, schema_editor):
+    # PostgreSQL hands out booking code numbers from a sequence; other
+    # backends use the BookingCodeCounter row instead.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE SEQUENCE IF NOT EXISTS booking_code_seq AS bigint")
+
+
+def drop_code_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP SEQUENCE IF EXISTS booking_code_seq")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0003_booking_availability"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingCodeCounter",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=32, primary_key=True, serialize=False),
+                ),
+                ("next_value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "booking_code_counter",
+            },
+        ),
+        migrations.RunPython(create_code_sequence, drop_code_sequence),
+    ]
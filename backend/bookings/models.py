@@ -1,8 +1,6 @@
 
 
 import uuid
-import random
-import string
 from django.db import models
 
 
@@ -26,6 +24,32 @@ class DepositStatus(models.TextChoices):
     KEPT = 'kept', 'Kept'                    # Deposit kept by owner (damage/loss)
 
 
+class BookingQuerySet(models.QuerySet):
+
+    def with_cover_image(self):
+        """Annotate each booking with its item's first image and thumbnail URLs (no N+1)."""
+        from django.db.models.functions import Coalesce
+        from item_images.models import ItemImage
+
+        cover = ItemImage.objects.filter(
+            item_id=models.OuterRef('item_id')
+        ).order_by('position')
+        return self.annotate(
+            cover_image_url=models.Subquery(cover.values('image_url')[:1]),
+            cover_thumbnail_url=models.Subquery(
+                cover.annotate(
+                    thumb=Coalesce('thumbnail_url', 'image_url')
+                ).values('thumb')[:1]
+            ),
+        )
+
+    def for_display(self):
+        """with_cover_image() plus the item and both users, minus the item's search_vector."""
+        return self.with_cover_image().select_related(
+            'item', 'owner', 'borrower'
+        ).defer('item__search_vector')
+
+
 # BOOKING MODEL
 
 class Booking(models.Model):
@@ -125,6 +149,8 @@ class Booking(models.Model):
         help_text="When this booking was last updated"
     )
     
+    objects = BookingQuerySet.as_manager()
+    
 
     
     class Meta:
@@ -132,6 +158,17 @@ class Booking(models.Model):
         ordering = ['-created_at']            # Newest bookings first by default
         verbose_name = 'Booking'
         verbose_name_plural = 'Bookings'
+        indexes = [
+            # Booking inboxes: incoming (owner) and my-requests (borrower), newest first
+            models.Index(fields=['owner', '-created_at'], name='bookings_owner_created_idx'),
+            models.Index(fields=['borrower', '-created_at'], name='bookings_borrower_created_idx'),
+            # Availability lookups: bookings that currently hold the item
+            models.Index(
+                fields=['item', 'start_date'],
+                name='bookings_item_busy_idx',
+                condition=models.Q(status__in=['accepted', 'active']),
+            ),
+        ]
 
     
     def __str__(self) -> str:
@@ -139,12 +176,16 @@ class Booking(models.Model):
     
 
     
+    @staticmethod
+    def make_booking_code() -> str:
+        from .codes import booking_codes
+        
+        # Unique by construction, from this worker's reserved block (codes.py)
+        return booking_codes.next_code()
+    
     def generate_booking_code(self) -> str:
      
-        # Generate 6 random uppercase letters and digits
-        chars = string.ascii_uppercase + string.digits
-        random_part = ''.join(random.choices(chars, k=6))
-        code = f"SF-{random_part}"
+        code = self.make_booking_code()
         
         # Save the code to this booking
         self.booking_code = code
@@ -152,31 +193,46 @@ class Booking(models.Model):
         
         return code
     
+    # State transitions: each is one conditional UPDATE (see transitions.py)
+    # and raises InvalidTransition / TransitionConflict / BookingConflict.
+    
+    def transition(self, transition) -> None:
+        from .transitions import apply_transition
+        
+        apply_transition(self, transition)
+    
     def accept(self) -> None:
+        from .transitions import ACCEPT
         
-        self.status = BookingStatus.ACCEPTED
-        self.generate_booking_code()
-        self.save(update_fields=['status', 'updated_at'])
+        # Also assigns the booking code, in the same UPDATE
+        self.transition(ACCEPT)
     
     def decline(self) -> None:
-   
-        self.status = BookingStatus.DECLINED
-        self.save(update_fields=['status', 'updated_at'])
+        from .transitions import DECLINE
+        
+        self.transition(DECLINE)
     
     def mark_deposit_received(self) -> None:
+        from .transitions import RECEIVE_DEPOSIT
         
-        self.deposit_status = DepositStatus.RECEIVED
-        self.status = BookingStatus.ACTIVE
-        self.save(update_fields=['deposit_status', 'status', 'updated_at'])
+        self.transition(RECEIVE_DEPOSIT)
     
     def mark_deposit_returned(self) -> None:
-      
-        self.deposit_status = DepositStatus.RETURNED
-        self.status = BookingStatus.COMPLETED
-        self.save(update_fields=['deposit_status', 'status', 'updated_at'])
+        from .transitions import RETURN_DEPOSIT
+        
+        self.transition(RETURN_DEPOSIT)
     
     def keep_deposit(self) -> None:
-       
-        self.deposit_status = DepositStatus.KEPT
-        self.status = BookingStatus.CLOSED
-        self.save(update_fields=['deposit_status', 'status', 'updated_at'])
+        from .transitions import KEEP_DEPOSIT
+        
+        self.transition(KEEP_DEPOSIT)
+
+
+class BookingCodeCounter(models.Model):
+    """Next booking code sequence number on databases without sequences (see codes.py)."""
+    
+    name = models.CharField(max_length=32, primary_key=True)
+    next_value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'booking_code_counter'
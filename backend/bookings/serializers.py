@@ -1,6 +1,7 @@
 
 
 from rest_framework import serializers
+from .availability import overlapping
 from .models import Booking, BookingStatus, DepositStatus
 
 # Import related models for nested serialization
@@ -10,6 +11,28 @@ from items.models import Item
 
 
 
+def cover_image_url(booking: Booking) -> str | None:
+    """
+    First image URL for the booking's item.
+    
+    Uses the `cover_image_url` annotation from
+    Booking.objects.with_cover_image() when present, and only falls back
+    to a query for bookings loaded without it (e.g. right after create).
+    """
+    if hasattr(booking, 'cover_image_url'):
+        return booking.cover_image_url
+    first_image = booking.item.images.order_by('position').first()
+    return first_image.image_url if first_image else None
+
+
+def cover_thumbnail_url(booking: Booking) -> str | None:
+    """Thumbnail variant of the cover image, for list rows."""
+    if hasattr(booking, 'cover_thumbnail_url'):
+        return booking.cover_thumbnail_url
+    first_image = booking.item.images.order_by('position').first()
+    return (first_image.thumbnail_url or first_image.image_url) if first_image else None
+
+
 class UserBriefSerializer(serializers.ModelSerializer):
    
     
@@ -56,6 +79,7 @@ class BookingListSerializer(serializers.ModelSerializer):
     
    
     image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Booking
@@ -87,6 +111,7 @@ class BookingListSerializer(serializers.ModelSerializer):
             
             # Computed fields
             'image_url',
+            'thumbnail_url',
             
             # Timestamps
             'created_at',
@@ -94,12 +119,10 @@ class BookingListSerializer(serializers.ModelSerializer):
         ]
     
     def get_image_url(self, obj: Booking) -> str | None:
-    
-        first_image = obj.item.images.order_by('position').first()
-        
-        if first_image:
-            return first_image.image_url
-        return None
+        return cover_image_url(obj)
+
+    def get_thumbnail_url(self, obj: Booking) -> str | None:
+        return cover_thumbnail_url(obj)
 
 
 class BookingDetailSerializer(serializers.ModelSerializer):
@@ -148,8 +171,7 @@ class BookingDetailSerializer(serializers.ModelSerializer):
     
     def get_image_url(self, obj: Booking) -> str | None:
         """Get the first image URL for the item."""
-        first_image = obj.item.images.order_by('position').first()
-        return first_image.image_url if first_image else None
+        return cover_image_url(obj)
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
@@ -222,6 +244,13 @@ class BookingCreateSerializer(serializers.ModelSerializer):
                 'item_id': 'This item is not currently available for booking.'
             })
         
+        # Reject dates already held by an accepted/active booking. Pending
+        # requests may overlap; acceptance re-checks under a lock.
+        if overlapping(attrs['item'].pk, attrs['start_date'], attrs['return_by_date']).exists():
+            raise serializers.ValidationError({
+                'item_id': 'This item is already booked for the selected dates.'
+            })
+        
         return attrs
 
 
@@ -1,8 +1,12 @@
 """Signals for bookings app."""
 from django.db.models.signals import pre_delete
-from django.dispatch import receiver
+from django.dispatch import Signal, receiver
 from .models import Booking, BookingStatus
 
+# Sent once per applied state transition (see transitions.py), inside its
+# transaction. Arguments: booking, transition (name), previous_status.
+booking_transitioned = Signal()
+
 
 @receiver(pre_delete, sender=Booking)
 def booking_deleted_handler(sender, instance, **kwargs):
@@ -0,0 +1,131 @@
+"""
+Tests for booking overlap detection and the item availability endpoint.
+Run with: python manage.py test bookings
+"""
+
+import uuid
+from datetime import date, timedelta
+
+from rest_framework.test import APIClient, APITestCase
+
+from bookings.availability import find_overlaps
+from bookings.models import Booking, BookingStatus
+from items.models import Item
+from users.models import User
+
+DAY = date(2030, 1, 1)
+
+
+def day(offset):
+    return DAY + timedelta(days=offset)
+
+
+class BookingAvailabilityTests(APITestCase):
+    """Accepted/active bookings of an item may not overlap."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='availowner',
+            email='availowner@test.com',
+            phone='4000000001'
+        )
+        self.borrower = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='availborrower',
+            email='availborrower@test.com',
+            phone='4000000002'
+        )
+        self.item = Item.objects.create(
+            owner=self.owner,
+            title='Kayak',
+            category='Outdoors',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+
+    def create_booking(self, start, end, booking_status=BookingStatus.PENDING):
+        return Booking.objects.create(
+            item=self.item,
+            owner=self.owner,
+            borrower=self.borrower,
+            status=booking_status,
+            start_date=day(start),
+            return_by_date=day(end),
+        )
+
+    def accept(self, booking):
+        return self.client.patch(
+            f'/api/bookings/{booking.id}/status/', {'status': 'accepted'}, format='json'
+        )
+
+    def test_overlapping_accept_is_rejected(self):
+        first = self.create_booking(0, 5)
+        second = self.create_booking(3, 8)
+
+        self.assertEqual(self.accept(first).status_code, 200)
+        response = self.accept(second)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflicting_booking_id'], str(first.id))
+        second.refresh_from_db()
+        self.assertEqual(second.status, BookingStatus.PENDING)
+        self.assertIsNone(second.booking_code)
+
+    def test_back_to_back_bookings_are_allowed(self):
+        self.create_booking(0, 5, BookingStatus.ACTIVE)
+        following = self.create_booking(5, 7)
+        self.assertEqual(self.accept(following).status_code, 200)
+
+    def test_create_rejects_dates_held_by_accepted_booking(self):
+        self.create_booking(0, 5, BookingStatus.ACCEPTED)
+        response = self.client.post('/api/bookings/', {
+            'item_id': str(self.item.id),
+            'owner_id': str(self.owner.id),
+            'borrower_id': str(self.borrower.id),
+            'start_date': day(4).isoformat(),
+            'return_by_date': day(6).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('item_id', response.data)
+
+    def test_availability_endpoint_returns_free_and_busy(self):
+        self.create_booking(2, 4, BookingStatus.ACCEPTED)
+        self.create_booking(4, 6, BookingStatus.ACTIVE)
+        self.create_booking(8, 9, BookingStatus.PENDING)
+        self.create_booking(12, 20, BookingStatus.ACCEPTED)
+
+        response = self.client.get(
+            f'/api/items/{self.item.id}/availability/?from={day(0)}&to={day(15)}'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['busy'], [
+            {'start': day(2), 'end': day(6)},
+            {'start': day(12), 'end': day(15)},
+        ])
+        self.assertEqual(response.data['free'], [
+            {'start': day(0), 'end': day(2)},
+            {'start': day(6), 'end': day(12)},
+        ])
+
+    def test_availability_rejects_bad_window(self):
+        url = f'/api/items/{self.item.id}/availability/'
+        self.assertEqual(self.client.get(f'{url}?from={day(5)}&to={day(1)}').status_code, 400)
+        self.assertEqual(self.client.get(f'{url}?from=soon').status_code, 400)
+        self.assertEqual(self.client.get('/api/items/not-a-uuid/availability/').status_code, 404)
+
+    def test_find_overlaps_lists_conflicting_pairs(self):
+        first = self.create_booking(0, 5, BookingStatus.ACCEPTED)
+        second = self.create_booking(3, 8, BookingStatus.ACTIVE)
+        self.create_booking(8, 9, BookingStatus.ACCEPTED)
+        self.create_booking(1, 2, BookingStatus.PENDING)
+
+        pairs = find_overlaps()
+
+        self.assertEqual(
+            [(a.pk, b.pk) for a, b in pairs],
+            [tuple(sorted((first.pk, second.pk)))],
+        )
@@ -0,0 +1,58 @@
+"""
+Tests for the booking code allocator.
+Run with: python manage.py test bookings
+"""
+
+import re
+import uuid
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from bookings.codes import BookingCodeAllocator, code_for, decode, unpermute
+from bookings.models import Booking, BookingCodeCounter
+from items.models import Item
+from users.models import User
+
+CODE_RE = re.compile(r'^SF-[0-9A-HJKMNP-TV-Z]{6}$')
+
+
+class BookingCodeTests(TestCase):
+
+    def test_codes_are_unique_readable_and_reversible(self):
+        codes = [code_for(n, 1234) for n in range(50_000)]
+
+        self.assertEqual(len(set(codes)), len(codes))
+        self.assertTrue(all(CODE_RE.match(code) for code in codes))
+        self.assertEqual(unpermute(decode(codes[4321]), 1234), 4321)
+        self.assertEqual(decode(codes[7].lower()), decode(codes[7]))
+
+    def test_bulk_allocation_is_unique_across_blocks(self):
+        allocator = BookingCodeAllocator(block_size=10)
+        codes = allocator.allocate(25) + [allocator.next_code() for _ in range(10)]
+        self.assertEqual(len(set(codes)), 35)
+
+    def test_skips_codes_already_in_use(self):
+        owner = User.objects.create_user(
+            id=uuid.uuid4(), username='codeowner', email='codeowner@test.com', phone='6000000001'
+        )
+        borrower = User.objects.create_user(
+            id=uuid.uuid4(), username='codeborrower', email='codeborrower@test.com', phone='6000000002'
+        )
+        item = Item.objects.create(
+            owner=owner, title='Saw', category='Tools', description='Test',
+            estimated_value=100, deposit_amount=10,
+        )
+        # A legacy random code that happens to equal the next generated one
+        upcoming = BookingCodeAllocator(block_size=5, key=99).allocate(1)[0]
+        Booking.objects.create(
+            item=item, owner=owner, borrower=borrower, booking_code=upcoming,
+            start_date=date.today(), return_by_date=date.today() + timedelta(days=1),
+        )
+        # Rewind the counter so the next block starts at that code again
+        BookingCodeCounter.objects.all().delete()
+
+        codes = BookingCodeAllocator(block_size=5, key=99).allocate(5)
+
+        self.assertNotIn(upcoming, codes)
+        self.assertEqual(len(set(codes)), 5)
@@ -0,0 +1,97 @@
+"""
+Tests for the booking inbox filters and cursor pagination.
+Run with: python manage.py test bookings
+"""
+
+import uuid
+from datetime import date, timedelta
+
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+from bookings.models import Booking, BookingStatus
+from items.models import Item
+from users.models import User
+
+
+class BookingInboxTests(APITestCase):
+    """incoming/my-requests filter by status and updated_since and page by cursor."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='inboxowner',
+            email='inboxowner@test.com',
+            phone='3000000001'
+        )
+        self.borrower = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='inboxborrower',
+            email='inboxborrower@test.com',
+            phone='3000000002'
+        )
+        self.item = Item.objects.create(
+            owner=self.owner,
+            title='Drill',
+            category='Tools',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+        self.bookings = [
+            self.create_booking(BookingStatus.PENDING if i % 2 else BookingStatus.ACCEPTED)
+            for i in range(5)
+        ]
+
+    def create_booking(self, booking_status):
+        return Booking.objects.create(
+            item=self.item,
+            owner=self.owner,
+            borrower=self.borrower,
+            status=booking_status,
+            start_date=date.today(),
+            return_by_date=date.today() + timedelta(days=3),
+        )
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def test_unpaginated_list_by_default(self):
+        response = self.get(f'/api/bookings/incoming/?owner_id={self.owner.id}')
+        self.assertEqual(len(response.data), 5)
+
+    def test_status_filter(self):
+        response = self.get(f'/api/bookings/incoming/?owner_id={self.owner.id}&status=pending')
+        self.assertEqual(len(response.data), 2)
+        self.assertTrue(all(b['status'] == 'pending' for b in response.data))
+
+        response = self.client.get(f'/api/bookings/incoming/?owner_id={self.owner.id}&status=bogus')
+        self.assertEqual(response.status_code, 400)
+
+    def test_updated_since_filter(self):
+        cutoff = timezone.now()
+        Booking.objects.filter(pk=self.bookings[0].pk).update(updated_at=cutoff + timedelta(minutes=1))
+        Booking.objects.exclude(pk=self.bookings[0].pk).update(updated_at=cutoff - timedelta(minutes=1))
+
+        since = cutoff.isoformat().replace('+', '%2B')
+        response = self.get(f'/api/bookings/my-requests/?borrower_id={self.borrower.id}&updated_since={since}')
+        self.assertEqual([b['id'] for b in response.data], [str(self.bookings[0].id)])
+
+        response = self.client.get(f'/api/bookings/my-requests/?borrower_id={self.borrower.id}&updated_since=soon')
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pages_cover_every_booking_once(self):
+        Booking.objects.update(created_at=self.bookings[0].created_at)
+
+        url = f'/api/bookings/incoming/?owner_id={self.owner.id}&pagination=cursor&page_size=2'
+        seen = []
+        while url:
+            response = self.get(url)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [b['id'] for b in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(sorted(seen), sorted(str(b.id) for b in self.bookings))
@@ -0,0 +1,84 @@
+"""
+Query-count regression tests for the booking list endpoints.
+Run with: python manage.py test bookings
+"""
+
+import uuid
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+
+from bookings.models import Booking
+from item_images.models import ItemImage
+from items.models import Item
+from users.models import User
+
+
+class BookingListQueryCountTests(APITestCase):
+    """Booking lists must not run one image query per booking."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='owner',
+            email='owner@test.com',
+            phone='1000000001'
+        )
+        self.borrower = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='borrower',
+            email='borrower@test.com',
+            phone='1000000002'
+        )
+
+    def create_bookings(self, count):
+        for i in range(count):
+            item = Item.objects.create(
+                owner=self.owner,
+                title=f'Item {i}',
+                category='Tools',
+                description='Test',
+                estimated_value=100,
+                deposit_amount=10,
+            )
+            ItemImage.objects.create(item=item, image_url=f'https://example.com/{i}-2.jpg', position=2)
+            ItemImage.objects.create(item=item, image_url=f'https://example.com/{i}-1.jpg', position=1)
+            Booking.objects.create(
+                item=item,
+                owner=self.owner,
+                borrower=self.borrower,
+                start_date=date.today(),
+                return_by_date=date.today() + timedelta(days=3),
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.captured = ctx.captured_queries
+        return len(ctx.captured_queries), response.json()
+
+    def assert_constant_queries(self, url):
+        self.create_bookings(1)
+        baseline, _ = self.count_queries(url)
+
+        self.create_bookings(4)
+        queries, data = self.count_queries(url)
+
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(data), 5)
+        self.assertFalse(any('search_vector' in q['sql'] for q in self.captured))
+        for booking in data:
+            self.assertTrue(booking['image_url'].endswith('-1.jpg'))
+
+    def test_incoming_query_count_is_constant(self):
+        self.assert_constant_queries(f'/api/bookings/incoming/?owner_id={self.owner.id}')
+
+    def test_my_requests_query_count_is_constant(self):
+        self.assert_constant_queries(f'/api/bookings/my-requests/?borrower_id={self.borrower.id}')
+
+    def test_user_transactions_query_count_is_constant(self):
+        self.assert_constant_queries(f'/api/bookings/user-transactions/?user_id={self.owner.id}')
@@ -0,0 +1,112 @@
+"""
+Tests for booking state transitions.
+Run with: python manage.py test bookings
+"""
+
+import uuid
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+
+from bookings.models import Booking, BookingStatus, DepositStatus
+from bookings.signals import booking_transitioned
+from bookings.transitions import DECLINE, TransitionConflict, apply_transition
+from items.models import Item
+from notifications.models import Notification, NotificationType
+from users.models import User
+
+
+class BookingTransitionTests(APITestCase):
+    """Each transition is one conditional UPDATE and one event."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='fsmowner',
+            email='fsmowner@test.com',
+            phone='5000000001'
+        )
+        self.borrower = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='fsmborrower',
+            email='fsmborrower@test.com',
+            phone='5000000002'
+        )
+        item = Item.objects.create(
+            owner=self.owner,
+            title='Tent',
+            category='Outdoors',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+        self.booking = Booking.objects.create(
+            item=item,
+            owner=self.owner,
+            borrower=self.borrower,
+            start_date=date.today(),
+            return_by_date=date.today() + timedelta(days=3),
+        )
+        self.events = []
+        booking_transitioned.connect(self.record_event)
+        self.addCleanup(booking_transitioned.disconnect, self.record_event)
+
+    def record_event(self, sender, booking, transition, **kwargs):
+        self.events.append(transition)
+
+    def patch(self, path, data):
+        return self.client.patch(f'/api/bookings/{self.booking.id}/{path}/', data, format='json')
+
+    def test_accept_is_one_update_and_one_event(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.patch('status', {'status': 'accepted'})
+
+        self.assertEqual(response.status_code, 200)
+        booking_updates = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('UPDATE "bookings"')
+        ]
+        self.assertEqual(len(booking_updates), 1)
+        self.assertEqual(self.events, ['accept'])
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.ACCEPTED)
+        self.assertTrue(self.booking.booking_code.startswith('SF-'))
+        self.assertEqual(response.data['booking']['booking_code'], self.booking.booking_code)
+        self.assertEqual(
+            Notification.objects.filter(notification_type=NotificationType.BOOKING_ACCEPTED).count(), 1
+        )
+
+    def test_stale_state_raises_conflict(self):
+        stale = Booking.objects.get(pk=self.booking.pk)
+        self.assertEqual(self.patch('status', {'status': 'accepted'}).status_code, 200)
+
+        with self.assertRaises(TransitionConflict):
+            apply_transition(stale, DECLINE)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.ACCEPTED)
+        self.assertEqual(self.events, ['accept'])
+
+    def test_invalid_transition_is_rejected(self):
+        response = self.patch('status', {'status': 'completed'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.events, [])
+
+    def test_client_deposit_flow_repeats_status_as_noop(self):
+        self.patch('status', {'status': 'accepted'})
+
+        # The app sets the deposit, then the status it already implies
+        self.assertEqual(self.patch('deposit', {'deposit_status': 'received'}).status_code, 200)
+        self.assertEqual(self.patch('status', {'status': 'active'}).status_code, 200)
+        self.assertEqual(self.patch('deposit', {'deposit_status': 'returned'}).status_code, 200)
+        self.assertEqual(self.patch('status', {'status': 'completed'}).status_code, 200)
+
+        self.booking.refresh_from_db()
+        self.assertEqual(
+            (self.booking.status, self.booking.deposit_status),
+            (BookingStatus.COMPLETED, DepositStatus.RETURNED),
+        )
+        self.assertEqual(self.events, ['accept', 'receive_deposit', 'return_deposit'])
@@ -0,0 +1,173 @@
+"""Booking state machine.
+
+Every status/deposit change goes through ``apply_transition``, which
+checks the transition is allowed from the booking's current state and
+writes it with one conditional UPDATE::
+
+    UPDATE bookings SET status = ..., ... WHERE id = ... AND status = <read>
+
+If another request changed the booking in between, no row matches and
+``TransitionConflict`` is raised (the API answers 409). A successful
+transition sends exactly one ``booking_transitioned`` signal, inside the
+same transaction, so side effects such as notifications commit with it.
+
+The happy path is pending -> accepted (accept) -> active (deposit
+received) -> completed (deposit returned) or closed (deposit kept);
+requests can be declined while pending or accepted.
+"""
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .availability import BLOCKING_STATUSES, reserving
+from .models import Booking, BookingStatus, DepositStatus
+from .signals import booking_transitioned
+
+
+class InvalidTransition(Exception):
+    """The transition is not allowed from the booking's current state."""
+
+
+class TransitionConflict(Exception):
+    """The booking changed concurrently; the transition was not applied."""
+
+    def __init__(self):
+        super().__init__("Booking was modified by another request. Reload and try again.")
+
+
+@dataclass(frozen=True)
+class Transition:
+    name: str
+    sources: Tuple[str, ...]
+    target: Optional[str] = None
+    # Required current deposit status(es), and the deposit status to set
+    deposit_sources: Optional[Tuple[str, ...]] = None
+    deposit_target: Optional[str] = None
+
+
+ACCEPT = Transition(
+    "accept",
+    sources=(BookingStatus.PENDING,),
+    target=BookingStatus.ACCEPTED,
+)
+DECLINE = Transition(
+    "decline",
+    sources=(BookingStatus.PENDING, BookingStatus.ACCEPTED),
+    target=BookingStatus.DECLINED,
+)
+ACTIVATE = Transition(
+    "activate",
+    sources=(BookingStatus.ACCEPTED,),
+    target=BookingStatus.ACTIVE,
+)
+COMPLETE = Transition(
+    "complete",
+    sources=(BookingStatus.ACTIVE,),
+    target=BookingStatus.COMPLETED,
+)
+CLOSE = Transition(
+    "close",
+    sources=(BookingStatus.ACTIVE, BookingStatus.COMPLETED),
+    target=BookingStatus.CLOSED,
+)
+RECEIVE_DEPOSIT = Transition(
+    "receive_deposit",
+    sources=(BookingStatus.ACCEPTED,),
+    target=BookingStatus.ACTIVE,
+    deposit_sources=(DepositStatus.NONE,),
+    deposit_target=DepositStatus.RECEIVED,
+)
+RETURN_DEPOSIT = Transition(
+    "return_deposit",
+    sources=(BookingStatus.ACTIVE, BookingStatus.COMPLETED),
+    target=BookingStatus.COMPLETED,
+    deposit_sources=(DepositStatus.NONE, DepositStatus.RECEIVED),
+    deposit_target=DepositStatus.RETURNED,
+)
+KEEP_DEPOSIT = Transition(
+    "keep_deposit",
+    sources=(BookingStatus.ACTIVE, BookingStatus.COMPLETED),
+    target=BookingStatus.CLOSED,
+    deposit_sources=(DepositStatus.NONE, DepositStatus.RECEIVED),
+    deposit_target=DepositStatus.KEPT,
+)
+RESET_DEPOSIT = Transition(
+    "reset_deposit",
+    sources=(BookingStatus.PENDING, BookingStatus.ACCEPTED),
+    deposit_sources=(DepositStatus.RECEIVED,),
+    deposit_target=DepositStatus.NONE,
+)
+
+# PATCH /status/ and PATCH /deposit/ targets
+BY_STATUS: Dict[str, Transition] = {
+    BookingStatus.ACCEPTED: ACCEPT,
+    BookingStatus.DECLINED: DECLINE,
+    BookingStatus.ACTIVE: ACTIVATE,
+    BookingStatus.COMPLETED: COMPLETE,
+    BookingStatus.CLOSED: CLOSE,
+}
+BY_DEPOSIT_STATUS: Dict[str, Transition] = {
+    DepositStatus.RECEIVED: RECEIVE_DEPOSIT,
+    DepositStatus.RETURNED: RETURN_DEPOSIT,
+    DepositStatus.KEPT: KEEP_DEPOSIT,
+    DepositStatus.NONE: RESET_DEPOSIT,
+}
+
+
+def is_noop(booking: Booking, transition: Transition) -> bool:
+    """The booking is already in the transition's target state (client retry)."""
+    status_done = transition.target is None or booking.status == transition.target
+    deposit_done = transition.deposit_target is None or booking.deposit_status == transition.deposit_target
+    return status_done and deposit_done
+
+
+def apply_transition(booking: Booking, transition: Transition) -> Booking:
+    """
+    Apply ``transition`` to ``booking`` with one conditional UPDATE.
+
+    Raises InvalidTransition when it is not allowed from the state that
+    was read, TransitionConflict when that state changed before the
+    write, and BookingConflict (see availability) when accepting or
+    activating would overlap another booking of the item.
+    """
+    if booking.status not in transition.sources or (
+        transition.deposit_sources is not None
+        and booking.deposit_status not in transition.deposit_sources
+    ):
+        raise InvalidTransition(
+            f"Cannot {transition.name.replace('_', ' ')} a booking that is "
+            f"{booking.status} (deposit {booking.deposit_status})."
+        )
+
+    changes = {"updated_at": timezone.now()}
+    if transition.target is not None:
+        changes["status"] = transition.target
+    if transition.deposit_target is not None:
+        changes["deposit_status"] = transition.deposit_target
+    if transition is ACCEPT and not booking.booking_code:
+        changes["booking_code"] = booking.make_booking_code()
+
+    previous_status = booking.status
+    holds_item = transition.target in BLOCKING_STATUSES and previous_status not in BLOCKING_STATUSES
+    with transaction.atomic():
+        with reserving(booking) if holds_item else nullcontext():
+            updated = Booking.objects.filter(
+                pk=booking.pk,
+                status=booking.status,
+                deposit_status=booking.deposit_status,
+            ).update(**changes)
+        if not updated:
+            raise TransitionConflict()
+
+        for field, value in changes.items():
+            setattr(booking, field, value)
+        booking_transitioned.send(
+            sender=Booking,
+            booking=booking,
+            transition=transition.name,
+            previous_status=previous_status,
+        )
+    return booking
@@ -5,6 +5,8 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny 
 from django.shortcuts import get_object_or_404
 
+from pagination import KeysetPagination, parse_since
+from .availability import BookingConflict
 from .models import Booking, BookingStatus, DepositStatus
 from .serializers import (
     BookingListSerializer,
@@ -13,14 +15,28 @@ from .serializers import (
     BookingStatusUpdateSerializer,
     DepositStatusUpdateSerializer,
 )
+from .transitions import (
+    BY_DEPOSIT_STATUS,
+    BY_STATUS,
+    InvalidTransition,
+    TransitionConflict,
+    apply_transition,
+    is_noop,
+)
+
+
+
+class BookingCursorPagination(KeysetPagination):
+    """Keyset pagination for the booking inboxes, newest first."""
 
+    ordering = ('-created_at', '-id')
 
 
 class BookingViewSet(viewsets.ModelViewSet):
     
     
   
-    queryset = Booking.objects.select_related('item', 'owner', 'borrower').all()
+    queryset = Booking.objects.for_display()
     
    
     permission_classes = [AllowAny]
@@ -50,7 +66,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         # Get the booking or return 404 if not found
         booking = get_object_or_404(
-            Booking.objects.select_related('item', 'owner', 'borrower'),
+            Booking.objects.for_display(),
             pk=pk
         )
         
@@ -92,15 +108,11 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         # Filter bookings where the user is the owner
         # Order by newest first (matches Flutter repository)
-        bookings = Booking.objects.select_related(
-            'item', 'owner', 'borrower'
-        ).filter(
+        bookings = Booking.objects.for_display().filter(
             owner_id=owner_id
-        ).order_by('-created_at')
+        ).order_by('-created_at', '-id')
         
-        # Serialize and return
-        serializer = BookingListSerializer(bookings, many=True)
-        return Response(serializer.data)
+        return self._inbox_response(request, bookings)
     
     @action(detail=False, methods=['get'], url_path='my-requests')
     def my_requests(self, request):
@@ -115,13 +127,48 @@ class BookingViewSet(viewsets.ModelViewSet):
             )
         
         # Filter bookings where the user is the borrower
-        bookings = Booking.objects.select_related(
-            'item', 'owner', 'borrower'
-        ).filter(
+        bookings = Booking.objects.for_display().filter(
             borrower_id=borrower_id
-        ).order_by('-created_at')
+        ).order_by('-created_at', '-id')
+        
+        return self._inbox_response(request, bookings)
+    
+    def _inbox_response(self, request, bookings):
+        """
+        Apply the inbox filters and serialize, paginating when asked to.
+
+        Filters: ?status=pending[,accepted] and ?updated_since=<ISO date or
+        datetime>. Paging is opt-in with ?pagination=cursor (first page) or
+        ?cursor=<next_cursor>; without it the plain list is returned.
+        """
+        params = request.query_params
+        
+        statuses = [s for s in params.get('status', '').split(',') if s]
+        if statuses:
+            unknown = set(statuses) - set(BookingStatus.values)
+            if unknown:
+                return Response(
+                    {'error': f"Unknown status: {', '.join(sorted(unknown))}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            bookings = bookings.filter(status__in=statuses)
+        
+        updated_since = params.get('updated_since') or params.get('updatedSince')
+        if updated_since:
+            since = parse_since(updated_since)
+            if since is None:
+                return Response(
+                    {'error': 'updated_since must be an ISO 8601 date or datetime'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            bookings = bookings.filter(updated_at__gt=since)
+        
+        if params.get('cursor') or params.get('pagination') == 'cursor':
+            paginator = BookingCursorPagination()
+            page = paginator.paginate_queryset(bookings, request, view=self)
+            serializer = BookingListSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         
-        # Serialize and return
         serializer = BookingListSerializer(bookings, many=True)
         return Response(serializer.data)
     
@@ -138,29 +185,63 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         new_status = serializer.validated_data['status']
         
-       
-        if new_status == BookingStatus.ACCEPTED:
-            # Accept the booking → generates booking code automatically
-            booking.accept()
-            message = f'Booking accepted. Code: {booking.booking_code}'
-            
-        elif new_status == BookingStatus.DECLINED:
-            # Decline the booking
-            booking.decline()
-            message = 'Booking declined.'
-            
-        else:
-            # For other status changes, just update the status directly
-            booking.status = new_status
-            booking.save(update_fields=['status', 'updated_at'])
-            message = f'Booking status updated to {new_status}.'
+        def message(b):
+            if new_status == BookingStatus.ACCEPTED:
+                # Accepting also assigns the booking code (same UPDATE)
+                return f'Booking accepted. Code: {b.booking_code}'
+            if new_status == BookingStatus.DECLINED:
+                return 'Booking declined.'
+            return f'Booking status updated to {new_status}.'
+        
+        return self._apply(booking, BY_STATUS.get(new_status), message, target_status=new_status)
+    
+    def _apply(self, booking, transition, message, target_status=None):
+        """
+        Run a state transition and build the response.
+
+        Re-sending the state the booking is already in is a no-op (the
+        client sets status again after a deposit change). Invalid
+        transitions answer 400; a concurrent change or date overlap 409.
+        """
+        if transition is None:
+            if booking.status == target_status:
+                return self._booking_response(booking, message(booking))
+            return Response(
+                {'error': f'Cannot move a {booking.status} booking to {target_status}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if is_noop(booking, transition):
+            return self._booking_response(booking, message(booking))
+        
+        try:
+            apply_transition(booking, transition)
+        except InvalidTransition as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except TransitionConflict as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
+        except BookingConflict as exc:
+            return self._conflict_response(exc)
         
-        # Return updated booking
+        return self._booking_response(booking, message(booking))
+    
+    @staticmethod
+    def _booking_response(booking, message):
         return Response({
             'message': message,
             'booking': BookingDetailSerializer(booking).data
         })
     
+    @staticmethod
+    def _conflict_response(exc):
+        return Response(
+            {
+                'error': str(exc),
+                'conflicting_booking_id': str(exc.conflicting.id) if exc.conflicting else None,
+            },
+            status=status.HTTP_409_CONFLICT
+        )
+    
     @action(detail=True, methods=['patch'], url_path='deposit')
     def update_deposit(self, request, pk=None):
        
@@ -175,43 +256,17 @@ class BookingViewSet(viewsets.ModelViewSet):
         new_deposit_status = serializer.validated_data['deposit_status']
         
         # DEPOSIT STATUS TRANSITION LOGIC
+        # received: accepted → active (only from deposit none, as the
+        # Flutter cubit's markDepositReceived() checks); returned → completed;
+        # kept → closed.
+        messages = {
+            DepositStatus.RECEIVED: 'Deposit marked as received. Booking is now active.',
+            DepositStatus.RETURNED: 'Deposit returned. Booking completed.',
+            DepositStatus.KEPT: 'Deposit kept. Booking closed.',
+        }
+        message = messages.get(new_deposit_status, f'Deposit status updated to {new_deposit_status}.')
         
-        if new_deposit_status == DepositStatus.RECEIVED:
-            # Validate: can only mark received when status=accepted and deposit_status=none
-            # This matches Flutter cubit's markDepositReceived() validation
-            if booking.status != BookingStatus.ACCEPTED:
-                return Response(
-                    {'error': 'Can only mark deposit received when booking is accepted'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if booking.deposit_status != DepositStatus.NONE:
-                return Response(
-                    {'error': 'Deposit status must be none to mark as received'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            # This also sets status to 'active' (borrowing period begins)
-            booking.mark_deposit_received()
-            message = 'Deposit marked as received. Booking is now active.'
-            
-        elif new_deposit_status == DepositStatus.RETURNED:
-            # This also completes the booking
-            booking.mark_deposit_returned()
-            message = 'Deposit returned. Booking completed.'
-            
-        elif new_deposit_status == DepositStatus.KEPT:
-            # This also closes the booking
-            booking.keep_deposit()
-            message = 'Deposit kept. Booking closed.'
-            
-        else:
-            booking.deposit_status = new_deposit_status
-            booking.save(update_fields=['deposit_status', 'updated_at'])
-            message = f'Deposit status updated to {new_deposit_status}.'
-        
-        return Response({
-            'message': message,
-            'booking': BookingDetailSerializer(booking).data
-        })
+        return self._apply(booking, BY_DEPOSIT_STATUS[new_deposit_status], lambda b: message)
     
     @action(detail=True, methods=['post'], url_path='generate-code')
     def generate_code(self, request, pk=None):
@@ -245,9 +300,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         # Uses Q objects for OR queries
         from django.db.models import Q
         
-        bookings = Booking.objects.select_related(
-            'item', 'owner', 'borrower'
-        ).filter(
+        bookings = Booking.objects.for_display().filter(
             Q(owner_id=user_id) | Q(borrower_id=user_id)
         ).order_by('-created_at')[:limit]
         
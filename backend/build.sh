@@ -11,6 +11,7 @@ echo "==> Collecting static files..."
 python manage.py collectstatic --no-input
 
 echo "==> Running database migrations..."
-python manage.py migrate --no-input
+# --fake-initial adopts tables that already exist in Supabase (e.g. bookings)
+python manage.py migrate --no-input --fake-initial
 
 echo "==> Build completed successfully!"
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ItemImagesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "item_images"
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import item_images.signals  # noqa: F401
@@ -0,0 +1,114 @@
+"""Content-addressed, reference-counted item photos.
+
+An upload is identified by the SHA-256 of its bytes, computed while
+streaming through the (possibly disk-spooled) file. Its variants are
+stored once under ``<hash>/<variant>.<ext>`` and described by an
+``ImageBlob`` row whose ``ref_count`` is the number of ``ItemImage`` rows
+using them. Uploading a photo that is already stored, as when an item is
+relisted, only bumps the count: nothing is decoded or uploaded, and the
+client gets URLs it may already have cached.
+
+Counts change with single ``UPDATE ... SET ref_count = ref_count +/- n``
+statements in the caller's transaction. When the last reference goes, the
+blob row is deleted and its files are queued on the storage deletion
+queue; the drainer skips them if the content has been uploaded again.
+
+Re-registering content whose removal is queued or running is safe:
+``acquire`` deletes the queued rows under row locks, which waits for a
+drain that holds them (see deletion.py), then lets the caller check the
+files and upload again whatever that drain already removed.
+"""
+import hashlib
+from typing import Callable, Dict, Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .deletion import cancel, enqueue_urls
+from .models import BUCKET_NAME, ImageBlob
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(fileobj) -> str:
+	"""SHA-256 hex digest of ``fileobj``, read in chunks."""
+	digest = hashlib.sha256()
+	if hasattr(fileobj, "chunks"):
+		for chunk in fileobj.chunks(HASH_CHUNK_SIZE):
+			digest.update(chunk)
+	else:
+		fileobj.seek(0)
+		for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b""):
+			digest.update(chunk)
+	fileobj.seek(0)
+	return digest.hexdigest()
+
+
+def legacy_hash(data: bytes) -> str:
+	"""Key for files stored before uploads were processed (see dedupe_item_images).
+
+	Those files are the raw uploads, so their plain SHA-256 is what a new
+	upload of the same photo hashes to. A salted digest keeps them in a
+	separate namespace: ``take`` never hands the unprocessed original,
+	without thumbnail or card variants, to a new upload.
+	"""
+	return hashlib.sha256(b"legacy\0" + data).hexdigest()
+
+
+def find(digest: str) -> Optional[ImageBlob]:
+	return ImageBlob.objects.filter(pk=digest).first()
+
+
+def take(digest: str) -> Optional[ImageBlob]:
+	"""Take one reference to ``digest`` if it is stored; None otherwise.
+
+	The UPDATE locks the row, so it cannot be released and deleted before
+	the caller's transaction ends.
+	"""
+	if not ImageBlob.objects.filter(pk=digest).update(ref_count=F("ref_count") + 1):
+		return None
+	return ImageBlob.objects.get(pk=digest)
+
+
+def acquire(digest: str, urls: Dict[str, str], restore: Optional[Callable[[], None]] = None) -> ImageBlob:
+	"""Take one reference to ``digest``, registering it with ``urls`` if new.
+
+	When the row is created, queued removals of an earlier copy are
+	cancelled first and ``restore`` is called to put back any file that
+	was already removed.
+	"""
+	with transaction.atomic():
+		blob = take(digest)
+		if blob is not None:
+			return blob
+		blob, created = ImageBlob.objects.get_or_create(pk=digest, defaults=urls)
+		if created:
+			cancel(digest)
+			if restore is not None:
+				restore()
+		ImageBlob.objects.filter(pk=digest).update(ref_count=F("ref_count") + 1)
+	blob.refresh_from_db()
+	return blob
+
+
+def acquire_by_url(image_url: str) -> Optional[ImageBlob]:
+	"""Take a reference to the blob serving ``image_url``, if it is still stored."""
+	digest = ImageBlob.objects.filter(image_url=image_url).values_list("pk", flat=True).first()
+	if digest is None:
+		return None
+	return take(digest)
+
+
+def release(digest: str, count: int = 1) -> bool:
+	"""Drop ``count`` references; returns True if the files were queued for removal."""
+	with transaction.atomic():
+		ImageBlob.objects.filter(pk=digest).update(
+			ref_count=Greatest(F("ref_count") - count, 0)
+		)
+		blob = ImageBlob.objects.select_for_update().filter(pk=digest, ref_count=0).first()
+		if blob is None:
+			return False
+		blob.delete()
+		enqueue_urls(BUCKET_NAME, blob.storage_urls(), content_hash=digest)
+	return True
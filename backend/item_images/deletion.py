@@ -0,0 +1,256 @@
+"""Durable, batched removal of stored objects.
+
+Deleting an ``ItemImage`` (directly, through a queryset, or by cascade
+from its item or owner) records the storage paths of its variants as
+``StorageDeletion`` rows in the same transaction; see signals.py. No
+storage request runs inside the request or its transaction.
+
+``drain`` claims due rows in batches, removes each bucket's paths with one
+multi-path ``delete_many`` call, and drops the rows that succeeded. The
+rows stay locked during the storage call. Shared content that was uploaded
+again after being queued is left alone; ``cancel`` (used by blobs.py)
+waits for a drain in progress before taking its rows off the queue.
+Failed batches are retried with exponential backoff and dead-lettered
+after STORAGE_DELETION_MAX_ATTEMPTS; ``report`` lists them as orphans.
+
+Like the notification outbox, the drainer runs as a daemon thread in each
+web worker (``STORAGE_DELETION_WORKER = "inline"``) or as a separate
+process via ``python manage.py drain_storage_deletions``.
+"""
+import logging
+import os
+import random
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from storage import StorageError, get_storage
+from .models import ImageBlob, StorageDeletion, StorageDeletionStatus
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name: str, default):
+	return getattr(settings, name, default)
+
+
+def enqueue_paths(bucket: str, paths: Iterable[str], content_hash: str = "") -> List[StorageDeletion]:
+	"""Record ``paths`` for removal in the current transaction."""
+	now = timezone.now()
+	entries = StorageDeletion.objects.bulk_create([
+		StorageDeletion(bucket=bucket, path=path, content_hash=content_hash, next_attempt_at=now)
+		for path in dict.fromkeys(paths)
+		if path
+	])
+	if entries:
+		transaction.on_commit(wake)
+	return entries
+
+
+def enqueue_urls(bucket: str, urls: Iterable[str], content_hash: str = "") -> List[StorageDeletion]:
+	"""Record the objects behind public ``urls`` for removal."""
+	urls = [url for url in urls if url]
+	if not urls:
+		return []
+	storage = get_storage(bucket)
+	if storage is None:
+		# Nothing can have been uploaded without storage credentials
+		logger.warning(f"Storage not configured; not queueing {len(urls)} deletion(s)")
+		return []
+	return enqueue_paths(bucket, map(storage.path_from_url, urls), content_hash)
+
+
+def cancel(content_hash: str) -> int:
+	"""Take queued removals of ``content_hash`` off the queue.
+
+	Locks the rows first, so a drain removing them finishes before this
+	returns. Call inside a transaction.
+	"""
+	ids = list(
+		StorageDeletion.objects.select_for_update()
+		.filter(content_hash=content_hash)
+		.order_by("id")
+		.values_list("id", flat=True)
+	)
+	if not ids:
+		return 0
+	return StorageDeletion.objects.filter(id__in=ids).delete()[0]
+
+
+def _backoff(attempts: int) -> timedelta:
+	"""Exponential backoff with jitter: ~30s, 1m, 2m ... capped at one hour."""
+	base = _setting("STORAGE_DELETION_BACKOFF_BASE", 30)
+	delay = min(base * (2 ** max(attempts - 1, 0)), 3600)
+	return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _claim(batch_size: int) -> List[StorageDeletion]:
+	"""Lease a batch of due entries (see notifications.outbox._claim)."""
+	now = timezone.now()
+	lease = timedelta(seconds=_setting("STORAGE_DELETION_LEASE_SECONDS", 120))
+	with transaction.atomic():
+		entries = list(
+			StorageDeletion.objects.select_for_update(skip_locked=True)
+			.filter(status=StorageDeletionStatus.PENDING, next_attempt_at__lte=now)
+			.order_by("next_attempt_at")[:batch_size]
+		)
+		if entries:
+			StorageDeletion.objects.filter(id__in=[entry.id for entry in entries]).update(
+				next_attempt_at=now + lease
+			)
+	return entries
+
+
+def _fail(entries: List[StorageDeletion], error: str, result: Dict[str, int]) -> None:
+	max_attempts = _setting("STORAGE_DELETION_MAX_ATTEMPTS", 8)
+	for entry in entries:
+		attempts = entry.attempts + 1
+		if attempts >= max_attempts:
+			status = StorageDeletionStatus.DEAD
+			next_attempt_at = timezone.now()
+			result["dead"] += 1
+			logger.error(f"Giving up on {entry.bucket}/{entry.path} after {attempts} attempts: {error}")
+		else:
+			status = StorageDeletionStatus.PENDING
+			next_attempt_at = timezone.now() + _backoff(attempts)
+			result["retried"] += 1
+		StorageDeletion.objects.filter(id=entry.id).update(
+			status=status,
+			attempts=attempts,
+			next_attempt_at=next_attempt_at,
+			last_error=error[:2000],
+		)
+
+
+def drain(batch_size: int = None) -> Dict[str, int]:
+	"""
+	Remove one batch of due objects, one storage request per bucket.
+
+	Returns:
+		Dict with counts of claimed, deleted, skipped, retried and dead entries
+	"""
+	if batch_size is None:
+		batch_size = _setting("STORAGE_DELETION_BATCH_SIZE", 200)
+	result = {"claimed": 0, "deleted": 0, "skipped": 0, "retried": 0, "dead": 0}
+
+	entries = _claim(batch_size)
+	result["claimed"] = len(entries)
+
+	by_bucket = defaultdict(list)
+	for entry in entries:
+		by_bucket[entry.bucket].append(entry.id)
+
+	for bucket, ids in by_bucket.items():
+		with transaction.atomic():
+			# Locked until the objects are gone; cancel() waits on them.
+			# Rows cancelled since the claim are simply missing here.
+			group = list(
+				StorageDeletion.objects.select_for_update()
+				.filter(id__in=ids, status=StorageDeletionStatus.PENDING)
+				.order_by("id")
+			)
+			# Content uploaded again since it was queued is live once more
+			hashes = {entry.content_hash for entry in group if entry.content_hash}
+			live = set(ImageBlob.objects.filter(pk__in=hashes).values_list("pk", flat=True)) if hashes else set()
+			skipped = [entry.id for entry in group if entry.content_hash in live]
+			if skipped:
+				StorageDeletion.objects.filter(id__in=skipped).delete()
+				result["skipped"] += len(skipped)
+			group = [entry for entry in group if entry.content_hash not in live]
+			if not group:
+				continue
+
+			try:
+				storage = get_storage(bucket)
+				if storage is None:
+					raise StorageError("storage is not configured")
+				storage.delete_many([entry.path for entry in group])
+			except StorageError as e:
+				logger.warning(f"Removing {len(group)} object(s) from {bucket} failed: {e}")
+				_fail(group, str(e), result)
+				continue
+			# Objects that were already gone count as removed
+			StorageDeletion.objects.filter(id__in=[entry.id for entry in group]).delete()
+			result["deleted"] += len(group)
+
+	return result
+
+
+def drain_all(batch_size: int = None) -> Dict[str, int]:
+	"""Drain batches until nothing is due."""
+	totals = {"claimed": 0, "deleted": 0, "skipped": 0, "retried": 0, "dead": 0}
+	while True:
+		result = drain(batch_size)
+		for key, value in result.items():
+			totals[key] += value
+		if not result["claimed"]:
+			return totals
+
+
+def report(limit: int = 100) -> Dict[str, object]:
+	"""Queue depth and the oldest ``limit`` dead-lettered (orphaned) objects."""
+	pending = StorageDeletion.objects.filter(status=StorageDeletionStatus.PENDING)
+	dead = StorageDeletion.objects.filter(status=StorageDeletionStatus.DEAD)
+	return {
+		"pending": pending.count(),
+		"oldest_pending": pending.aggregate(oldest=Min("created_at"))["oldest"],
+		"dead": dead.count(),
+		"orphans": list(
+			dead.order_by("created_at").values("bucket", "path", "last_error")[:limit]
+		),
+	}
+
+
+def requeue_dead() -> int:
+	"""Move dead-lettered entries back to pending."""
+	return StorageDeletion.objects.filter(status=StorageDeletionStatus.DEAD).update(
+		status=StorageDeletionStatus.PENDING,
+		attempts=0,
+		next_attempt_at=timezone.now(),
+	)
+
+
+class DeletionWorker(threading.Thread):
+	"""Daemon thread that drains the queue when woken or on a poll interval."""
+
+	def __init__(self):
+		super().__init__(name="storage-deletions", daemon=True)
+		self.wakeup = threading.Event()
+		self.poll_interval = _setting("STORAGE_DELETION_POLL_INTERVAL", 60)
+
+	def run(self):
+		while True:
+			self.wakeup.wait(self.poll_interval)
+			self.wakeup.clear()
+			close_old_connections()
+			try:
+				drain_all()
+			except Exception as e:
+				logger.error(f"Storage deletion worker error: {e}")
+			finally:
+				close_old_connections()
+
+
+_worker = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+
+def wake() -> None:
+	"""Nudge the in-process drainer, starting it on first use."""
+	global _worker, _worker_pid
+	if _setting("STORAGE_DELETION_WORKER", "inline") != "inline":
+		return
+	if _worker is None or _worker_pid != os.getpid():
+		with _worker_lock:
+			if _worker is None or _worker_pid != os.getpid():
+				_worker = DeletionWorker()
+				_worker_pid = os.getpid()
+				_worker.start()
+	_worker.wakeup.set()
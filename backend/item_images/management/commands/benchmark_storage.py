@@ -0,0 +1,74 @@
+"""Time uploads and batched deletes against a storage backend.
+
+Usage:
+    python manage.py benchmark_storage --backend local --objects 500
+    python manage.py benchmark_storage --size-kb 200 --batch-size 100
+    python manage.py benchmark_storage --bucket item-images   # STORAGE_BACKEND
+
+Objects are written under a throwaway ``benchmark/<uuid>/`` prefix and are
+always removed again.
+"""
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from storage import LocalStorage, get_storage
+
+
+class Command(BaseCommand):
+    help = "Measure put and delete_many throughput of the configured storage backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backend", choices=["configured", "local"], default="configured")
+        parser.add_argument("--bucket", default="item-images")
+        parser.add_argument("--objects", type=int, default=200)
+        parser.add_argument("--size-kb", type=int, default=100)
+        parser.add_argument("--batch-size", type=int, default=100, help="Paths per delete_many call.")
+
+    def handle(self, *args, **options):
+        root = None
+        if options["backend"] == "local":
+            root = tempfile.mkdtemp(prefix="benchmark-storage-")
+            storage = LocalStorage(options["bucket"], root=root)
+        else:
+            storage = get_storage(options["bucket"])
+            if storage is None:
+                raise CommandError("Storage is not configured (missing Supabase credentials)")
+
+        payload = os.urandom(options["size_kb"] * 1024)
+        prefix = f"benchmark/{uuid.uuid4()}"
+        paths = [f"{prefix}/{i}.bin" for i in range(options["objects"])]
+
+        timings = []
+        started = time.perf_counter()
+        try:
+            for path in paths:
+                put_started = time.perf_counter()
+                storage.put(path, payload, "application/octet-stream")
+                timings.append((time.perf_counter() - put_started) * 1000)
+            put_elapsed = time.perf_counter() - started
+        finally:
+            delete_started = time.perf_counter()
+            batch_size = options["batch_size"]
+            for start in range(0, len(paths), batch_size):
+                storage.delete_many(paths[start:start + batch_size])
+            delete_elapsed = time.perf_counter() - delete_started
+            if root:
+                shutil.rmtree(root, ignore_errors=True)
+
+        if not timings:
+            return
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        megabytes = len(timings) * len(payload) / (1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(
+            f"{type(storage).__name__}: {len(timings)} puts of {options['size_kb']} KB: "
+            f"{len(timings) / put_elapsed:.1f} objects/s, {megabytes / put_elapsed:.1f} MB/s, "
+            f"p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms; "
+            f"delete_many x{batch_size}: {len(paths) / delete_elapsed:.1f} objects/s"
+        ))
@@ -0,0 +1,119 @@
+"""Backfill content hashes and share the files of identical item photos.
+
+Images stored before uploads were content-addressed have no
+``content_hash``. This hashes the stored full-size file of each such row
+and registers it as an ImageBlob; rows whose bytes are already stored
+elsewhere are pointed at the existing files, and their own copies are
+queued for removal.
+
+Usage:
+    python manage.py dedupe_item_images --dry-run
+    python manage.py dedupe_item_images --batch-size 200
+
+Legacy rows are registered under ``blobs.legacy_hash`` of their stored
+bytes, not the plain SHA-256 that uploads use, so they only dedupe against
+each other. A new upload of the same photo is processed into variants as
+usual instead of being given the legacy original.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from item_images import blobs
+from item_images.deletion import enqueue_urls
+from item_images.models import BUCKET_NAME, ItemImage
+from storage import StorageError, get_storage
+
+
+class Command(BaseCommand):
+    help = "Hash legacy item images and deduplicate identical stored files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report duplicates and the bytes that would be freed.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Rows fetched per query.",
+        )
+
+    def handle(self, *args, **options):
+        storage = get_storage(BUCKET_NAME)
+        if storage is None:
+            raise CommandError("Storage is not configured (missing Supabase credentials)")
+
+        dry_run = options["dry_run"]
+        totals = {"scanned": 0, "registered": 0, "duplicates": 0, "skipped": 0, "bytes_freed": 0}
+        # Only the dry run needs to remember what it has seen
+        seen = {}
+        last_id = None
+        while True:
+            rows = ItemImage.objects.filter(content_hash__isnull=True).order_by("id")
+            if last_id is not None:
+                rows = rows.filter(id__gt=last_id)
+            batch = list(rows[:options["batch_size"]])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            for image in batch:
+                totals["scanned"] += 1
+                path = storage.path_from_url(image.image_url)
+                if path is None:
+                    totals["skipped"] += 1  # Not in our bucket
+                    continue
+                try:
+                    data = storage.read(path)
+                except StorageError as exc:
+                    self.stderr.write(f"{image.id}: {exc}")
+                    totals["skipped"] += 1
+                    continue
+                digest = blobs.legacy_hash(data)
+
+                if dry_run:
+                    known = seen.get(digest) or getattr(blobs.find(digest), "image_url", None)
+                    if known and known != image.image_url:
+                        totals["duplicates"] += 1
+                        totals["bytes_freed"] += len(data)
+                    else:
+                        seen[digest] = image.image_url
+                        totals["registered"] += 1
+                    continue
+
+                if self._attach(image, digest):
+                    totals["duplicates"] += 1
+                    totals["bytes_freed"] += len(data)
+                else:
+                    totals["registered"] += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would dedupe' if dry_run else 'Deduped'}: scanned={totals['scanned']} "
+            f"registered={totals['registered']} duplicates={totals['duplicates']} "
+            f"skipped={totals['skipped']} bytes_freed={totals['bytes_freed']} (full variants only)"
+        ))
+
+    @staticmethod
+    def _attach(image, digest):
+        """Give ``image`` a reference to ``digest``; True if its own files became redundant."""
+        with transaction.atomic():
+            blob = blobs.acquire(digest, {
+                "image_url": image.image_url,
+                "card_url": image.card_url,
+                "thumbnail_url": image.thumbnail_url,
+            })
+            ItemImage.objects.filter(pk=image.pk).update(content_hash=digest, **blob.urls())
+            if blob.image_url == image.image_url:
+                return False
+            # Keep files another (not yet hashed) row still points at
+            old_urls = [
+                url for url in image.storage_urls()
+                if not ItemImage.objects.filter(
+                    Q(image_url=url) | Q(card_url=url) | Q(thumbnail_url=url)
+                ).exists()
+            ]
+            enqueue_urls(BUCKET_NAME, old_urls)
+            return True
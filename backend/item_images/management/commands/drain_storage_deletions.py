@@ -0,0 +1,85 @@
+"""Remove stored objects queued by image deletions."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from item_images import deletion
+
+
+class Command(BaseCommand):
+    help = "Drain the storage deletion queue in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain everything that is due, then exit.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Entries claimed per batch (default: STORAGE_DELETION_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep between polls when the queue is empty.",
+        )
+        parser.add_argument(
+            "--requeue-dead",
+            action="store_true",
+            help="Move dead-lettered entries back to pending before draining.",
+        )
+        parser.add_argument(
+            "--report",
+            action="store_true",
+            help="Print queue depth and the orphaned (dead-lettered) objects, then exit.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=100,
+            help="Orphaned objects listed by --report (default: 100).",
+        )
+
+    def handle(self, *args, **options):
+        if options["report"]:
+            report = deletion.report(options["limit"])
+            orphans = report.pop("orphans")
+            for key, value in report.items():
+                self.stdout.write(f"{key}: {value}")
+            for entry in orphans:
+                self.stdout.write(f"{entry['bucket']}/{entry['path']}\t{entry['last_error']}")
+            if len(orphans) < report["dead"]:
+                self.stdout.write(f"... {report['dead'] - len(orphans)} more")
+            return
+
+        if options["requeue_dead"]:
+            self.stdout.write(f"Requeued {deletion.requeue_dead()} dead-lettered entries")
+
+        if options["once"]:
+            totals = deletion.drain_all(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(self._format(totals)))
+            return
+
+        self.stdout.write("Draining storage deletions (Ctrl+C to stop)...")
+        try:
+            while True:
+                close_old_connections()
+                result = deletion.drain(options["batch_size"])
+                if result["claimed"]:
+                    self.stdout.write(self._format(result))
+                else:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    @staticmethod
+    def _format(result):
+        return (
+            f"claimed={result['claimed']} deleted={result['deleted']} "
+            f"skipped={result['skipped']} retried={result['retried']} dead={result['dead']}"
+        )
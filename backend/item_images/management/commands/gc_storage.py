@@ -0,0 +1,67 @@
+"""Delete stored objects that no row refers to.
+
+Usage:
+    python manage.py gc_storage --dry-run
+    python manage.py gc_storage --batch-size 500 --min-age-hours 48
+    python manage.py gc_storage --bucket item-images --prefix <item_id>
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from item_images import orphans
+from item_images.models import BUCKET_NAME
+from storage import StorageError, get_storage
+
+
+class Command(BaseCommand):
+    help = "Stream a bucket listing and remove objects not referenced by any image, blob or avatar."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bucket", default=BUCKET_NAME)
+        parser.add_argument("--prefix", default="", help="Only scan below this path.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report orphans; delete nothing.",
+        )
+        parser.add_argument("--page-size", type=int, default=1000, help="Objects per listing request.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Objects checked and deleted per batch.")
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=24,
+            help="Skip objects modified more recently (uploads in flight).",
+        )
+        parser.add_argument("--sample", type=int, default=20, help="Orphan paths to print.")
+
+    def handle(self, *args, **options):
+        storage = get_storage(options["bucket"])
+        if storage is None:
+            raise CommandError("Storage is not configured (missing Supabase credentials)")
+
+        totals = {"scanned": 0, "recent": 0, "orphans": 0, "deleted": 0}
+        printed = 0
+        try:
+            for result in orphans.sweep(
+                storage,
+                dry_run=options["dry_run"],
+                prefix=options["prefix"],
+                page_size=options["page_size"],
+                batch_size=options["batch_size"],
+                min_age=timedelta(hours=options["min_age_hours"]),
+            ):
+                totals["scanned"] += result["scanned"]
+                totals["recent"] += result["recent"]
+                totals["orphans"] += len(result["orphans"])
+                totals["deleted"] += result["deleted"]
+                for path in result["orphans"][:max(options["sample"] - printed, 0)]:
+                    self.stdout.write(f"orphan: {options['bucket']}/{path}")
+                    printed += 1
+        except StorageError as exc:
+            raise CommandError(f"{exc} (after scanning {totals['scanned']} objects)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Dry run: ' if options['dry_run'] else ''}scanned={totals['scanned']} "
+            f"recent={totals['recent']} orphans={totals['orphans']} deleted={totals['deleted']}"
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("item_images", "0002_remove_itemimage_created_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="itemimage",
+            name="card_url",
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="itemimage",
+            name="thumbnail_url",
+            field=models.URLField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("item_images", "0004_storagedeletion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageBlob",
+            fields=[
+                (
+                    "content_hash",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("image_url", models.URLField(db_index=True, max_length=500)),
+                ("card_url", models.URLField(blank=True, max_length=500, null=True)),
+                (
+                    "thumbnail_url",
+                    models.URLField(blank=True, max_length=500, null=True),
+                ),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "item_image_blobs",
+            },
+        ),
+        migrations.AddField(
+            model_name="itemimage",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="storagedeletion",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name="itemimage",
+            name="card_url",
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AlterField(
+            model_name="itemimage",
+            name="image_url",
+            field=models.URLField(max_length=500),
+        ),
+        migrations.AlterField(
+            model_name="itemimage",
+            name="thumbnail_url",
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+    ]
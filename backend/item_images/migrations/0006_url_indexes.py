@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("item_images", "0005_imageblob"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="imageblob",
+            name="card_url",
+            field=models.URLField(blank=True, db_index=True, max_length=500, null=True),
+        ),
+        migrations.AlterField(
+            model_name="imageblob",
+            name="thumbnail_url",
+            field=models.URLField(blank=True, db_index=True, max_length=500, null=True),
+        ),
+        migrations.AlterField(
+            model_name="itemimage",
+            name="card_url",
+            field=models.URLField(blank=True, db_index=True, max_length=500, null=True),
+        ),
+        migrations.AlterField(
+            model_name="itemimage",
+            name="image_url",
+            field=models.URLField(db_index=True, max_length=500),
+        ),
+        migrations.AlterField(
+            model_name="itemimage",
+            name="thumbnail_url",
+            field=models.URLField(blank=True, db_index=True, max_length=500, null=True),
+        ),
+    ]
@@ -3,6 +3,9 @@ import uuid
 
 from django.db import models
 
+# Supabase Storage bucket (or local directory, see storage.py) for item photos
+BUCKET_NAME = "item-images"
+
 
 class ItemImage(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -11,7 +14,12 @@ class ItemImage(models.Model):
 		on_delete=models.CASCADE,
 		related_name="images",
 	)
-	image_url = models.URLField()
+	# The full-size variant for processed uploads (item_images/processing.py)
+	image_url = models.URLField(max_length=500, db_index=True)
+	card_url = models.URLField(max_length=500, blank=True, null=True, db_index=True)
+	thumbnail_url = models.URLField(max_length=500, blank=True, null=True, db_index=True)
+	# SHA-256 of the uploaded bytes; shared files are counted in ImageBlob
+	content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
 	position = models.PositiveSmallIntegerField()
 
 	class Meta:
@@ -19,5 +27,79 @@ class ItemImage(models.Model):
 		ordering = ["position"]
 		unique_together = ("item", "position")
 
+	def storage_urls(self) -> list:
+		"""URLs of every stored variant of this image."""
+		return [url for url in (self.image_url, self.card_url, self.thumbnail_url) if url]
+
 	def __str__(self) -> str:
 		return f"{self.item_id} @ {self.position}"
+
+
+class ImageBlob(models.Model):
+	"""Stored variants of one piece of content, shared by every ItemImage
+	with that ``content_hash``.
+
+	``ref_count`` is the number of those rows; item_images.blobs removes
+	the files once it drops to zero.
+	"""
+
+	content_hash = models.CharField(max_length=64, primary_key=True)
+	image_url = models.URLField(max_length=500, db_index=True)
+	card_url = models.URLField(max_length=500, blank=True, null=True, db_index=True)
+	thumbnail_url = models.URLField(max_length=500, blank=True, null=True, db_index=True)
+	ref_count = models.PositiveIntegerField(default=0)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		db_table = "item_image_blobs"
+
+	def urls(self) -> dict:
+		return {
+			"image_url": self.image_url,
+			"card_url": self.card_url,
+			"thumbnail_url": self.thumbnail_url,
+		}
+
+	def storage_urls(self) -> list:
+		return [url for url in self.urls().values() if url]
+
+	def __str__(self) -> str:
+		return f"{self.content_hash} x{self.ref_count}"
+
+
+class StorageDeletionStatus(models.TextChoices):
+	PENDING = "pending", "Pending"
+	DEAD = "dead", "Dead"
+
+
+class StorageDeletion(models.Model):
+	"""A stored object to remove once the row that referenced it is gone.
+
+	Rows are written in the same transaction as the delete and drained by
+	item_images.deletion, which removes them once the object is gone.
+	Entries that keep failing are kept as ``dead`` so orphans can be
+	reported and retried.
+	"""
+
+	bucket = models.CharField(max_length=63)
+	path = models.CharField(max_length=1024)
+	# Set for shared content; skipped if the content is referenced again
+	content_hash = models.CharField(max_length=64, blank=True)
+	status = models.CharField(
+		max_length=20,
+		choices=StorageDeletionStatus.choices,
+		default=StorageDeletionStatus.PENDING,
+	)
+	attempts = models.PositiveIntegerField(default=0)
+	next_attempt_at = models.DateTimeField()
+	last_error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		db_table = "storage_deletions"
+		indexes = [
+			models.Index(fields=["status", "next_attempt_at"], name="storage_deletion_due_idx"),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.bucket}/{self.path} ({self.status})"
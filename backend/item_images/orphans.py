@@ -0,0 +1,105 @@
+"""Find and remove stored objects that nothing refers to.
+
+Objects can outlive their rows: images deleted before the deletion queue
+existed, uploads whose request failed half way, or rows removed by raw
+SQL. ``collect`` walks a bucket listing page by page (see
+``StorageBackend.walk``) and anti-joins each batch of paths against the
+database with indexed ``IN`` lookups:
+
+* ``ItemImage`` image, card and thumbnail URLs;
+* ``ImageBlob`` rows, by content hash and by URL;
+* user avatar URLs;
+* paths already on the deletion queue, which are left to the queue.
+
+Memory holds one listing page per directory level plus one batch, so the
+bucket size does not matter. Objects younger than ``min_age`` are skipped:
+uploads are stored before their row is committed.
+
+Deleting while listing shifts later pages, so a run can miss some
+orphans; they are found by the next run. Referenced objects are never at
+risk.
+"""
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from django.db.models import Q
+from django.utils import timezone
+
+from storage import StorageBackend
+from users.models import User
+from .models import ImageBlob, ItemImage, StorageDeletion
+
+HASH_PREFIX = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _batches(entries: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+	batch = []
+	for entry in entries:
+		batch.append(entry)
+		if len(batch) >= size:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+
+def referenced(storage: StorageBackend, paths: List[str]) -> Set[str]:
+	"""The subset of ``paths`` that a row still points at or the queue owns."""
+	urls = {storage.public_url(path): path for path in paths}
+	url_list = list(urls)
+	found = set()
+
+	def add(values):
+		for value in values:
+			path = urls.get(value) if value else None
+			if path:
+				found.add(path)
+
+	url_match = Q(image_url__in=url_list) | Q(card_url__in=url_list) | Q(thumbnail_url__in=url_list)
+	for row in ItemImage.objects.filter(url_match).values_list("image_url", "card_url", "thumbnail_url"):
+		add(row)
+
+	hashes = {path.split("/", 1)[0] for path in paths if HASH_PREFIX.match(path.split("/", 1)[0])}
+	blob_match = url_match | Q(pk__in=hashes) if hashes else url_match
+	for blob in ImageBlob.objects.filter(blob_match):
+		add(blob.storage_urls())
+		# Any variant under a live hash belongs to it
+		found.update(path for path in paths if path.startswith(f"{blob.pk}/"))
+
+	add(User.objects.filter(avatar_url__in=url_list).values_list("avatar_url", flat=True))
+	found.update(
+		StorageDeletion.objects.filter(bucket=storage.bucket, path__in=paths)
+		.values_list("path", flat=True)
+	)
+	return found
+
+
+def collect(
+	storage: StorageBackend,
+	prefix: str = "",
+	page_size: int = 1000,
+	batch_size: int = 500,
+	min_age: timedelta = timedelta(hours=24),
+	now: Optional[datetime] = None,
+) -> Iterator[Dict]:
+	"""Yield ``{"scanned", "recent", "orphans"}`` for each batch of listed objects."""
+	cutoff = (now or timezone.now()) - min_age
+	for batch in _batches(storage.walk(prefix, page_size), batch_size):
+		old = [entry["path"] for entry in batch if not entry["updated_at"] or entry["updated_at"] < cutoff]
+		live = referenced(storage, old) if old else set()
+		yield {
+			"scanned": len(batch),
+			"recent": len(batch) - len(old),
+			"orphans": [path for path in old if path not in live],
+		}
+
+
+def sweep(storage: StorageBackend, dry_run: bool = False, **options) -> Iterator[Dict]:
+	"""``collect``, deleting each batch's orphans unless ``dry_run``."""
+	for result in collect(storage, **options):
+		result["deleted"] = 0
+		if result["orphans"] and not dry_run:
+			storage.delete_many(result["orphans"])
+			result["deleted"] = len(result["orphans"])
+		yield result
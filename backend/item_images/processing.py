@@ -0,0 +1,162 @@
+"""Resize uploaded item photos into display variants.
+
+An upload is decoded once, in bounded memory, and re-encoded as three
+variants (see ``VARIANTS``): ``thumb`` for feed and inbox lists, ``card``
+for item cards and ``full`` for the detail screen. Camera orientation is
+applied to the pixels and every other bit of metadata (EXIF, GPS, XMP) is
+dropped; only the ICC colour profile is kept.
+
+Memory stays bounded because:
+
+* Django spools uploads above FILE_UPLOAD_MAX_MEMORY_SIZE to disk and
+  Pillow reads from that file lazily instead of from a ``bytes`` copy;
+* images with more than ITEM_IMAGE_MAX_PIXELS pixels are rejected from
+  their header, before any pixel data is decoded;
+* JPEGs are decoded with ``draft()``, which lets libjpeg scale down by
+  1/2, 1/4 or 1/8 while decoding, close to the largest variant's size;
+* each smaller variant is resized from the previous one.
+
+Variants are stored under content-addressed keys,
+``<sha256 of the upload>/<variant>.<ext>`` (see blobs.py), so the same
+photo is stored once and its URLs can be cached by clients and CDNs
+indefinitely.
+"""
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, List
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+# Longest edge in pixels, largest first
+VARIANTS = {
+	"full": 1600,
+	"card": 800,
+	"thumb": 320,
+}
+
+FORMATS = {
+	"webp": ("WEBP", "image/webp"),
+	"jpeg": ("JPEG", "image/jpeg"),
+}
+
+
+class ImageProcessingError(ValueError):
+	"""The upload is not an image we accept."""
+
+
+@dataclass
+class Variant:
+	name: str
+	width: int
+	height: int
+	content_type: str
+	extension: str
+	data: bytes
+
+	def key(self, content_hash: str) -> str:
+		return variant_key(content_hash, self.name, self.extension)
+
+
+def _setting(name: str, default):
+	return getattr(settings, name, default)
+
+
+def variant_key(content_hash: str, variant: str, extension: str) -> str:
+	return f"{content_hash}/{variant}.{extension}"
+
+
+def output_format() -> str:
+	"""ITEM_IMAGE_FORMAT, falling back to JPEG where Pillow lacks WebP."""
+	name = str(_setting("ITEM_IMAGE_FORMAT", "webp")).lower()
+	if name not in FORMATS or (name == "webp" and not features.check("webp")):
+		return "jpeg"
+	return name
+
+
+def _has_alpha(image: Image.Image) -> bool:
+	return image.mode in ("RGBA", "LA") or (
+		image.mode == "P" and "transparency" in image.info
+	)
+
+
+def _normalise_mode(image: Image.Image, keep_alpha: bool) -> Image.Image:
+	if keep_alpha and _has_alpha(image):
+		return image if image.mode == "RGBA" else image.convert("RGBA")
+	if _has_alpha(image):
+		# Flatten onto white; JPEG has no alpha channel
+		rgba = image.convert("RGBA")
+		background = Image.new("RGB", rgba.size, (255, 255, 255))
+		background.paste(rgba, mask=rgba.getchannel("A"))
+		return background
+	return image if image.mode == "RGB" else image.convert("RGB")
+
+
+def _open(fileobj) -> Image.Image:
+	"""Open ``fileobj`` and decode it at (about) the largest variant's size."""
+	max_pixels = _setting("ITEM_IMAGE_MAX_PIXELS", 40_000_000)
+	largest = max(VARIANTS.values())
+	try:
+		if hasattr(fileobj, "seek"):
+			fileobj.seek(0)
+		image = Image.open(fileobj)
+		if image.width * image.height > max_pixels:
+			raise ImageProcessingError(
+				f"image is too large ({image.width}x{image.height} pixels)"
+			)
+		# A no-op for formats other than JPEG
+		image.draft("RGB", (largest, largest))
+		image.load()
+	except ImageProcessingError:
+		raise
+	except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as exc:
+		raise ImageProcessingError("file is not a supported image") from exc
+	return image
+
+
+def process_image(fileobj) -> List[Variant]:
+	"""Decode ``fileobj`` and encode every variant, largest first."""
+	name = output_format()
+	pil_format, content_type = FORMATS[name]
+	quality = _setting("ITEM_IMAGE_QUALITY", 80)
+
+	source = _open(fileobj)
+	icc_profile = source.info.get("icc_profile")
+	image = ImageOps.exif_transpose(source)
+	image = _normalise_mode(image, keep_alpha=(name == "webp"))
+	if image is not source:
+		source.close()
+
+	variants = []
+	for variant, edge in VARIANTS.items():
+		# thumbnail() never upscales and reuses the previous, smaller result
+		image.thumbnail((edge, edge), Image.Resampling.LANCZOS, reducing_gap=3.0)
+		buffer = BytesIO()
+		options = {"quality": quality}
+		if icc_profile:
+			options["icc_profile"] = icc_profile
+		if pil_format == "JPEG":
+			options.update(optimize=True, progressive=True)
+		else:
+			options["method"] = 4
+		# Nothing from image.info is written unless passed here, so EXIF is gone
+		image.save(buffer, pil_format, **options)
+		variants.append(Variant(
+			name=variant,
+			width=image.width,
+			height=image.height,
+			content_type=content_type,
+			extension=name,
+			data=buffer.getvalue(),
+		))
+	image.close()
+	return variants
+
+
+def variant_urls(urls: Dict[str, str]) -> Dict[str, str]:
+	"""Map variant URLs onto ``ItemImage`` fields."""
+	return {
+		"image_url": urls["full"],
+		"card_url": urls["card"],
+		"thumbnail_url": urls["thumb"],
+	}
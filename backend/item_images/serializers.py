@@ -1,12 +1,17 @@
 """Serializers for item images."""
+from django.db import transaction
 from rest_framework import serializers
 
+from . import blobs
 from .models import ItemImage
 
 
 class ItemImageSerializer(serializers.ModelSerializer):
 	item_id = serializers.UUIDField(required=False)
 	item = serializers.PrimaryKeyRelatedField(read_only=True)
+	# Images added by URL have no variants; fall back to the original
+	thumbnail_url = serializers.SerializerMethodField()
+	card_url = serializers.SerializerMethodField()
 
 	class Meta:
 		model = ItemImage
@@ -15,9 +20,24 @@ class ItemImageSerializer(serializers.ModelSerializer):
 			"item_id",
 			"item",
 			"image_url",
+			"card_url",
+			"thumbnail_url",
 			"position",
 		]
 
+	def get_thumbnail_url(self, obj: ItemImage) -> str:
+		return obj.thumbnail_url or obj.image_url
+
+	def get_card_url(self, obj: ItemImage) -> str:
+		return obj.card_url or obj.image_url
+
+	def validate_item_id(self, value):
+		from items.models import Item
+
+		if not Item.objects.filter(pk=value).exists():
+			raise serializers.ValidationError("Item not found.")
+		return value
+
 	def validate_position(self, value: int) -> int:
 		if value < 1 or value > 3:
 			raise serializers.ValidationError("position must be between 1 and 3")
@@ -30,4 +50,10 @@ class ItemImageSerializer(serializers.ModelSerializer):
 		from items.models import Item
 
 		item = Item.objects.get(pk=item_id)
-		return ItemImage.objects.create(item=item, **validated_data)
+		with transaction.atomic():
+			if not validated_data.get("content_hash"):
+				# Re-adding a stored photo by URL shares (and counts) its files
+				blob = blobs.acquire_by_url(validated_data["image_url"])
+				if blob is not None:
+					validated_data.update(content_hash=blob.pk, **blob.urls())
+			return ItemImage.objects.create(item=item, **validated_data)
@@ -0,0 +1,19 @@
+"""Signals for item images."""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .blobs import release
+from .deletion import enqueue_urls
+from .models import BUCKET_NAME, ItemImage
+
+
+@receiver(post_delete, sender=ItemImage)
+def item_image_deleted_handler(sender, instance, **kwargs):
+	"""Queue the image's stored variants for removal, also on cascades.
+
+	Shared content is only removed with its last reference.
+	"""
+	if instance.content_hash:
+		release(instance.content_hash)
+	else:
+		enqueue_urls(BUCKET_NAME, instance.storage_urls())
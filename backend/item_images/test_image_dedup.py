@@ -0,0 +1,192 @@
+"""
+Tests for content-addressed item photos.
+Run with: python manage.py test item_images
+"""
+
+import shutil
+import tempfile
+import uuid
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from item_images import blobs, deletion
+from item_images.models import BUCKET_NAME, ImageBlob, ItemImage, StorageDeletion
+from item_images.test_image_processing import photo
+from items.models import Item
+from storage import LocalStorage
+from users.models import User
+
+
+class ImageDedupTests(TestCase):
+    """Identical uploads share files, which go with their last reference."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        storage = override_settings(
+            STORAGE_BACKEND='local',
+            STORAGE_LOCAL_ROOT=self.root,
+            STORAGE_LOCAL_BASE_URL='https://cdn.test/',
+            STORAGE_DELETION_WORKER='off',
+        )
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='relister',
+            email='relister@test.com',
+            phone='9500000000'
+        )
+        self.items = [self.create_item(title) for title in ('Drill', 'Drill (relisted)')]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.photo = photo(800, 600).getvalue()
+
+    def create_item(self, title):
+        return Item.objects.create(
+            owner=self.user,
+            title=title,
+            category='Tools',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+
+    def upload(self, item, position=1):
+        response = self.client.post(
+            '/api/item-images/upload/',
+            {
+                'file': SimpleUploadedFile('photo.jpg', self.photo, content_type='image/jpeg'),
+                'item_id': str(item.id),
+                'position': position,
+            },
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 201)
+        return ItemImage.objects.get(pk=response.data['id'])
+
+    def stored(self):
+        return sorted(p.name for p in Path(self.root).rglob('*.webp'))
+
+    def test_relisting_reuses_stored_variants(self):
+        first = self.upload(self.items[0])
+        with mock.patch('item_images.views.process_image') as process:
+            second = self.upload(self.items[1])
+
+        process.assert_not_called()
+        self.assertEqual(second.content_hash, first.content_hash)
+        self.assertEqual(second.thumbnail_url, first.thumbnail_url)
+        self.assertEqual(ImageBlob.objects.get().ref_count, 2)
+        self.assertEqual(self.stored(), ['card.webp', 'full.webp', 'thumb.webp'])
+
+    def test_files_go_with_the_last_reference(self):
+        first = self.upload(self.items[0])
+        self.upload(self.items[1])
+
+        self.items[0].delete()
+        self.assertFalse(StorageDeletion.objects.exists())
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+
+        self.items[1].delete()
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertEqual(
+            set(StorageDeletion.objects.values_list('content_hash', flat=True)),
+            {first.content_hash},
+        )
+        deletion.drain_all()
+        self.assertEqual(self.stored(), [])
+
+    def test_upload_again_before_drain_keeps_files(self):
+        self.upload(self.items[0])
+        self.items[0].delete()
+
+        self.assertEqual(StorageDeletion.objects.count(), 3)
+
+        # Registering the content again takes its removals off the queue
+        self.upload(self.items[1])
+        self.assertFalse(StorageDeletion.objects.exists())
+        self.assertEqual(deletion.drain_all()['claimed'], 0)
+        self.assertEqual(self.stored(), ['card.webp', 'full.webp', 'thumb.webp'])
+
+    def test_adding_a_stored_url_counts_a_reference(self):
+        image = self.upload(self.items[0])
+
+        response = self.client.post(
+            f'/api/items/{self.items[1].id}/images/',
+            {'image_url': image.image_url, 'position': 1},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['thumbnail_url'], image.thumbnail_url)
+        self.assertEqual(ImageBlob.objects.get().ref_count, 2)
+
+    def test_backfill_dedupes_legacy_objects(self):
+        storage = LocalStorage(BUCKET_NAME)
+        legacy = []
+        for item in self.items:
+            path = f'{item.id}/{uuid.uuid4()}_photo.jpg'
+            storage.put(path, self.photo, 'image/jpeg')
+            legacy.append(ItemImage.objects.create(item=item, position=1, image_url=storage.public_url(path)))
+
+        out = StringIO()
+        call_command('dedupe_item_images', '--dry-run', stdout=out)
+        self.assertIn('duplicates=1', out.getvalue())
+        self.assertFalse(ImageBlob.objects.exists())
+
+        call_command('dedupe_item_images', '--batch-size', '1', stdout=StringIO())
+
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(
+            set(ItemImage.objects.values_list('image_url', flat=True)),
+            {blob.image_url},
+        )
+        deletion.drain_all()
+        self.assertEqual(len(list(Path(self.root).rglob('*.jpg'))), 1)
+
+        # Uploading the same bytes again still produces variants
+        uploaded = self.upload(self.items[0], position=2)
+        self.assertNotEqual(uploaded.content_hash, blob.pk)
+        self.assertTrue(uploaded.thumbnail_url.endswith('/thumb.webp'))
+        self.assertTrue(uploaded.card_url.endswith('/card.webp'))
+        self.assertEqual(ImageBlob.objects.get(pk=blob.pk).ref_count, 2)
+
+    def test_invalid_position_is_rejected_before_storage(self):
+        response = self.client.post(
+            '/api/item-images/upload/',
+            {
+                'file': SimpleUploadedFile('photo.jpg', self.photo, content_type='image/jpeg'),
+                'item_id': str(self.items[0].id),
+                'position': 7,
+            },
+            format='multipart',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stored(), [])
+
+    def test_upload_restores_files_removed_by_a_drain_in_flight(self):
+        self.upload(self.items[0])
+        self.items[0].delete()
+        real_acquire = blobs.acquire
+
+        def drain_then_acquire(*args, **kwargs):
+            # A drain claimed before the new upload registers the content
+            deletion.drain_all()
+            self.assertEqual(self.stored(), [])
+            return real_acquire(*args, **kwargs)
+
+        with mock.patch('item_images.blobs.acquire', side_effect=drain_then_acquire):
+            self.upload(self.items[1])
+
+        self.assertEqual(self.stored(), ['card.webp', 'full.webp', 'thumb.webp'])
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+
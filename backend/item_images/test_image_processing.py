@@ -0,0 +1,150 @@
+"""
+Tests for item photo processing and the upload endpoint.
+Run with: python manage.py test item_images
+"""
+
+import shutil
+import tempfile
+import uuid
+from io import BytesIO
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from item_images import deletion
+from item_images.models import ItemImage
+from item_images.processing import ImageProcessingError, process_image
+from items.models import Item
+from users.models import User
+
+
+def photo(width=3000, height=2000, orientation=None, fmt='JPEG'):
+    image = Image.new('RGB', (width, height), (200, 30, 30))
+    buffer = BytesIO()
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(buffer, fmt, exif=exif)
+    buffer.seek(0)
+    return buffer
+
+
+class ProcessImageTests(TestCase):
+    """Uploads become bounded, metadata-free variants."""
+
+    def test_variants_are_resized_largest_first(self):
+        variants = process_image(photo())
+
+        self.assertEqual([v.name for v in variants], ['full', 'card', 'thumb'])
+        self.assertEqual([(v.width, v.height) for v in variants], [(1600, 1067), (800, 534), (320, 214)])
+        for variant in variants:
+            decoded = Image.open(BytesIO(variant.data))
+            self.assertEqual(decoded.format, 'WEBP')
+            self.assertEqual(decoded.size, (variant.width, variant.height))
+            self.assertEqual(len(decoded.getexif()), 0)
+
+    def test_orientation_is_applied_to_the_pixels(self):
+        full = process_image(photo(orientation=6))[0]
+
+        self.assertEqual((full.width, full.height), (1067, 1600))
+
+    def test_small_images_are_not_upscaled(self):
+        variants = process_image(photo(400, 300))
+
+        self.assertEqual([(v.width, v.height) for v in variants], [(400, 300), (400, 300), (320, 240)])
+
+    @override_settings(ITEM_IMAGE_FORMAT='jpeg')
+    def test_jpeg_output(self):
+        thumb = process_image(photo(fmt='PNG'))[-1]
+
+        self.assertEqual((thumb.content_type, thumb.extension), ('image/jpeg', 'jpeg'))
+        self.assertEqual(Image.open(BytesIO(thumb.data)).format, 'JPEG')
+
+    @override_settings(ITEM_IMAGE_MAX_PIXELS=1000)
+    def test_rejects_oversized_images_before_decoding(self):
+        with self.assertRaises(ImageProcessingError):
+            process_image(photo(100, 100))
+
+    def test_rejects_non_images(self):
+        with self.assertRaises(ImageProcessingError):
+            process_image(BytesIO(b'not an image'))
+
+    def test_keys_are_deterministic(self):
+        thumb = process_image(photo(100, 100))[-1]
+
+        self.assertEqual(thumb.key('abc123'), 'abc123/thumb.webp')
+
+
+class UploadTests(TestCase):
+    """The upload endpoint stores every variant and records their URLs."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='uploader',
+            email='uploader@test.com',
+            phone='9300000000'
+        )
+        self.item = Item.objects.create(
+            owner=self.user,
+            title='Drill',
+            category='Tools',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        storage = override_settings(
+            STORAGE_BACKEND='local',
+            STORAGE_LOCAL_ROOT=self.root,
+            STORAGE_LOCAL_BASE_URL='https://cdn.test/',
+        )
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+    def upload(self, content, position=1):
+        return self.client.post(
+            '/api/item-images/upload/',
+            {
+                'file': SimpleUploadedFile('photo.jpg', content, content_type='image/jpeg'),
+                'item_id': str(self.item.id),
+                'position': position,
+            },
+            format='multipart',
+        )
+
+    def test_upload_stores_variants(self):
+        response = self.upload(photo().getvalue())
+
+        self.assertEqual(response.status_code, 201)
+        image = ItemImage.objects.get(item=self.item)
+        prefix = f'https://cdn.test/item-images/{image.content_hash}'
+        self.assertEqual(image.image_url, f'{prefix}/full.webp')
+        self.assertEqual(image.card_url, f'{prefix}/card.webp')
+        self.assertEqual(response.data['thumbnail_url'], f'{prefix}/thumb.webp')
+        stored = Path(self.root, 'item-images', image.content_hash)
+        self.assertEqual(sorted(p.name for p in stored.iterdir()), ['card.webp', 'full.webp', 'thumb.webp'])
+
+    def test_invalid_image_is_rejected_before_storage(self):
+        response = self.upload(b'not an image')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ItemImage.objects.exists())
+        self.assertFalse(Path(self.root, 'item-images').exists())
+
+    def test_delete_removes_every_variant(self):
+        self.upload(photo(100, 100).getvalue())
+        image = ItemImage.objects.get(item=self.item)
+
+        response = self.client.delete(f'/api/item-images/{image.id}/')
+        deletion.drain_all()
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(Path(self.root, 'item-images', image.content_hash).iterdir()), [])
@@ -0,0 +1,103 @@
+"""
+Tests for the orphaned storage object collector.
+Run with: python manage.py test item_images
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from item_images.deletion import enqueue_paths
+from item_images.models import BUCKET_NAME, ImageBlob, ItemImage
+from items.models import Item
+from storage import LocalStorage
+from users.models import User
+
+DAY = 24 * 3600
+
+
+class OrphanCollectorTests(TestCase):
+    """Only objects that nothing refers to are removed."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        storage = override_settings(
+            STORAGE_BACKEND='local',
+            STORAGE_LOCAL_ROOT=self.root,
+            STORAGE_LOCAL_BASE_URL='https://cdn.test/',
+            STORAGE_DELETION_WORKER='off',
+        )
+        storage.enable()
+        self.addCleanup(storage.disable)
+        self.storage = LocalStorage(BUCKET_NAME)
+
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='collector',
+            email='collector@test.com',
+            phone='9600000000'
+        )
+        item = Item.objects.create(
+            owner=self.user,
+            title='Ladder',
+            category='Tools',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+        digest = 'a' * 64
+        legacy = self.put(f'{item.id}/legacy.jpg')
+        ItemImage.objects.create(item=item, position=1, image_url=self.storage.public_url(legacy))
+        ImageBlob.objects.create(
+            content_hash=digest,
+            image_url=self.storage.public_url(self.put(f'{digest}/full.webp')),
+            ref_count=1,
+        )
+        self.put(f'{digest}/thumb.webp')
+        self.user.avatar_url = self.storage.public_url(self.put('avatars/me.jpg'))
+        self.user.save()
+        enqueue_paths(BUCKET_NAME, [self.put('queued/gone.jpg')])
+
+        self.orphans = [self.put(f'{uuid.uuid4()}/old.jpg'), self.put(f'{"b" * 64}/full.webp')]
+        self.put('fresh/upload.webp', age=0)
+
+    def put(self, path, age=2 * DAY):
+        self.storage.put(path, b'x', 'image/jpeg')
+        stamp = time.time() - age
+        os.utime(Path(self.root, BUCKET_NAME, path), (stamp, stamp))
+        return path
+
+    def stored(self):
+        base = Path(self.root, BUCKET_NAME)
+        return {str(p.relative_to(base)) for p in base.rglob('*') if p.is_file()}
+
+    def gc(self, *args):
+        out = StringIO()
+        call_command('gc_storage', '--page-size', '2', '--batch-size', '3', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_reports_without_deleting(self):
+        before = self.stored()
+
+        output = self.gc('--dry-run')
+
+        self.assertIn('scanned=8 recent=1 orphans=2 deleted=0', output)
+        for path in self.orphans:
+            self.assertIn(f'orphan: {BUCKET_NAME}/{path}', output)
+        self.assertEqual(self.stored(), before)
+
+    def test_deletes_only_orphans(self):
+        before = self.stored()
+
+        output = self.gc()
+
+        self.assertIn('orphans=2 deleted=2', output)
+        self.assertEqual(self.stored(), before - set(self.orphans))
@@ -0,0 +1,104 @@
+"""
+Tests for the storage backends.
+Run with: python manage.py test item_images
+"""
+
+import shutil
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.test import SimpleTestCase, override_settings
+
+from storage import LocalStorage, StorageError, SupabaseStorage, get_storage
+
+
+class LocalStorageTests(SimpleTestCase):
+    """The filesystem backend behaves like a bucket."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = LocalStorage('photos', root=self.root, base_url='https://cdn.test/media/')
+
+    def test_put_streams_files_and_bytes(self):
+        self.storage.put('a/one.txt', b'one', 'text/plain')
+        self.storage.put('a/two.txt', BytesIO(b'two'), 'text/plain')
+
+        self.assertEqual(Path(self.root, 'photos', 'a', 'two.txt').read_bytes(), b'two')
+        self.assertEqual([e['name'] for e in self.storage.list('a')], ['one.txt', 'two.txt'])
+        self.assertEqual(self.storage.list(), [{'name': 'a', 'is_dir': True, 'updated_at': None}])
+
+    def test_walk_pages_through_nested_directories(self):
+        for path in ('b/2.txt', 'a/x/1.txt', 'a/0.txt', 'c.txt'):
+            self.storage.put(path, b'x', 'text/plain')
+
+        paths = [entry['path'] for entry in self.storage.walk(page_size=1)]
+
+        self.assertEqual(paths, ['a/0.txt', 'a/x/1.txt', 'b/2.txt', 'c.txt'])
+
+    def test_urls_round_trip(self):
+        url = self.storage.public_url('a/one.txt')
+
+        self.assertEqual(url, 'https://cdn.test/media/photos/a/one.txt')
+        self.assertEqual(self.storage.path_from_url(url), 'a/one.txt')
+        self.assertIsNone(self.storage.path_from_url('https://elsewhere.test/a/one.txt'))
+
+    def test_delete_many_ignores_missing(self):
+        self.storage.put('a/one.txt', b'one', 'text/plain')
+        self.storage.put('a/two.txt', b'two', 'text/plain')
+
+        self.assertEqual(self.storage.delete_many(['a/one.txt', 'a/two.txt', 'a/gone.txt']), 2)
+        self.assertEqual(self.storage.list('a'), [])
+
+    def test_signed_url(self):
+        url = self.storage.signed_url('a/one.txt', expires_in=60)
+        token = parse_qs(urlparse(url).query)['token'][0]
+
+        self.assertTrue(self.storage.verify_signed('a/one.txt', token))
+        self.assertFalse(self.storage.verify_signed('a/other.txt', token))
+
+    def test_rejects_paths_outside_the_bucket(self):
+        with self.assertRaises(StorageError):
+            self.storage.put('../escape.txt', b'x', 'text/plain')
+
+
+class SupabaseStorageTests(SimpleTestCase):
+    """The Supabase backend batches removes and parses its own URLs."""
+
+    def setUp(self):
+        self.client = mock.Mock()
+        self.bucket = self.client.storage.from_.return_value
+        self.storage = SupabaseStorage('item-images', self.client)
+
+    def test_delete_many_batches_requests(self):
+        self.bucket.remove.side_effect = lambda paths: [{}] * len(paths)
+
+        removed = self.storage.delete_many([f'p/{i}' for i in range(2500)])
+
+        self.assertEqual(removed, 2500)
+        self.assertEqual([len(call.args[0]) for call in self.bucket.remove.call_args_list], [1000, 1000, 500])
+
+    def test_errors_are_raised(self):
+        self.bucket.remove.side_effect = RuntimeError('boom')
+
+        with self.assertRaises(StorageError):
+            self.storage.delete('p/1')
+
+    def test_path_from_url(self):
+        url = 'https://x.supabase.co/storage/v1/object/public/item-images/item/img/full.webp?'
+
+        self.assertEqual(self.storage.path_from_url(url), 'item/img/full.webp')
+
+
+class GetStorageTests(SimpleTestCase):
+
+    @override_settings(STORAGE_BACKEND='local')
+    def test_local_backend(self):
+        self.assertIsInstance(get_storage('item-images'), LocalStorage)
+
+    @override_settings(STORAGE_BACKEND='supabase', SUPABASE_URL=None)
+    def test_supabase_without_credentials(self):
+        self.assertIsNone(get_storage('item-images'))
@@ -0,0 +1,139 @@
+"""
+Tests for the storage deletion queue.
+Run with: python manage.py test item_images
+"""
+
+import shutil
+import tempfile
+import uuid
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from item_images import deletion
+from item_images.models import BUCKET_NAME, ItemImage, StorageDeletion, StorageDeletionStatus
+from items.models import Item
+from storage import LocalStorage, StorageError
+from users.models import User
+
+
+class StorageDeletionTests(TestCase):
+    """Deleting images only queues their files; drain() removes them in batches."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        storage = override_settings(
+            STORAGE_BACKEND='local',
+            STORAGE_LOCAL_ROOT=self.root,
+            STORAGE_LOCAL_BASE_URL='https://cdn.test/',
+            STORAGE_DELETION_WORKER='off',
+        )
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+        self.storage = LocalStorage(BUCKET_NAME)
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='deleter',
+            email='deleter@test.com',
+            phone='9400000000'
+        )
+        self.item = Item.objects.create(
+            owner=self.user,
+            title='Tent',
+            category='Outdoors',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+        self.images = [self.add_image(position) for position in (1, 2, 3)]
+
+    def add_image(self, position):
+        urls = {}
+        for variant in ('full', 'card', 'thumb'):
+            path = f'{self.item.id}/{position}/{variant}.webp'
+            self.storage.put(path, b'x', 'image/webp')
+            urls[variant] = self.storage.public_url(path)
+        return ItemImage.objects.create(
+            item=self.item,
+            position=position,
+            image_url=urls['full'],
+            card_url=urls['card'],
+            thumbnail_url=urls['thumb'],
+        )
+
+    def stored(self):
+        return sorted(str(p.relative_to(self.root)) for p in Path(self.root).rglob('*.webp'))
+
+    def test_item_delete_queues_files_without_touching_storage(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with mock.patch('storage.LocalStorage.delete_many') as delete_many:
+            response = client.delete(f'/api/items/{self.item.id}/')
+
+        self.assertEqual(response.status_code, 204)
+        delete_many.assert_not_called()
+        self.assertEqual(StorageDeletion.objects.count(), 9)
+        self.assertEqual(len(self.stored()), 9)
+
+    def test_drain_removes_each_bucket_in_one_request(self):
+        self.user.delete()
+
+        with mock.patch('storage.LocalStorage.delete_many', autospec=True, side_effect=LocalStorage.delete_many) as delete_many:
+            result = deletion.drain()
+
+        self.assertEqual(result, {'claimed': 9, 'deleted': 9, 'skipped': 0, 'retried': 0, 'dead': 0})
+        self.assertEqual(delete_many.call_count, 1)
+        self.assertEqual(self.stored(), [])
+        self.assertFalse(StorageDeletion.objects.exists())
+
+    def test_sync_images_queues_removed_images(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post(
+            f'/api/items/{self.item.id}/images/sync/',
+            {'keep_ids': [str(self.images[0].id)]},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(StorageDeletion.objects.values_list('path', flat=True)),
+            {f'{self.item.id}/{p}/{v}.webp' for p in (2, 3) for v in ('full', 'card', 'thumb')},
+        )
+
+    @override_settings(STORAGE_DELETION_MAX_ATTEMPTS=2)
+    def test_failures_are_retried_then_reported(self):
+        self.images[0].delete()
+
+        with mock.patch('storage.LocalStorage.delete_many', side_effect=StorageError('offline')):
+            first = deletion.drain()
+            StorageDeletion.objects.update(next_attempt_at=self.item.created_at)
+            second = deletion.drain()
+
+        self.assertEqual((first['retried'], second['dead']), (3, 3))
+        self.assertEqual(StorageDeletion.objects.filter(status=StorageDeletionStatus.DEAD).count(), 3)
+
+        out = StringIO()
+        call_command('drain_storage_deletions', '--report', stdout=out)
+        self.assertIn('dead: 3', out.getvalue())
+        self.assertIn(f'{BUCKET_NAME}/{self.item.id}/1/full.webp\toffline', out.getvalue())
+
+        orphans = deletion.report(limit=2)['orphans']
+        self.assertEqual(len(orphans), 2)
+        self.assertEqual(orphans[0]['bucket'], BUCKET_NAME)
+        self.assertEqual(orphans[0]['last_error'], 'offline')
+        out = StringIO()
+        call_command('drain_storage_deletions', '--report', '--limit', '1', stdout=out)
+        self.assertIn('... 2 more', out.getvalue())
+
+        call_command('drain_storage_deletions', '--requeue-dead', '--once', stdout=StringIO())
+        self.assertFalse(StorageDeletion.objects.exists())
+        self.assertEqual(len(self.stored()), 6)
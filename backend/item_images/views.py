@@ -1,19 +1,19 @@
 """DRF views for item images."""
-import uuid
-import os
-from supabase import create_client, Client
-
+from django.conf import settings
 from django.db import transaction
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .models import ItemImage
+from storage import StorageError, get_storage
+from . import blobs
+from .models import BUCKET_NAME, ItemImage
+from .processing import ImageProcessingError, process_image, variant_urls
 from .serializers import ItemImageSerializer
 
 
 class ItemImageViewSet(viewsets.ModelViewSet):
-	queryset = ItemImage.objects.select_related("item")
+	queryset = ItemImage.objects.select_related("item").defer("item__search_vector")
 	serializer_class = ItemImageSerializer
 	permission_classes = [permissions.IsAuthenticated]
 	http_method_names = ["get", "post", "patch", "delete", "head", "options"]
@@ -27,16 +27,14 @@ class ItemImageViewSet(viewsets.ModelViewSet):
 			qs = qs.filter(item_id=item_id)
 		return qs.order_by("position")
 
-	def destroy(self, request, *args, **kwargs):
-		instance = self.get_object()
-		self._delete_storage_file(instance.image_url)
-		return super().destroy(request, *args, **kwargs)
-
 	@action(detail=False, methods=["post"], url_path="upload")
 	def upload(self, request):
-		"""Upload a single file to Supabase Storage and create ItemImage row.
+		"""Resize an uploaded photo, store its variants and create the ItemImage row.
 
-		Expected form-data: file, item_id, position (1-3)
+		Expected form-data: file, item_id, position (1-3). The file is
+		re-encoded into thumb/card/full variants (see processing.py); the
+		original bytes are never stored. Identical uploads share their
+		stored variants (see blobs.py).
 		"""
 		file = request.FILES.get("file")
 		item_id = request.data.get("item_id") or request.data.get("itemId")
@@ -53,57 +51,81 @@ class ItemImageViewSet(viewsets.ModelViewSet):
 		except ValueError:
 			return Response({"detail": "position must be int"}, status=400)
 
-		# Initialize Supabase Client
-		supabase_url = os.getenv("SUPABASE_URL")
-		supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-		
-		if not supabase_url or not supabase_key:
+		max_bytes = getattr(settings, "ITEM_IMAGE_MAX_UPLOAD_BYTES", 15 * 1024 * 1024)
+		if file.size > max_bytes:
+			return Response({"detail": "file is too large"}, status=413)
+
+		# Validate before anything is stored; image URLs are added on save
+		serializer = ItemImageSerializer(data={"item_id": item_id, "position": position}, partial=True)
+		if not serializer.is_valid():
+			return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+		# Content-addressed: a photo that is already stored is not processed again
+		digest = blobs.content_hash(file)
+		with transaction.atomic():
+			blob = blobs.take(digest)
+			if blob is not None:
+				serializer.save(content_hash=digest, **blob.urls())
+				return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+		try:
+			variants = process_image(file)
+		except ImageProcessingError as exc:
+			return Response({"detail": str(exc)}, status=400)
+
+		storage = get_storage(BUCKET_NAME)
+		if storage is None:
 			return Response({"detail": "Server misconfiguration: missing Supabase credentials"}, status=500)
 
+		# Same key, same bytes: a concurrent upload of this photo may
+		# overwrite. Variants left behind by a failed request are not
+		# removed here, since such an upload may be about to register them;
+		# gc_storage collects them once they are old enough.
 		try:
-			supabase: Client = create_client(supabase_url, supabase_key)
-			
-			# Generate unique filename
-			filename = f"{uuid.uuid4()}_{file.name}"
-			# Bucket: item-images (verify this exists in your Supabase dashboard)
-			bucket_name = "item-images"
-			path_on_storage = f"{item_id}/{filename}"
-			
-			# Read file bytes
-			file_content = file.read()
-			
-			# Upload to Supabase
-			res = supabase.storage.from_(bucket_name).upload(
-				path=path_on_storage,
-				file=file_content,
-				file_options={"content-type": file.content_type}
-			)
-			
-			# Get Public URL
-			file_url = supabase.storage.from_(bucket_name).get_public_url(path_on_storage)
-			
-		except Exception as exc:
-			return Response({"detail": f"Supabase upload failed: {exc}"}, status=500)
-
-		serializer = ItemImageSerializer(
-			data={"item_id": item_id, "image_url": file_url, "position": position}
-		)
-		serializer.is_valid(raise_exception=True)
-		serializer.save()
+			urls = self._put_variants(storage, digest, variants)
+			with transaction.atomic():
+				blob = blobs.acquire(
+					digest,
+					variant_urls(urls),
+					restore=lambda: self._put_variants(storage, digest, variants, missing_only=True),
+				)
+				serializer.save(content_hash=digest, **blob.urls())
+		except StorageError as exc:
+			return Response({"detail": f"Storage upload failed: {exc}"}, status=500)
 		return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+	@staticmethod
+	def _put_variants(storage, digest, variants, missing_only=False):
+		"""Store ``variants`` under ``digest``; returns their public URLs by name.
+
+		With ``missing_only``, only variants absent from storage are written,
+		e.g. after a queued removal of an earlier copy ran mid-upload.
+		"""
+		present = set()
+		if missing_only:
+			present = {entry["name"] for entry in storage.list(digest)}
+		urls = {}
+		for variant in variants:
+			path_on_storage = variant.key(digest)
+			if path_on_storage.rsplit("/", 1)[-1] not in present:
+				storage.put(
+					path_on_storage,
+					variant.data,
+					variant.content_type,
+					cache_control="31536000",
+					overwrite=True,
+				)
+			urls[variant.name] = storage.public_url(path_on_storage)
+		return urls
+
 	@action(detail=False, methods=["post"], url_path="delete-by-url")
 	def delete_by_url(self, request):
 		image_url = request.data.get("image_url") or request.data.get("imageUrl")
 		if not image_url:
 			return Response({"detail": "image_url is required"}, status=400)
 
-		qs = ItemImage.objects.filter(image_url=image_url)
-		if not qs.exists():
-			return Response(status=204)
-
-		self._delete_storage_file(image_url)
-		qs.delete()
+		# Stored files are queued for removal by the post_delete signal
+		ItemImage.objects.filter(image_url=image_url).delete()
 		return Response(status=204)
 
 	@action(detail=False, methods=["post"], url_path="delete-not-in-positions")
@@ -117,10 +139,8 @@ class ItemImageViewSet(viewsets.ModelViewSet):
 
 		with transaction.atomic():
 			qs = ItemImage.objects.filter(item_id=item_id).exclude(position__in=positions)
-			for img in qs:
-				self._delete_storage_file(img.image_url)
-			deleted = qs.count()
-			qs.delete()
+			# Stored files are queued for removal by the post_delete signal
+			deleted = qs.delete()[1].get(ItemImage._meta.label, 0)
 		return Response({"deleted": deleted})
 
 	@action(detail=False, methods=["post"], url_path="delete-except-ids")
@@ -134,34 +154,6 @@ class ItemImageViewSet(viewsets.ModelViewSet):
 
 		with transaction.atomic():
 			qs = ItemImage.objects.filter(item_id=item_id).exclude(id__in=allowed_ids)
-			for img in qs:
-				self._delete_storage_file(img.image_url)
-			deleted = qs.count()
-			qs.delete()
+			# Stored files are queued for removal by the post_delete signal
+			deleted = qs.delete()[1].get(ItemImage._meta.label, 0)
 		return Response({"deleted": deleted})
-
-	def _delete_storage_file(self, image_url: str):
-		"""Delete file from Supabase Storage using URL."""
-		if not image_url:
-			return
-		
-		# Try to extract path from URL
-		# URL format: .../storage/v1/object/public/item-images/item_id/filename
-		try:
-			supabase_url = os.getenv("SUPABASE_URL")
-			supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-			if not supabase_url or not supabase_key:
-				return
-
-			supabase: Client = create_client(supabase_url, supabase_key)
-			bucket_name = "item-images" # Match the bucket used in upload
-			
-			# Simple heuristic to extract path: everything after bucket_name + /
-			if bucket_name in image_url:
-				parts = image_url.split(f"/{bucket_name}/")
-				if len(parts) > 1:
-					path_to_delete = parts[1]
-					supabase.storage.from_(bucket_name).remove([path_to_delete])
-		except Exception:
-			# Silent fail allowed for delete
-			pass
@@ -0,0 +1,169 @@
+"""Response cache for the public item feed and item detail endpoints.
+
+Entries live in the Django cache named by ``ITEM_RESPONSE_CACHE`` (Redis
+when ``ITEM_RESPONSE_CACHE_URL`` is set; see settings.py) and hold the
+serialized response data plus its strong ETag.
+
+Invalidation only reaches other workers through a shared cache. With a
+per-process backend (LocMem) entries live for at most
+``ITEM_RESPONSE_CACHE_LOCAL_TIMEOUT`` seconds, 0 by default, which turns
+caching off: responses are built fresh and only revalidated by ETag.
+
+Keys embed version tokens instead of being deleted one by one:
+
+* every feed page key contains the feed version, which is reset on any
+  change to an item, its images or an item owner's public profile;
+* a detail key contains that item's own version, reset only when that
+  item, its images or its owner change.
+
+Resetting a version (deleting its key) makes every entry built on it
+unreachable; those entries then simply expire. Invalidation runs after the
+surrounding transaction commits so a concurrent reader cannot cache the
+pre-commit state under the new version.
+"""
+import hashlib
+import json
+import time
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+FEED_VERSION_KEY = "items:v:feed"
+
+# Backends whose entries are private to one process
+LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# Query params that shape the feed, with their aliases
+LIST_PARAMS = {
+    "categories": ("categories",),
+    "search": ("searchQuery", "search"),
+    "exclude_user_id": ("excludeUserId", "exclude_user_id"),
+    "page": ("page",),
+    "page_size": ("page_size", "pageSize"),
+    "cursor": ("cursor",),
+    "pagination": ("pagination",),
+    "near": ("near",),
+    "radius_km": ("radius_km", "radiusKm"),
+}
+
+
+def _item_version_key(item_id) -> str:
+    return f"items:v:item:{item_id}"
+
+
+def compute_etag(data) -> str:
+    """Strong ETag over the canonical JSON form of ``data``."""
+    body = json.dumps(data, cls=JSONEncoder, sort_keys=True, separators=(",", ":"))
+    return '"%s"' % hashlib.sha256(body.encode()).hexdigest()[:32]
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ItemResponseCache:
+    def __init__(self, alias: Optional[str] = None, timeout: Optional[int] = None):
+        self._alias = alias
+        self._timeout = timeout
+
+    @property
+    def alias(self) -> str:
+        return self._alias or getattr(settings, "ITEM_RESPONSE_CACHE", "default")
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def shared(self) -> bool:
+        """Whether every worker sees the same entries and invalidations."""
+        return settings.CACHES[self.alias]["BACKEND"] not in LOCAL_BACKENDS
+
+    @property
+    def timeout(self) -> int:
+        if self._timeout is not None:
+            return self._timeout
+        timeout = getattr(settings, "ITEM_RESPONSE_CACHE_TIMEOUT", 300)
+        if not self.shared:
+            timeout = min(timeout, getattr(settings, "ITEM_RESPONSE_CACHE_LOCAL_TIMEOUT", 0))
+        return timeout
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout > 0
+
+    def _version(self, key: str) -> int:
+        version = self.cache.get(key)
+        if version is None:
+            # A fresh random-ish token so a reset never reuses an old version
+            self.cache.add(key, time.time_ns(), None)
+            version = self.cache.get(key) or time.time_ns()
+        return version
+
+    # -- keys ---------------------------------------------------------------
+
+    def list_key(self, request) -> str:
+        params = request.query_params
+        normalized = {}
+        for name, aliases in LIST_PARAMS.items():
+            values = []
+            for alias in aliases:
+                values = params.getlist(alias)
+                if values:
+                    break
+            if name == "categories":
+                values = sorted({c for raw in values for c in raw.split(",") if c})
+            if values:
+                normalized[name] = values
+        # next/previous links are absolute, so the host is part of the key
+        normalized["host"] = request.get_host()
+        digest = hashlib.sha256(
+            json.dumps(normalized, sort_keys=True).encode()
+        ).hexdigest()
+        return f"items:list:{self._version(FEED_VERSION_KEY)}:{digest}"
+
+    def detail_key(self, item_id) -> str:
+        return f"items:detail:{item_id}:{self._version(_item_version_key(item_id))}"
+
+    # -- entries ------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Tuple[str, object]]:
+        return self.cache.get(key)
+
+    def set(self, key: str, data) -> str:
+        etag = compute_etag(data)
+        self.cache.set(key, (etag, data), self.timeout)
+        return etag
+
+    # -- invalidation -------------------------------------------------------
+
+    def invalidate_items(self, item_ids: Iterable) -> None:
+        """Reset the feed and the given items' versions once the transaction commits."""
+        keys = [FEED_VERSION_KEY] + [_item_version_key(item_id) for item_id in item_ids]
+        transaction.on_commit(lambda: self.cache.delete_many(keys))
+
+    def invalidate_item(self, item_id) -> None:
+        self.invalidate_items([item_id])
+
+    def invalidate_owners(self, owner_ids: Iterable) -> None:
+        """Invalidate every item of the given owners (their public profile changed)."""
+        if not self.enabled:
+            return
+        from .models import Item
+
+        item_ids = list(Item.objects.filter(owner_id__in=list(owner_ids)).values_list("id", flat=True))
+        if item_ids:
+            self.invalidate_items(item_ids)
+
+
+item_response_cache = ItemResponseCache()
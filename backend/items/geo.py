@@ -0,0 +1,89 @@
+"""Distance filtering for items ("items near me").
+
+Candidate rows are narrowed with a latitude/longitude bounding box that
+the (lat, lng) index can serve, then the exact great-circle distance is
+computed in the database with the haversine formula so results can be
+filtered by radius and ordered by distance.
+
+The bounding box is split in two when it crosses the antimeridian and
+spans every longitude when the search circle reaches a pole.
+"""
+import math
+from typing import List, Tuple
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+# Half the equatorial circumference: a larger radius covers the whole globe
+MAX_RADIUS_KM = 20037.5
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """
+    Return ``(lat_min, lat_max, lng_ranges)`` enclosing the search circle.
+
+    ``lng_ranges`` has one (min, max) pair normally, two when the box
+    wraps across +/-180, and a single full (-180, 180) range near a pole.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    lat_min = lat - math.degrees(angular)
+    lat_max = lat + math.degrees(angular)
+
+    if lat_min <= -90 or lat_max >= 90:
+        return max(lat_min, -90.0), min(lat_max, 90.0), [(-180.0, 180.0)]
+
+    ratio = math.sin(angular) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return lat_min, lat_max, [(-180.0, 180.0)]
+
+    delta_lng = math.degrees(math.asin(ratio))
+    lng_min = lng - delta_lng
+    lng_max = lng + delta_lng
+    if lng_min < -180:
+        return lat_min, lat_max, [(lng_min + 360, 180.0), (-180.0, lng_max)]
+    if lng_max > 180:
+        return lat_min, lat_max, [(lng_min, 180.0), (-180.0, lng_max - 360)]
+    return lat_min, lat_max, [(lng_min, lng_max)]
+
+
+def bounding_box_filter(lat: float, lng: float, radius_km: float) -> Q:
+    lat_min, lat_max, lng_ranges = bounding_box(lat, lng, radius_km)
+    lng_filter = Q()
+    for lng_min, lng_max in lng_ranges:
+        lng_filter |= Q(lng__gte=lng_min, lng__lte=lng_max)
+    return Q(lat__gte=lat_min, lat__lte=lat_max) & lng_filter
+
+
+def haversine_km(lat: float, lng: float):
+    """Database expression for the great-circle distance from (lat, lng) in km."""
+    lat_rad = math.radians(lat)
+    d_lat = (Radians(F("lat")) - Value(lat_rad)) / 2
+    d_lng = (Radians(F("lng")) - Value(math.radians(lng))) / 2
+    a = Power(Sin(d_lat), 2) + Value(math.cos(lat_rad)) * Cos(Radians(F("lat"))) * Power(Sin(d_lng), 2)
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(Least(a, Value(1.0))), output_field=FloatField())
+
+
+def filter_near(queryset, lat: float, lng: float, radius_km: float):
+    """Items within ``radius_km`` of (lat, lng), annotated with ``distance_km``."""
+    radius_km = min(radius_km, MAX_RADIUS_KM)
+    return (
+        queryset
+        .filter(lat__isnull=False, lng__isnull=False)
+        .filter(bounding_box_filter(lat, lng, radius_km))
+        .annotate(distance_km=haversine_km(lat, lng))
+        .filter(distance_km__lte=radius_km)
+    )
+
+
+def parse_near(near: str, radius: str = None, default_radius_km: float = 10.0) -> Tuple[float, float, float]:
+    """Parse ``near=lat,lng`` and ``radius_km=`` query params; raises ValueError."""
+    lat_raw, lng_raw = near.split(",")
+    lat = float(lat_raw)
+    lng = float(lng_raw)
+    if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+        raise ValueError("near must be lat,lng within [-90, 90] and [-180, 180]")
+    radius_km = float(radius) if radius else default_radius_km
+    if not radius_km > 0 or math.isinf(radius_km):
+        raise ValueError("radius_km must be a positive number")
+    return lat, lng, radius_km
@@ -0,0 +1,113 @@
+"""Benchmark the ?near= distance query against a large seeded catalogue.
+
+Usage:
+    python manage.py benchmark_nearby --seed 1000000
+    python manage.py benchmark_nearby --queries 200 --radius-km 10
+    python manage.py benchmark_nearby --cleanup
+"""
+import math
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from items.geo import filter_near
+from items.models import Item
+from users.models import User
+
+BENCH_USERNAME = "benchmark_nearby"
+
+
+class Command(BaseCommand):
+    help = "Seed items with random coordinates and time distance-ordered queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Number of items to insert first.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--queries", type=int, default=100, help="Number of timed queries.")
+        parser.add_argument("--radius-km", type=float, default=10.0)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--explain", action="store_true", help="Print the query plan once.")
+        parser.add_argument("--cleanup", action="store_true", help="Delete seeded items and exit.")
+
+    def handle(self, *args, **options):
+        owner, _ = User.objects.get_or_create(
+            username=BENCH_USERNAME,
+            defaults={"email": None, "phone": None},
+        )
+
+        if options["cleanup"]:
+            # Raw DELETE: a queryset delete would fire pre_delete per item
+            owner_id = Item._meta.get_field("owner").target_field.get_db_prep_value(owner.pk, connection)
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {Item._meta.db_table} WHERE owner_id = %s", [owner_id])
+                deleted = cursor.rowcount
+            owner.delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} seeded items"))
+            return
+
+        if options["seed"]:
+            self._seed(owner, options["seed"], options["batch_size"])
+
+        total = Item.objects.filter(lat__isnull=False).count()
+        self.stdout.write(f"Items with coordinates: {total}")
+
+        rng = random.Random(42)
+        timings = []
+        results = []
+        for i in range(options["queries"]):
+            lat, lng = self._random_point(rng)
+            qs = filter_near(Item.objects.all(), lat, lng, options["radius_km"]).order_by("distance_km", "id")
+            if i == 0 and options["explain"]:
+                self.stdout.write(qs[:options["page_size"]].explain())
+            started = time.perf_counter()
+            rows = list(qs.values_list("id", "distance_km")[:options["page_size"]])
+            timings.append((time.perf_counter() - started) * 1000)
+            results.append(len(rows))
+
+        if not timings:
+            return
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(timings)} queries, radius {options['radius_km']} km: "
+            f"p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms max={timings[-1]:.2f}ms "
+            f"avg rows={statistics.mean(results):.1f}"
+        ))
+
+    @staticmethod
+    def _random_point(rng):
+        """Uniform on the sphere, so polar and antimeridian cases are exercised too."""
+        return random_lat(rng), rng.uniform(-180, 180)
+
+    def _seed(self, owner, count, batch_size):
+        rng = random.Random(1)
+        created = 0
+        started = time.perf_counter()
+        while created < count:
+            size = min(batch_size, count - created)
+            batch = [
+                Item(
+                    owner=owner,
+                    title=f"Bench item {created + i}",
+                    category="Benchmark",
+                    description="Seeded by benchmark_nearby",
+                    estimated_value=100,
+                    deposit_amount=10,
+                    lat=random_lat(rng),
+                    lng=rng.uniform(-180, 180),
+                )
+                for i in range(size)
+            ]
+            with transaction.atomic():
+                Item.objects.bulk_create(batch, batch_size=size)
+            created += size
+            self.stdout.write(f"Seeded {created}/{count}", ending="\r")
+        self.stdout.write(f"Seeded {created} items in {time.perf_counter() - started:.1f}s")
+
+
+def random_lat(rng):
+    """Latitude drawn uniformly by area rather than by degree."""
+    return math.degrees(math.asin(rng.uniform(-1, 1)))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("items", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="items_created_id_idx"
+            ),
+        ),
+    ]
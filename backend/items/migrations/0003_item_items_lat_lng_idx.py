@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("items", "0002_item_items_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(fields=["lat", "lng"], name="items_lat_lng_idx"),
+        ),
+    ]
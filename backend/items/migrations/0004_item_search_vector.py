@@ -0,0 +1,70 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:45
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The trigger, backfill and GIN indexes only exist on PostgreSQL; other
+# backends keep the column empty and search falls back to LIKE matching.
+CREATE_SEARCH_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE OR REPLACE FUNCTION items_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.category, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS items_search_vector_trigger ON items",
+    """
+    CREATE TRIGGER items_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, category, description ON items
+    FOR EACH ROW EXECUTE FUNCTION items_search_vector_update()
+    """,
+    # Fires the trigger once for every existing row
+    "UPDATE items SET title = title",
+    "CREATE INDEX IF NOT EXISTS items_search_vector_idx ON items USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS items_title_trgm_idx ON items USING gin (title gin_trgm_ops)",
+]
+
+DROP_SEARCH_SQL = [
+    "DROP INDEX IF EXISTS items_title_trgm_idx",
+    "DROP INDEX IF EXISTS items_search_vector_idx",
+    "DROP TRIGGER IF EXISTS items_search_vector_trigger ON items",
+    "DROP FUNCTION IF EXISTS items_search_vector_update()",
+]
+
+
+def create_search_objects(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in CREATE_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_objects(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in DROP_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("items", "0003_item_items_lat_lng_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="item",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_objects, drop_search_objects),
+    ]
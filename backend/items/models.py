@@ -1,9 +1,17 @@
 """Item models."""
 import uuid
 
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
+class ItemManager(models.Manager):
+	"""Leaves out ``search_vector``: only search.py uses it, and only in SQL."""
+
+	def get_queryset(self):
+		return super().get_queryset().defer("search_vector")
+
+
 class Item(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	owner = models.ForeignKey(
@@ -23,10 +31,22 @@ class Item(models.Model):
 	is_available = models.BooleanField(default=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
+	# Weighted title/category/description tsvector, maintained by a database
+	# trigger on PostgreSQL (see migration 0004); unused on other backends.
+	# Deferred by default; see ItemManager.
+	search_vector = SearchVectorField(null=True, editable=False)
+
+	objects = ItemManager()
 
 	class Meta:
 		db_table = "items"
 		ordering = ["-created_at"]
+		indexes = [
+			# Keyset pagination of the feed: ORDER BY created_at DESC, id DESC
+			models.Index(fields=["-created_at", "-id"], name="items_created_id_idx"),
+			# Bounding-box prefilter for ?near= distance queries
+			models.Index(fields=["lat", "lng"], name="items_lat_lng_idx"),
+		]
 
 	def __str__(self) -> str:
 		return self.title
@@ -0,0 +1,74 @@
+"""Item search (?searchQuery=).
+
+On PostgreSQL, items are matched against the ``search_vector`` column
+(title weighted A, category B, description C) with prefix matching so
+partially typed words hit, OR'ed with a trigram word-similarity match on
+the title to tolerate typos. Results are ranked by text rank plus title
+similarity. Both predicates are served by GIN indexes created in
+migration 0004; a trigger keeps ``search_vector`` up to date on every
+insert and update.
+
+Other backends (SQLite in local development and tests) fall back to
+matching every search term case-insensitively in title, description or
+category, newest first.
+"""
+import re
+from typing import List, Tuple
+
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast, Coalesce
+
+# Language-agnostic config: listings are written in English, French and Arabic
+SEARCH_CONFIG = "simple"
+MAX_TERMS = 8
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query: str) -> List[str]:
+    return _TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def search_items(queryset, query: str) -> Tuple[object, tuple]:
+    """Filter ``queryset`` by ``query``; returns ``(queryset, ordering)``."""
+    terms = search_terms(query)
+    if not terms:
+        return queryset, ("-created_at", "-id")
+
+    if connection.vendor == "postgresql":
+        return _search_postgres(queryset, query, terms)
+    return _search_fallback(queryset, terms)
+
+
+def _search_postgres(queryset, query: str, terms: List[str]):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+
+    # Every term must match the start of a word, so "dri" already finds "drill"
+    raw = " & ".join(f"{term}:*" for term in terms)
+    ts_query = SearchQuery(raw, config=SEARCH_CONFIG, search_type="raw")
+
+    queryset = (
+        queryset
+        .filter(Q(search_vector=ts_query) | Q(title__trigram_word_similar=query))
+        .annotate(
+            # ts_rank and word_similarity return real; cast the sum to double
+            # precision so cursor values compare equal on tied ranks
+            search_rank=Cast(
+                Coalesce(SearchRank(F("search_vector"), ts_query), Value(0.0))
+                + TrigramWordSimilarity(query, "title"),
+                FloatField(),
+            ),
+        )
+    )
+    return queryset, ("-search_rank", "-id")
+
+
+def _search_fallback(queryset, terms: List[str]):
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term)
+            | Q(description__icontains=term)
+            | Q(category__icontains=term)
+        )
+    return queryset, ("-created_at", "-id")
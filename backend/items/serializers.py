@@ -11,6 +11,8 @@ class ItemSerializer(serializers.ModelSerializer):
 	owner_id = serializers.UUIDField(read_only=True)
 	owner = UserPublicSerializer(read_only=True)
 	images = ItemImageSerializer(many=True, read_only=True)
+	# Only set when the feed is filtered with ?near=lat,lng
+	distance_km = serializers.SerializerMethodField()
 
 	# Accept UI MM/DD/YYYY, plain date, and ISO datetimes the app may send
 	_date_input_formats = [
@@ -48,8 +50,13 @@ class ItemSerializer(serializers.ModelSerializer):
 			"created_at",
 			"updated_at",
 			"images",
+			"distance_km",
 		]
 
+	def get_distance_km(self, obj):
+		distance = getattr(obj, "distance_km", None)
+		return round(distance, 3) if distance is not None else None
+
 	def validate(self, data):
 		"""Validate date ranges and business logic."""
 		start_date = data.get("start_date")
@@ -1,8 +1,11 @@
 """Signals for items app."""
-from django.db.models.signals import pre_delete, pre_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
+from .cache import item_response_cache
 from .models import Item
 from bookings.models import Booking, BookingStatus
+from item_images.models import ItemImage
+from users.models import User
 
 
 @receiver(pre_delete, sender=Item)
@@ -10,14 +13,12 @@ def item_deleted_handler(sender, instance, **kwargs):
     """Handle notifications when item is deleted."""
     from notifications.services import NotificationService
     
-    # Get all active bookings for this item
+    # Get all active bookings for this item; notifications are created in bulk
     affected_bookings = Booking.objects.filter(
         item=instance,
         status__in=[BookingStatus.PENDING, BookingStatus.ACCEPTED, BookingStatus.ACTIVE]
-    ).select_related('borrower', 'owner')
-    
-    if affected_bookings.exists():
-        NotificationService.create_item_deleted_notification(instance, affected_bookings)
+    )
+    NotificationService.create_item_deleted_notification(instance, affected_bookings)
 
 
 @receiver(pre_save, sender=Item)
@@ -35,9 +36,28 @@ def item_availability_changed_handler(sender, instance, **kwargs):
                 affected_bookings = Booking.objects.filter(
                     item=instance,
                     status=BookingStatus.PENDING
-                ).select_related('borrower', 'owner')
-                
-                if affected_bookings.exists():
-                    NotificationService.create_item_unavailable_notification(instance, affected_bookings)
+                )
+                NotificationService.create_item_unavailable_notification(instance, affected_bookings)
         except Item.DoesNotExist:
             pass
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def item_cache_handler(sender, instance, **kwargs):
+    """Drop cached feed pages and this item's detail response."""
+    item_response_cache.invalidate_item(instance.pk)
+
+
+@receiver(post_save, sender=ItemImage)
+@receiver(post_delete, sender=ItemImage)
+def item_image_cache_handler(sender, instance, **kwargs):
+    """Images are embedded in item responses."""
+    item_response_cache.invalidate_item(instance.item_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def item_owner_cache_handler(sender, instance, **kwargs):
+    """The owner's public profile is embedded in their items' responses."""
+    item_response_cache.invalidate_owners([instance.pk])
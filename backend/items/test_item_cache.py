@@ -0,0 +1,147 @@
+"""
+Tests for the item list/detail response cache.
+Run with: python manage.py test items
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from item_images.models import ItemImage
+from items.cache import item_response_cache
+from items.models import Item
+from users.models import User
+
+
+# One test process, so a per-process cache is consistent
+@override_settings(ITEM_RESPONSE_CACHE_LOCAL_TIMEOUT=300)
+class ItemResponseCacheTests(APITestCase):
+    """Anonymous feed/detail reads are cached, revalidated and invalidated."""
+
+    def setUp(self):
+        caches[settings.ITEM_RESPONSE_CACHE].clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='cacheuser',
+            email='cache@test.com',
+            phone='5555555555'
+        )
+        self.drill = self.create_item('Drill', 'Tools')
+        self.tent = self.create_item('Tent', 'Outdoors')
+
+    def create_item(self, title, category):
+        return Item.objects.create(
+            owner=self.user,
+            title=title,
+            category=category,
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+
+    def get(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertIn(response.status_code, (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED))
+        return response
+
+    def test_second_read_is_served_from_cache(self):
+        first = self.get('/api/items/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.get('/api/items/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.data, first.data)
+
+    def test_equivalent_params_share_an_entry(self):
+        self.get('/api/items/?categories=Tools,Outdoors&searchQuery=t')
+        response = self.get('/api/items/?search=t&categories=Outdoors&categories=Tools')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_matching_etag_returns_304(self):
+        etag = self.get(f'/api/items/{self.drill.id}/')['ETag']
+
+        response = self.get(f'/api/items/{self.drill.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+    def test_item_update_invalidates_feed_and_its_detail_only(self):
+        feed_etag = self.get('/api/items/')['ETag']
+        drill_etag = self.get(f'/api/items/{self.drill.id}/')['ETag']
+        self.get(f'/api/items/{self.tent.id}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.drill.title = 'Hammer drill'
+            self.drill.save()
+
+        feed = self.get('/api/items/', HTTP_IF_NONE_MATCH=feed_etag)
+        self.assertEqual(feed.status_code, status.HTTP_200_OK)
+        self.assertIn('Hammer drill', [item['title'] for item in feed.data['results']])
+        drill = self.get(f'/api/items/{self.drill.id}/', HTTP_IF_NONE_MATCH=drill_etag)
+        self.assertEqual(drill.status_code, status.HTTP_200_OK)
+        self.assertEqual(drill['X-Cache'], 'MISS')
+        self.assertEqual(self.get(f'/api/items/{self.tent.id}/')['X-Cache'], 'HIT')
+
+    def test_image_change_invalidates_item_detail(self):
+        self.get(f'/api/items/{self.drill.id}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ItemImage.objects.create(item=self.drill, image_url='https://x/1.jpg', position=1)
+
+        response = self.get(f'/api/items/{self.drill.id}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['images']), 1)
+
+    def test_owner_profile_change_invalidates_their_items(self):
+        self.get(f'/api/items/{self.drill.id}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = 'renamed'
+            self.user.save()
+
+        response = self.get(f'/api/items/{self.drill.id}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['owner']['username'], 'renamed')
+
+
+class UnsharedItemCacheTests(APITestCase):
+    """A per-process cache is not used unless allowed; ETags still work."""
+
+    def test_local_cache_is_bypassed(self):
+        user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='nocacheuser',
+            email='nocache@test.com',
+            phone='5555555556'
+        )
+        item = Item.objects.create(
+            owner=user,
+            title='Ladder',
+            category='Tools',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+        client = APIClient()
+
+        first = client.get(f'/api/items/{item.id}/', HTTP_ACCEPT='application/json')
+        second = client.get(
+            f'/api/items/{item.id}/',
+            HTTP_ACCEPT='application/json',
+            HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+
+        self.assertNotIn('X-Cache', first)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(caches[settings.ITEM_RESPONSE_CACHE].get(f'items:v:item:{item.id}'), None)
+
+    def test_disabled_cache_skips_owner_invalidation(self):
+        with self.assertNumQueries(0):
+            item_response_cache.invalidate_owners([uuid.uuid4()])
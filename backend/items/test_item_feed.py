@@ -0,0 +1,235 @@
+"""
+Tests for the public item feed (GET /api/items/).
+Run with: python manage.py test items
+"""
+
+import uuid
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import FloatField, Value
+from django.db.models.functions import Cast
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from items.models import Item
+from users.models import User
+
+
+class ItemCursorPaginationTests(APITestCase):
+    """Opt-in keyset pagination walks the feed without gaps or repeats."""
+
+    def setUp(self):
+        caches[settings.ITEM_RESPONSE_CACHE].clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='feeduser',
+            email='feed@test.com',
+            phone='6666666666'
+        )
+        self.items = [
+            Item.objects.create(
+                owner=self.user,
+                title=f'Item {i}',
+                category='Tools',
+                description='Test',
+                estimated_value=100,
+                deposit_amount=10,
+            )
+            for i in range(7)
+        ]
+
+    def walk(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen += [str(item['id']) for item in response.data['results']]
+            url = response.data['next']
+        return seen
+
+    def test_walks_all_items_with_tied_timestamps(self):
+        # Same created_at for every row: the id tie-breaker must keep pages stable
+        Item.objects.update(created_at=self.items[0].created_at)
+
+        seen = self.walk('/api/items/?pagination=cursor&page_size=3')
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(set(seen), {str(item.id) for item in self.items})
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get('/api/items/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_next_page_uses_a_row_comparison(self):
+        cursor = self.client.get('/api/items/?pagination=cursor&page_size=3').data['next_cursor']
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/items/?pagination=cursor&page_size=3&cursor={cursor}')
+
+        page_sql = next(q['sql'] for q in queries.captured_queries if 'ORDER BY' in q['sql'])
+        self.assertRegex(page_sql, r'\("items"\."created_at", "items"\."id"\) < \(')
+
+    def test_feed_does_not_load_search_vector(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/items/')
+
+        self.assertTrue(queries.captured_queries)
+        self.assertFalse(any('search_vector' in q['sql'] for q in queries.captured_queries))
+
+    def test_page_number_pagination_remains_default(self):
+        response = self.client.get('/api/items/?page=1&page_size=3')
+        self.assertEqual(response.data['count'], 7)
+
+
+class ItemNearFilterTests(APITestCase):
+    """?near= filters by great-circle distance and orders nearest first."""
+
+    def setUp(self):
+        caches[settings.ITEM_RESPONSE_CACHE].clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='geouser',
+            email='geo@test.com',
+            phone='7777777777'
+        )
+
+    def create_item(self, title, lat, lng):
+        return Item.objects.create(
+            owner=self.user,
+            title=title,
+            category='Tools',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+            lat=lat,
+            lng=lng,
+        )
+
+    def titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['title'] for item in response.data['results']]
+
+    def test_orders_by_distance_within_radius(self):
+        self.create_item('far', 36.80, 3.30)      # ~25 km away
+        self.create_item('near', 36.76, 3.06)     # ~1 km away
+        self.create_item('other city', 35.70, -0.63)
+        self.create_item('no location', None, None)
+
+        titles = self.titles('/api/items/?near=36.7538,3.0588&radius_km=50')
+
+        self.assertEqual(titles, ['near', 'far'])
+
+    def test_crosses_antimeridian(self):
+        self.create_item('east', -17.0, 179.9)
+        self.create_item('west', -17.0, -179.9)
+        self.create_item('far west', -17.0, -170.0)
+
+        titles = self.titles('/api/items/?near=-17.0,179.95&radius_km=50')
+
+        self.assertEqual(sorted(titles), ['east', 'west'])
+
+    def test_includes_all_longitudes_at_pole(self):
+        self.create_item('a', 89.95, 0.0)
+        self.create_item('b', 89.95, 180.0)
+        self.create_item('c', 89.95, -90.0)
+
+        titles = self.titles('/api/items/?near=90,0&radius_km=10')
+
+        self.assertEqual(sorted(titles), ['a', 'b', 'c'])
+
+    def test_cursor_pages_by_distance(self):
+        for i in range(5):
+            self.create_item(f'item {i}', 36.75 + i * 0.01, 3.05)
+
+        seen = []
+        url = '/api/items/?near=36.75,3.05&radius_km=20&pagination=cursor&page_size=2'
+        while url:
+            response = self.client.get(url)
+            seen += [item['title'] for item in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(seen, [f'item {i}' for i in range(5)])
+
+    def test_invalid_near_returns_400(self):
+        response = self.client.get('/api/items/?near=91,0')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ItemSearchTests(APITestCase):
+    """?searchQuery= matches every term in title, category or description."""
+
+    def setUp(self):
+        caches[settings.ITEM_RESPONSE_CACHE].clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='searchuser',
+            email='search@test.com',
+            phone='8888888888'
+        )
+        self.create_item('Cordless drill', 'Tools', 'Comes with two batteries')
+        self.create_item('Camping tent', 'Outdoors', 'Sleeps four, easy to pitch')
+        self.create_item('Hammer drill', 'Tools', 'Heavy duty, for concrete')
+
+    def create_item(self, title, category, description):
+        return Item.objects.create(
+            owner=self.user,
+            title=title,
+            category=category,
+            description=description,
+            estimated_value=100,
+            deposit_amount=10,
+        )
+
+    def titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['title'] for item in response.data['results']]
+
+    def test_matches_partial_word(self):
+        self.assertEqual(
+            sorted(self.titles('/api/items/?searchQuery=dri')),
+            ['Cordless drill', 'Hammer drill'],
+        )
+
+    def test_every_term_must_match_any_field(self):
+        self.assertEqual(self.titles('/api/items/?searchQuery=drill%20concrete'), ['Hammer drill'])
+        self.assertEqual(self.titles('/api/items/?search=outdoors'), ['Camping tent'])
+
+    def test_search_with_cursor_pagination(self):
+        response = self.client.get('/api/items/?searchQuery=drill&pagination=cursor&page_size=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = response.data['results'][0]['title']
+        response = self.client.get(response.data['next'])
+        self.assertEqual(
+            sorted([first, response.data['results'][0]['title']]),
+            ['Cordless drill', 'Hammer drill'],
+        )
+        self.assertIsNone(response.data['next'])
+
+    def test_cursor_pages_across_tied_ranks(self):
+        def tied(queryset, query):
+            rank = Cast(Value(1 / 3), FloatField())
+            return queryset.annotate(search_rank=rank), ('-search_rank', '-id')
+
+        seen = []
+        url = '/api/items/?searchQuery=any&pagination=cursor&page_size=1'
+        with mock.patch('items.views.search_items', tied):
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                seen += [item['title'] for item in response.data['results']]
+                url = response.data['next']
+
+        self.assertEqual(sorted(seen), ['Camping tent', 'Cordless drill', 'Hammer drill'])
+
+    def test_punctuation_only_query_returns_feed(self):
+        self.assertEqual(len(self.titles('/api/items/?searchQuery=%26%21')), 3)
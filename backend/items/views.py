@@ -1,13 +1,21 @@
 """DRF views for items."""
+from django.utils import timezone
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
+from bookings.availability import availability_window, item_availability
 from item_images.models import ItemImage
+from pagination import KeysetPagination
 from item_images.serializers import ItemImageSerializer
+from .cache import compute_etag, etag_matches, item_response_cache
+from .geo import filter_near, parse_near
 from .models import Item
 from .permissions import IsItemOwner
+from .search import search_items
 from .serializers import ItemSerializer
 
 
@@ -28,15 +36,39 @@ class ItemPagination(PageNumberPagination):
 		return self.page_size
 
 
+class ItemCursorPagination(KeysetPagination):
+	"""Keyset pagination on (created_at, id); no COUNT and no OFFSET."""
+
+	ordering = ("-created_at", "-id")
+
+
 class ItemViewSet(viewsets.ModelViewSet):
 	queryset = Item.objects.select_related("owner").prefetch_related("images")
 	serializer_class = ItemSerializer
 	pagination_class = ItemPagination
 	permission_classes = [permissions.IsAuthenticated]
 
+	@property
+	def paginator(self):
+		"""Use keyset pagination when the client opts in.
+
+		Opt in with ?pagination=cursor (first page) or by passing a
+		?cursor= token returned as next_cursor by a previous page.
+		"""
+		if not hasattr(self, "_paginator"):
+			params = self.request.query_params
+			if params.get("cursor") or params.get("pagination") == "cursor":
+				# Pages follow the feed's ordering: distance, relevance or recency
+				self._paginator = ItemCursorPagination(
+					ordering=getattr(self, "feed_ordering", None)
+				)
+			else:
+				self._paginator = self.pagination_class()
+		return self._paginator
+
 	def get_permissions(self):
 		"""Override permissions: list/retrieve/images are public, create requires auth, update/delete require owner."""
-		if self.action in ['list', 'retrieve', 'images']:
+		if self.action in ['list', 'retrieve', 'images', 'availability']:
 			return [permissions.AllowAny()]
 		if self.action in ['update', 'partial_update', 'destroy']:
 			return [permissions.IsAuthenticated(), IsItemOwner()]
@@ -59,12 +91,75 @@ class ItemViewSet(viewsets.ModelViewSet):
 		if categories and "All" not in categories:
 			qs = qs.filter(category__in=categories)
 
+		self.feed_ordering = None
 		search = params.get("searchQuery") or params.get("search")
 		if search:
-			qs = qs.filter(title__icontains=search)
+			qs, self.feed_ordering = search_items(qs, search)
+			qs = qs.order_by(*self.feed_ordering)
+
+		# Location filter: near=lat,lng&radius_km=10, nearest first
+		near = params.get("near")
+		if near:
+			try:
+				lat, lng, radius_km = parse_near(
+					near, params.get("radius_km") or params.get("radiusKm")
+				)
+			except ValueError as exc:
+				raise ValidationError({"near": str(exc) or "near must be lat,lng"})
+			self.feed_ordering = ("distance_km", "id")
+			qs = filter_near(qs, lat, lng, radius_km).order_by(*self.feed_ordering)
 
 		return qs
 
+	def list(self, request, *args, **kwargs):
+		return self._cached_response(
+			request,
+			lambda: item_response_cache.list_key(request),
+			lambda: super(ItemViewSet, self).list(request, *args, **kwargs),
+		)
+
+	def retrieve(self, request, *args, **kwargs):
+		pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+		return self._cached_response(
+			request,
+			lambda: item_response_cache.detail_key(pk),
+			lambda: super(ItemViewSet, self).retrieve(request, *args, **kwargs),
+		)
+
+	def _cached_response(self, request, make_key, build):
+		"""Serve list/retrieve from the response cache, answering 304 on ETag match.
+
+		Only JSON responses are cached; the browsable API always renders fresh.
+		Without a shared cache (see items/cache.py) responses are built fresh
+		but still carry an ETag.
+		"""
+		if getattr(request.accepted_renderer, "format", None) != "json":
+			return build()
+
+		if not item_response_cache.enabled:
+			response = build()
+			if response.status_code != status.HTTP_200_OK:
+				return response
+			etag = compute_etag(response.data)
+		else:
+			key = make_key()
+			entry = item_response_cache.get(key)
+			if entry is None:
+				response = build()
+				if response.status_code != status.HTTP_200_OK:
+					return response
+				etag = item_response_cache.set(key, response.data)
+				response["X-Cache"] = "MISS"
+			else:
+				etag, data = entry
+				response = Response(data)
+				response["X-Cache"] = "HIT"
+
+		if etag_matches(request, etag):
+			response = Response(status=status.HTTP_304_NOT_MODIFIED)
+		response["ETag"] = etag
+		return response
+
 	@action(detail=False, methods=["get"], url_path="my-items")
 	def my_items(self, request):
 		"""Get current user's items (their listings).
@@ -90,6 +185,31 @@ class ItemViewSet(viewsets.ModelViewSet):
 		serializer = self.get_serializer(qs, many=True)
 		return Response(serializer.data)
 
+	@action(detail=True, methods=["get"], url_path="availability")
+	def availability(self, request, pk=None):
+		"""Free/busy intervals for an item.
+
+		GET /api/items/{id}/availability/?from=YYYY-MM-DD&to=YYYY-MM-DD
+		Intervals are half-open: "end" is the first day the item is free again.
+		"""
+		item = get_object_or_404(Item.objects.only("id"), pk=pk)
+		try:
+			date_from, date_to = availability_window(
+				request.query_params.get("from"),
+				request.query_params.get("to"),
+				timezone.localdate(),
+			)
+		except ValueError as exc:
+			raise ValidationError({"detail": str(exc)})
+
+		intervals = item_availability(item.pk, date_from, date_to)
+		return Response({
+			"item_id": item.pk,
+			"from": date_from,
+			"to": date_to,
+			**intervals,
+		})
+
 	@action(detail=True, methods=["get", "post"], url_path="images")
 	def images(self, request, pk=None):
 		item = self.get_object()
@@ -120,6 +240,8 @@ class ItemViewSet(viewsets.ModelViewSet):
 
 		for idx, img_id in enumerate(ordered_ids, start=1):
 			ItemImage.objects.filter(item=item, id=img_id).update(position=idx)
+		# QuerySet.update() sends no signals
+		item_response_cache.invalidate_item(item.id)
 
 		return Response({"status": "ok"})
 
@@ -139,16 +261,7 @@ class ItemViewSet(viewsets.ModelViewSet):
 		item = self.get_object()
 		# Check permissions before deletion
 		self.check_object_permissions(request, item)
-		# Clean up related images (DB and storage) before deleting item
-		images = list(item.images.all())
-		for img in images:
-			try:
-				from item_images.views import ItemImageViewSet
-
-				ItemImageViewSet()._delete_storage_file(img.image_url)
-			except Exception:
-				pass
-			img.delete()
+		# Images go by cascade; their stored files are queued for removal
 		return super().destroy(request, *args, **kwargs)
 
 	@action(detail=True, methods=["post"], url_path="images/sync")
@@ -175,13 +288,7 @@ class ItemViewSet(viewsets.ModelViewSet):
 		to_delete = ItemImage.objects.filter(item=item).exclude(id__in=keep_ids)
 		if remove_urls:
 			to_delete = ItemImage.objects.filter(item=item, image_url__in=remove_urls) | to_delete
-		for img in to_delete.distinct():
-			try:
-				from item_images.views import ItemImageViewSet
-
-				ItemImageViewSet()._delete_storage_file(img.image_url)
-			except Exception:
-				pass
+		# Stored files are queued for removal by the post_delete signal
 		to_delete.distinct().delete()
 
 		created = []
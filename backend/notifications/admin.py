@@ -1,6 +1,6 @@
 """Admin configuration for notifications."""
 from django.contrib import admin
-from .models import Notification, UserDevice
+from .models import Notification, NotificationOutbox, UserDevice
 
 
 @admin.register(Notification)
@@ -65,3 +65,33 @@ class UserDeviceAdmin(admin.ModelAdmin):
         'updated_at',
         'last_used_at',
     ]
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    """Admin interface for pending and dead-lettered deliveries."""
+    
+    list_display = [
+        'id',
+        'notification',
+        'channel',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+    ]
+    list_filter = [
+        'channel',
+        'status',
+    ]
+    search_fields = [
+        'notification__id',
+        'last_error',
+    ]
+    readonly_fields = [
+        'id',
+        'notification',
+        'created_at',
+        'updated_at',
+        'sent_at',
+    ]
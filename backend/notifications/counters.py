@@ -0,0 +1,107 @@
+"""Per-user unread notification counters.
+
+The badge count is read from ``UnreadCounter`` (one primary-key lookup,
+cached for ``NOTIFICATION_UNREAD_CACHE_TIMEOUT`` seconds) instead of a
+COUNT(*) over the notifications table. Every service method that changes
+what is unread adjusts the counter with an atomic ``F()`` update in the
+same transaction, and cached values are dropped once it commits.
+
+A missing counter row is seeded from the notifications table the first
+time it is needed. ``python manage.py reconcile_unread_counts`` repairs
+any drift, e.g. from notifications changed with raw SQL.
+"""
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+from .models import Notification, UnreadCounter
+
+
+def _cache_key(user_id) -> str:
+    return f"notifications:unread:{user_id}"
+
+
+def invalidate(user_ids: Iterable) -> None:
+    """Drop cached counts and stream the new ones once the transaction commits."""
+    from .stream import broker
+
+    user_ids = list(user_ids)
+
+    def on_commit():
+        cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+        broker.publish_unread(user_ids)
+
+    transaction.on_commit(on_commit)
+
+
+def count_unread(user_ids: Iterable) -> Dict:
+    """Unread counts computed from the notifications table, one GROUP BY."""
+    user_ids = list(user_ids)
+    counts = {user_id: 0 for user_id in user_ids}
+    counts.update(
+        Notification.objects.filter(
+            recipient_id__in=user_ids,
+            is_read=False,
+            deleted_at__isnull=True,
+        )
+        .order_by()
+        .values("recipient_id")
+        .annotate(unread=Count("id"))
+        .values_list("recipient_id", "unread")
+    )
+    return counts
+
+
+def seed(user_ids: Iterable) -> Dict:
+    """Create missing counter rows from the notifications table."""
+    counts = count_unread(user_ids)
+    # A concurrent seeder may win; its row is as good as ours
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, unread_count=count) for user_id, count in counts.items()],
+        ignore_conflicts=True,
+    )
+    return counts
+
+
+def adjust(deltas: Dict) -> None:
+    """Add ``deltas`` ({user_id: change}) to the users' counters in one UPDATE."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    if len(deltas) == 1:
+        change = F("unread_count") + next(iter(deltas.values()))
+    else:
+        change = F("unread_count") + Case(
+            *[When(user_id=user_id, then=Value(delta)) for user_id, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    updated = UnreadCounter.objects.filter(user_id__in=deltas).update(unread_count=change)
+
+    if updated < len(deltas):
+        # Seeding counts the table, which already reflects this change
+        existing = set(
+            UnreadCounter.objects.filter(user_id__in=deltas).values_list("user_id", flat=True)
+        )
+        seed(user_id for user_id in deltas if user_id not in existing)
+    invalidate(deltas)
+
+
+def unread_count(user_id) -> int:
+    """The user's unread badge count."""
+    key = _cache_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = (
+            UnreadCounter.objects.filter(user_id=user_id)
+            .values_list("unread_count", flat=True)
+            .first()
+        )
+        if count is None:
+            count = seed([user_id])[user_id]
+        cache.set(key, count, getattr(settings, "NOTIFICATION_UNREAD_CACHE_TIMEOUT", 5))
+    return max(count, 0)
@@ -0,0 +1,82 @@
+"""Local stand-in for the FCM legacy HTTP endpoint.
+
+Point ``FCM_URL`` at ``FakeFCMServer.url`` to exercise FCMService without
+network access::
+
+    with FakeFCMServer(invalid_tokens={"stale"}) as server:
+        with override_settings(FCM_URL=server.url, FCM_SERVER_KEY="test"):
+            FCMService().send_multicast(["ok", "stale"], "Title", "Body")
+        server.requests  # list of decoded JSON bodies
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeFCMServer:
+    """Threaded HTTP server answering like ``fcm.googleapis.com/fcm/send``."""
+
+    def __init__(self, invalid_tokens=(), delay: float = 0.0, status_code: int = 200):
+        self.invalid_tokens = set(invalid_tokens)
+        self.delay = delay
+        self.status_code = status_code
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/fcm/send"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    fake.requests.append(body)
+                if fake.delay:
+                    time.sleep(fake.delay)
+
+                tokens = body.get("registration_ids") or [body.get("to")]
+                results = [
+                    {"error": "NotRegistered"} if token in fake.invalid_tokens
+                    else {"message_id": f"fake:{token}"}
+                    for token in tokens
+                ]
+                success = sum(1 for r in results if "message_id" in r)
+                response = json.dumps({
+                    "success": success,
+                    "failure": len(results) - success,
+                    "results": results,
+                }).encode()
+
+                self.send_response(fake.status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,65 +1,89 @@
 """Firebase Cloud Messaging (FCM) service for push notifications."""
 import logging
-from typing import Optional, Dict, Any
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List
 from django.conf import settings
+from django.utils import timezone
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+# FCM errors meaning the token will never work again
+INVALID_TOKEN_ERRORS = ('InvalidRegistration', 'NotRegistered')
+# Transient failures worth retrying: transport errors, FCM being down
+RETRYABLE_ERRORS = ('RequestError', 'Unavailable', 'InternalServerError')
+
+
+def is_retryable(error: Optional[str]) -> bool:
+    """Whether a failed FCMResult may succeed if sent again later."""
+    return bool(error) and (error in RETRYABLE_ERRORS or error.startswith('HTTP5'))
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the per-process pooled HTTP session used for FCM calls."""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                pool_size = getattr(settings, 'FCM_MAX_CONCURRENCY', 8)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+                _session_pid = os.getpid()
+    return _session
+
+
+@dataclass
+class FCMResult:
+    """Outcome of sending to a single device token."""
+    token: str
+    success: bool
+    error: Optional[str] = None
+
 
 class FCMService:
     """
     Service for sending push notifications via Firebase Cloud Messaging.
-    
+
     Requires FCM_SERVER_KEY in settings.
     Get your FCM Server Key from Firebase Console > Project Settings > Cloud Messaging
+
+    All requests go through one pooled session per process. Multicast
+    sends split tokens into batches of FCM_BATCH_SIZE (one request each,
+    using registration_ids) and sends up to FCM_MAX_CONCURRENCY batches
+    in parallel.
     """
-    
+
     def __init__(self):
         self.server_key = getattr(settings, 'FCM_SERVER_KEY', None)
-        self.fcm_url = "https://fcm.googleapis.com/fcm/send"
-        
+        self.fcm_url = getattr(settings, 'FCM_URL', "https://fcm.googleapis.com/fcm/send")
+        self.batch_size = getattr(settings, 'FCM_BATCH_SIZE', 500)
+        self.max_concurrency = getattr(settings, 'FCM_MAX_CONCURRENCY', 8)
+
         if not self.server_key:
             logger.warning("FCM_SERVER_KEY not configured. Push notifications disabled.")
-    
-    def send_notification(
+
+    def _build_payload(
         self,
-        token: str,
         title: str,
         body: str,
-        data: Optional[Dict[str, Any]] = None,
-        priority: str = "high"
-    ) -> bool:
-        """
-        Send push notification to a specific device.
-        
-        Args:
-            token: FCM device token
-            title: Notification title
-            body: Notification body
-            data: Custom data payload (must be string-keyed dict)
-            priority: Notification priority ('high' or 'normal')
-        
-        Returns:
-            True if notification sent successfully, False otherwise
-        """
-        if not self.server_key:
-            logger.debug("FCM not configured, skipping push notification")
-            return False
-        
-        if data is None:
-            data = {}
-        
+        data: Optional[Dict[str, Any]],
+        priority: str
+    ) -> Dict[str, Any]:
         # Convert all data values to strings (FCM requirement)
-        string_data = {k: str(v) for k, v in data.items()}
-        
-        headers = {
-            "Authorization": f"key={self.server_key}",
-            "Content-Type": "application/json",
-        }
-        
-        payload = {
-            "to": token,
+        string_data = {k: str(v) for k, v in (data or {}).items()}
+
+        return {
             "priority": priority,
             "notification": {
                 "title": title,
@@ -87,79 +111,127 @@ class FCMService:
                 }
             }
         }
-        
+
+    def _send_batch(self, tokens: List[str], payload: Dict[str, Any]) -> List[FCMResult]:
+        """Send one request for up to batch_size tokens; results keep token order."""
+        headers = {
+            "Authorization": f"key={self.server_key}",
+            "Content-Type": "application/json",
+        }
+
         try:
-            response = requests.post(
+            response = get_session().post(
                 self.fcm_url,
-                json=payload,
+                json={**payload, "registration_ids": tokens},
                 headers=headers,
                 timeout=10
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if result.get('success') == 1:
-                    logger.info(f"FCM notification sent successfully to {token[:20]}...")
-                    return True
-                else:
-                    error = result.get('results', [{}])[0].get('error', 'Unknown')
-                    logger.warning(f"FCM send failed: {error}")
-                    
-                    # Handle invalid tokens
-                    if error in ('InvalidRegistration', 'NotRegistered'):
-                        self._handle_invalid_token(token)
-                    
-                    return False
-            else:
-                logger.error(f"FCM API error: {response.status_code} - {response.text}")
-                return False
-        
         except Exception as e:
             logger.error(f"FCM send error: {str(e)}")
-            return False
-    
+            return [FCMResult(token, False, "RequestError") for token in tokens]
+
+        if response.status_code != 200:
+            logger.error(f"FCM API error: {response.status_code} - {response.text}")
+            return [FCMResult(token, False, f"HTTP{response.status_code}") for token in tokens]
+
+        results = response.json().get('results') or []
+        outcomes = []
+        for index, token in enumerate(tokens):
+            result = results[index] if index < len(results) else {'error': 'Unknown'}
+            error = result.get('error')
+            outcomes.append(FCMResult(token, error is None, error))
+        return outcomes
+
+    def send_notification(
+        self,
+        token: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, Any]] = None,
+        priority: str = "high"
+    ) -> bool:
+        """
+        Send push notification to a specific device.
+
+        Args:
+            token: FCM device token
+            title: Notification title
+            body: Notification body
+            data: Custom data payload (must be string-keyed dict)
+            priority: Notification priority ('high' or 'normal')
+
+        Returns:
+            True if notification sent successfully, False otherwise
+        """
+        result = self.send_multicast([token], title, body, data, priority)
+        return result["success"] == 1
+
     def send_multicast(
         self,
         tokens: list,
         title: str,
         body: str,
-        data: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, int]:
+        data: Optional[Dict[str, Any]] = None,
+        priority: str = "high"
+    ) -> Dict[str, Any]:
         """
         Send notification to multiple devices.
-        
+
+        Tokens FCM reports as invalid are deactivated with a single UPDATE.
+
         Args:
             tokens: List of FCM device tokens
             title: Notification title
             body: Notification body
             data: Custom data payload
-        
+            priority: Notification priority ('high' or 'normal')
+
         Returns:
-            Dict with success and failure counts
+            Dict with success, failure, invalid and total counts, plus the
+            per-token FCMResult list under "results"
         """
-        success_count = 0
-        failure_count = 0
-        
-        for token in tokens:
-            if self.send_notification(token, title, body, data):
-                success_count += 1
-            else:
-                failure_count += 1
-        
+        if not self.server_key:
+            logger.debug("FCM not configured, skipping push notification")
+            return {"success": 0, "failure": len(tokens), "invalid": 0, "total": len(tokens), "results": []}
+
+        payload = self._build_payload(title, body, data, priority)
+        batches = [
+            tokens[i:i + self.batch_size]
+            for i in range(0, len(tokens), self.batch_size)
+        ]
+
+        results: List[FCMResult] = []
+        if len(batches) == 1:
+            results = self._send_batch(batches[0], payload)
+        elif batches:
+            workers = min(self.max_concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for batch_results in executor.map(lambda b: self._send_batch(b, payload), batches):
+                    results.extend(batch_results)
+
+        invalid = [r.token for r in results if r.error in INVALID_TOKEN_ERRORS]
+        if invalid:
+            self._handle_invalid_tokens(invalid)
+
+        success_count = sum(1 for r in results if r.success)
+        for r in results:
+            if not r.success:
+                logger.warning(f"FCM send failed for {r.token[:20]}...: {r.error}")
+
         return {
             "success": success_count,
-            "failure": failure_count,
-            "total": len(tokens)
+            "failure": len(results) - success_count,
+            "invalid": len(invalid),
+            "total": len(tokens),
+            "results": results,
         }
-    
-    def _handle_invalid_token(self, token: str):
-        """Mark device token as inactive when FCM reports it as invalid."""
+
+    def _handle_invalid_tokens(self, tokens: List[str]):
+        """Mark device tokens as inactive when FCM reports them as invalid."""
         from .models import UserDevice
-        
-        try:
-            device = UserDevice.objects.get(fcm_token=token)
-            device.is_active = False
-            device.save(update_fields=['is_active', 'updated_at'])
-            logger.info(f"Marked device {device.id} as inactive due to invalid token")
-        except UserDevice.DoesNotExist:
-            logger.warning(f"Device with token {token[:20]}... not found in database")
+
+        updated = UserDevice.objects.filter(
+            fcm_token__in=tokens,
+            is_active=True
+        ).update(is_active=False, updated_at=timezone.now())
+        logger.info(f"Marked {updated} device(s) as inactive due to invalid tokens")
@@ -0,0 +1,70 @@
+"""Drain the notification outbox (realtime broadcasts and push sends)."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from notifications import outbox
+from notifications.models import NotificationOutbox, OutboxStatus
+
+
+class Command(BaseCommand):
+    help = "Deliver pending notification side effects from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain everything that is due, then exit.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Entries claimed per batch (default: NOTIFICATION_OUTBOX_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep between polls when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--requeue-dead",
+            action="store_true",
+            help="Move dead-lettered entries back to pending before dispatching.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_dead"]:
+            requeued = NotificationOutbox.objects.filter(status=OutboxStatus.DEAD).update(
+                status=OutboxStatus.PENDING,
+                attempts=0,
+                next_attempt_at=timezone.now(),
+            )
+            self.stdout.write(f"Requeued {requeued} dead-lettered entries")
+
+        if options["once"]:
+            totals = outbox.drain_all(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(self._format(totals)))
+            return
+
+        self.stdout.write("Dispatching notification outbox (Ctrl+C to stop)...")
+        try:
+            while True:
+                close_old_connections()
+                result = outbox.drain(options["batch_size"])
+                if result["claimed"]:
+                    self.stdout.write(self._format(result))
+                else:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    @staticmethod
+    def _format(result):
+        return (
+            f"claimed={result['claimed']} sent={result['sent']} "
+            f"retried={result['retried']} dead={result['dead']}"
+        )
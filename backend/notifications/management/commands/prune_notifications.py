@@ -0,0 +1,70 @@
+"""Delete or archive expired notifications in bounded batches."""
+from django.core.management.base import BaseCommand
+
+from notifications import retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Prune soft-deleted and old read notifications "
+        "(see NOTIFICATION_RETENTION_* settings)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be pruned and the table size.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows per batch (default: NOTIFICATION_RETENTION_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop after this many batches (default: until done).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches.",
+        )
+        archive = parser.add_mutually_exclusive_group()
+        archive.add_argument(
+            "--archive",
+            dest="archive",
+            action="store_true",
+            default=None,
+            help="Copy pruned rows to notifications_archive first.",
+        )
+        archive.add_argument(
+            "--no-archive",
+            dest="archive",
+            action="store_false",
+            help="Delete without archiving.",
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            stats = retention.stats()
+            for key, value in stats.items():
+                self.stdout.write(f"{key}: {value}")
+            return
+
+        totals = retention.prune(
+            batch_size=options["batch_size"],
+            archive=options["archive"],
+            max_batches=options["max_batches"],
+            pause=options["pause"],
+        )
+        expired_archive = retention.expire_archive()
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {totals['deleted']} deleted and {totals['read']} read notification(s) "
+            f"in {totals['batches']} batch(es); expired {expired_archive} archive "
+            f"{'partition(s)' if retention.archive_is_partitioned() else 'row(s)'}"
+        ))
@@ -0,0 +1,71 @@
+"""Recompute users' unread notification counters from the notifications table."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from notifications import counters
+from notifications.models import Notification, UnreadCounter
+
+
+def _expected_unread():
+    """Correlated subquery counting a counter owner's unread notifications."""
+    return Coalesce(
+        Subquery(
+            Notification.objects.filter(
+                recipient_id=OuterRef("user_id"),
+                is_read=False,
+                deleted_at__isnull=True,
+            )
+            .order_by()
+            .values("recipient_id")
+            .annotate(value=Count("id"))
+            .values("value")
+        ),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+class Command(BaseCommand):
+    help = "Fix drifted unread notification counters with one set-based UPDATE."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many counters have drifted or are missing.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = list(
+                UnreadCounter.objects.annotate(expected=_expected_unread())
+                .filter(~Q(unread_count=F("expected")))
+                .values_list("user_id", flat=True)
+            )
+            missing = list(
+                Notification.objects.filter(
+                    is_read=False,
+                    deleted_at__isnull=True,
+                    recipient__unread_counter__isnull=True,
+                )
+                .order_by()
+                .values_list("recipient_id", flat=True)
+                .distinct()
+            )
+            if options["dry_run"] or not (drifted or missing):
+                self.stdout.write(
+                    f"{len(drifted)} drifted and {len(missing)} missing unread counter(s)"
+                )
+                return
+
+            updated = UnreadCounter.objects.filter(user_id__in=drifted).update(
+                unread_count=_expected_unread()
+            )
+            counters.seed(missing)
+            counters.invalidate(drifted + missing)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled {updated} unread counter(s), created {len(missing)}"
+        ))
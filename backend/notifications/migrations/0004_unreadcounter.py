@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    UnreadCounter = apps.get_model("notifications", "UnreadCounter")
+    counts = (
+        Notification.objects.filter(is_read=False, deleted_at__isnull=True)
+        .order_by()
+        .values("recipient_id")
+        .annotate(unread=Count("id"))
+    )
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=row["recipient_id"], unread_count=row["unread"]) for row in counts],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_notificationoutbox"),
+        ("users", "0005_user_email"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UnreadCounter",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        help_text="Owner of the counted notifications",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="unread_counter",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "unread_count",
+                    models.IntegerField(
+                        default=0, help_text="Unread notifications not soft-deleted"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "notification_unread_counters",
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 16:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0004_unreadcounter"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["recipient", "-created_at", "-id"],
+                name="notif_recipient_live_idx",
+            ),
+        ),
+    ]
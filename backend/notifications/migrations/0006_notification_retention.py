@@ -0,0 +1,169 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# On PostgreSQL the archive is range-partitioned by month on created_at so
+# the retention job can drop whole months. Partition keys must be part of
+# the primary key, hence (id, created_at); Django only sees id.
+CREATE_PARTITIONED_SQL = [
+    """
+    CREATE TABLE notifications_archive (
+        id uuid NOT NULL,
+        recipient_id uuid NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        notification_type varchar(50) NOT NULL,
+        title varchar(255) NOT NULL,
+        body text NOT NULL,
+        payload jsonb NOT NULL,
+        is_read boolean NOT NULL,
+        read_at timestamp with time zone NULL,
+        created_at timestamp with time zone NOT NULL,
+        deleted_at timestamp with time zone NULL,
+        archived_at timestamp with time zone NOT NULL,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)
+    """,
+    """
+    CREATE INDEX notif_archive_recipient_idx
+    ON notifications_archive (recipient_id, created_at DESC)
+    """,
+]
+
+
+def create_archive_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.create_model(
+            apps.get_model("notifications", "NotificationArchive")
+        )
+        return
+    for statement in CREATE_PARTITIONED_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_archive_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("notifications", "NotificationArchive"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_notification_live_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["deleted_at"],
+                name="notif_deleted_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True), ("is_read", True)),
+                fields=["created_at"],
+                name="notif_read_created_idx",
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="NotificationArchive",
+                    fields=[
+                        (
+                            "id",
+                            models.UUIDField(
+                                editable=False, primary_key=True, serialize=False
+                            ),
+                        ),
+                        (
+                            "notification_type",
+                            models.CharField(
+                                choices=[
+                                    ("booking_created", "Booking Request Created"),
+                                    ("booking_canceled", "Booking Request Canceled"),
+                                    ("booking_accepted", "Booking Request Accepted"),
+                                    ("booking_declined", "Booking Request Declined"),
+                                    ("booking_expired", "Booking Request Expired"),
+                                    ("item_unavailable", "Item Marked Unavailable"),
+                                    ("item_deleted", "Item Deleted"),
+                                    ("booking_started", "Borrowing Started"),
+                                    ("booking_completed", "Borrowing Completed"),
+                                    ("booking_overdue", "Borrowing Overdue"),
+                                    ("dispute_opened", "Dispute Opened"),
+                                    ("dispute_resolved", "Dispute Resolved"),
+                                    ("item_returned", "Item Returned"),
+                                    ("rating_received", "Rating Received"),
+                                    ("rating_modified", "Rating Modified"),
+                                    ("report_submitted", "Report Submitted"),
+                                    ("report_reviewed", "Report Under Review"),
+                                    ("report_resolved", "Report Resolved"),
+                                    ("warning_issued", "Warning Issued"),
+                                    ("restriction_applied", "Restriction Applied"),
+                                    ("restriction_lifted", "Restriction Lifted"),
+                                    ("deposit_required", "Deposit Required"),
+                                    ("deposit_paid", "Deposit Paid"),
+                                    ("deposit_held", "Deposit Held"),
+                                    ("deposit_released", "Deposit Released"),
+                                    (
+                                        "deposit_partial_refund",
+                                        "Partial Deposit Refund",
+                                    ),
+                                    ("payment_failure", "Payment Failed"),
+                                    ("payment_success", "Payment Successful"),
+                                    ("account_verified", "Account Verified"),
+                                    ("password_changed", "Password Changed"),
+                                    ("new_login", "New Login Detected"),
+                                    ("account_suspended", "Account Suspended"),
+                                    ("account_reactivated", "Account Reactivated"),
+                                    ("terms_update", "Terms & Conditions Updated"),
+                                    ("system_announcement", "System Announcement"),
+                                    ("booking_reminder", "Booking Reminder"),
+                                ],
+                                max_length=50,
+                            ),
+                        ),
+                        ("title", models.CharField(max_length=255)),
+                        ("body", models.TextField()),
+                        ("payload", models.JSONField(blank=True, default=dict)),
+                        ("is_read", models.BooleanField(default=False)),
+                        ("read_at", models.DateTimeField(blank=True, null=True)),
+                        (
+                            "created_at",
+                            models.DateTimeField(
+                                help_text="When the notification was created"
+                            ),
+                        ),
+                        ("deleted_at", models.DateTimeField(blank=True, null=True)),
+                        ("archived_at", models.DateTimeField(auto_now_add=True)),
+                    ],
+                    options={
+                        "db_table": "notifications_archive",
+                        "ordering": ["-created_at"],
+                    },
+                ),
+                migrations.AddField(
+                    model_name="notificationarchive",
+                    name="recipient",
+                    field=models.ForeignKey(
+                        help_text="User who received this notification",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_notifications",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="notificationarchive",
+                    index=models.Index(
+                        fields=["recipient", "-created_at"],
+                        name="notif_archive_recipient_idx",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
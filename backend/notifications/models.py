@@ -145,6 +145,24 @@ class Notification(models.Model):
             models.Index(fields=["recipient", "is_read", "-created_at"]),
             models.Index(fields=["notification_type", "-created_at"]),
             models.Index(fields=["idempotency_key"], name="notif_idempotency_idx"),
+            # Lets the retention job find expired soft-deleted rows cheaply
+            models.Index(
+                fields=["deleted_at"],
+                name="notif_deleted_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+            # ...and read live rows past their retention window
+            models.Index(
+                fields=["created_at"],
+                name="notif_read_created_idx",
+                condition=models.Q(is_read=True, deleted_at__isnull=True),
+            ),
+            # The list endpoint's keyset order over live notifications
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="notif_recipient_live_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -221,3 +239,153 @@ class UserDevice(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.device_type} ({self.device_name})"
+
+
+class OutboxChannel(models.TextChoices):
+    """Delivery channels fanned out from a notification."""
+    REALTIME = "realtime", "Realtime Broadcast"
+    PUSH = "push", "Push Notification"
+
+
+class OutboxStatus(models.TextChoices):
+    """Lifecycle of an outbox entry."""
+    PENDING = "pending", "Pending"
+    SENT = "sent", "Sent"
+    DEAD = "dead", "Dead-lettered"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Pending side effect of a notification (realtime broadcast, push).
+    
+    Rows are written in the same transaction as the notification and
+    delivered after commit by notifications.outbox, so no remote call
+    ever runs while a request holds a database transaction open.
+    """
+    
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.CASCADE,
+        related_name="outbox_entries",
+        help_text="Notification to deliver"
+    )
+    
+    channel = models.CharField(
+        max_length=20,
+        choices=OutboxChannel.choices,
+        help_text="Delivery channel"
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=OutboxStatus.choices,
+        default=OutboxStatus.PENDING,
+        help_text="Delivery status"
+    )
+    
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of delivery attempts so far"
+    )
+    
+    next_attempt_at = models.DateTimeField(
+        help_text="Earliest time the dispatcher may (re)try this entry"
+    )
+    
+    last_error = models.TextField(
+        blank=True,
+        help_text="Error from the most recent failed attempt"
+    )
+    
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When delivery succeeded"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = "notification_outbox"
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="notif_outbox_due_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.channel} for {self.notification_id} ({self.status})"
+
+
+class UnreadCounter(models.Model):
+    """
+    Denormalized count of a user's unread, non-deleted notifications.
+    
+    Maintained by notifications.counters in the same transaction as the
+    change it reflects; ``python manage.py reconcile_unread_counts``
+    recomputes it from the notifications table.
+    """
+    
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="unread_counter",
+        help_text="Owner of the counted notifications"
+    )
+    
+    unread_count = models.IntegerField(
+        default=0,
+        help_text="Unread notifications not soft-deleted"
+    )
+    
+    class Meta:
+        db_table = "notification_unread_counters"
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.unread_count} unread"
+
+
+class NotificationArchive(models.Model):
+    """
+    Notifications moved out of the live table by the retention job.
+    
+    On PostgreSQL the table is range-partitioned by month on created_at
+    (migration 0006), so old months are dropped whole; see
+    notifications.retention.
+    """
+    
+    id = models.UUIDField(primary_key=True, editable=False)
+    
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications",
+        help_text="User who received this notification"
+    )
+    
+    notification_type = models.CharField(max_length=50, choices=NotificationType.choices)
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    payload = models.JSONField(default=dict, blank=True)
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(help_text="When the notification was created")
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = "notifications_archive"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["recipient", "-created_at"], name="notif_archive_recipient_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.notification_type} -> {self.recipient_id} (archived)"
@@ -0,0 +1,223 @@
+"""Transactional outbox for notification side effects.
+
+``enqueue`` writes one outbox row per delivery channel inside the caller's
+transaction and schedules a wake-up of the dispatcher for after commit.
+``drain`` claims due rows in small batches, performs the remote calls with
+no transaction open, and records the outcome: sent, retried with
+exponential backoff, or dead-lettered after too many attempts.
+
+The dispatcher runs either as a daemon thread inside each web worker
+(``NOTIFICATION_OUTBOX_WORKER = "inline"``) or as a separate process via
+``python manage.py dispatch_notifications``.
+"""
+import logging
+import os
+import random
+import threading
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import NotificationOutbox, OutboxChannel, OutboxStatus
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryError(Exception):
+    """Raised by a channel handler when delivery should be retried."""
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(notification, channels: Iterable[str]) -> List[NotificationOutbox]:
+    """Record pending deliveries for ``notification`` in the current transaction."""
+    return enqueue_many([notification], channels)
+
+
+def enqueue_many(notifications: Iterable, channels: Iterable[str]) -> List[NotificationOutbox]:
+    """Record deliveries for several notifications with one INSERT and one wake-up."""
+    now = timezone.now()
+    channels = list(channels)
+    entries = NotificationOutbox.objects.bulk_create([
+        NotificationOutbox(
+            notification=notification,
+            channel=channel,
+            next_attempt_at=now,
+        )
+        for notification in notifications
+        for channel in channels
+    ])
+    if entries:
+        transaction.on_commit(wake)
+    return entries
+
+
+def _deliver_realtime(notification) -> None:
+    from .realtime import SupabaseRealtimeService
+
+    service = SupabaseRealtimeService()
+    if not service.supabase_url or not service.service_role_key:
+        return  # Realtime disabled; nothing to retry
+    if not service.broadcast_notification(notification):
+        raise DeliveryError("Realtime broadcast failed")
+
+
+def _deliver_push(notification) -> None:
+    from .fcm import is_retryable
+    from .tasks import send_push_notification_task
+
+    result = send_push_notification_task(notification.id)
+    if result is None or result["success"]:
+        return
+    # Nothing arrived; retry unless every failure is permanent (bad tokens)
+    errors = {r.error for r in result["results"]}
+    if any(is_retryable(error) for error in errors):
+        raise DeliveryError(f"Push delivery failed: {', '.join(sorted(filter(None, errors)))}")
+
+
+HANDLERS = {
+    OutboxChannel.REALTIME: _deliver_realtime,
+    OutboxChannel.PUSH: _deliver_push,
+}
+
+
+def _backoff(attempts: int) -> timedelta:
+    """Exponential backoff with jitter: ~5s, 10s, 20s ... capped at 15 minutes."""
+    base = _setting("NOTIFICATION_OUTBOX_BACKOFF_BASE", 5)
+    delay = min(base * (2 ** max(attempts - 1, 0)), 900)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _claim(batch_size: int) -> List[NotificationOutbox]:
+    """
+    Lease a batch of due entries.
+
+    Pushing next_attempt_at forward by the lease hides claimed rows from
+    other dispatchers; if this one dies mid-batch they become due again.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=_setting("NOTIFICATION_OUTBOX_LEASE_SECONDS", 60))
+    with transaction.atomic():
+        entries = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxStatus.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        if not entries:
+            return []
+        ids = [entry.id for entry in entries]
+        NotificationOutbox.objects.filter(id__in=ids).update(next_attempt_at=now + lease)
+
+    return list(
+        NotificationOutbox.objects.filter(id__in=ids)
+        .select_related("notification__recipient")
+        .order_by("next_attempt_at", "created_at")
+    )
+
+
+def drain(batch_size: int = None) -> Dict[str, int]:
+    """
+    Deliver one batch of due entries.
+
+    Returns:
+        Dict with counts of claimed, sent, retried and dead entries
+    """
+    if batch_size is None:
+        batch_size = _setting("NOTIFICATION_OUTBOX_BATCH_SIZE", 50)
+    max_attempts = _setting("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", 8)
+    result = {"claimed": 0, "sent": 0, "retried": 0, "dead": 0}
+
+    entries = _claim(batch_size)
+    result["claimed"] = len(entries)
+
+    for entry in entries:
+        attempts = entry.attempts + 1
+        try:
+            HANDLERS[entry.channel](entry.notification)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempts >= max_attempts:
+                status = OutboxStatus.DEAD
+                next_attempt_at = timezone.now()
+                result["dead"] += 1
+                logger.error(f"Outbox entry {entry.id} dead-lettered after {attempts} attempts: {error}")
+            else:
+                status = OutboxStatus.PENDING
+                next_attempt_at = timezone.now() + _backoff(attempts)
+                result["retried"] += 1
+                logger.warning(f"Outbox entry {entry.id} failed (attempt {attempts}): {error}")
+            NotificationOutbox.objects.filter(id=entry.id).update(
+                status=status,
+                attempts=attempts,
+                next_attempt_at=next_attempt_at,
+                last_error=error[:2000],
+                updated_at=timezone.now(),
+            )
+            continue
+
+        NotificationOutbox.objects.filter(id=entry.id).update(
+            status=OutboxStatus.SENT,
+            attempts=attempts,
+            sent_at=timezone.now(),
+            last_error="",
+            updated_at=timezone.now(),
+        )
+        result["sent"] += 1
+
+    return result
+
+
+def drain_all(batch_size: int = None) -> Dict[str, int]:
+    """Drain batches until nothing is due."""
+    totals = {"claimed": 0, "sent": 0, "retried": 0, "dead": 0}
+    while True:
+        result = drain(batch_size)
+        for key, value in result.items():
+            totals[key] += value
+        if not result["claimed"]:
+            return totals
+
+
+class OutboxWorker(threading.Thread):
+    """Daemon thread that drains the outbox when woken or on a poll interval."""
+
+    def __init__(self):
+        super().__init__(name="notification-outbox", daemon=True)
+        self.wakeup = threading.Event()
+        self.poll_interval = _setting("NOTIFICATION_OUTBOX_POLL_INTERVAL", 30)
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+            close_old_connections()
+            try:
+                drain_all()
+            except Exception as e:
+                logger.error(f"Outbox dispatcher error: {e}")
+            finally:
+                close_old_connections()
+
+
+_worker = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+
+def wake() -> None:
+    """Nudge the in-process dispatcher, starting it on first use."""
+    global _worker, _worker_pid
+    if _setting("NOTIFICATION_OUTBOX_WORKER", "inline") != "inline":
+        return
+    if _worker is None or _worker_pid != os.getpid():
+        with _worker_lock:
+            if _worker is None or _worker_pid != os.getpid():
+                _worker = OutboxWorker()
+                _worker_pid = os.getpid()
+                _worker.start()
+    _worker.wakeup.set()
@@ -0,0 +1,207 @@
+"""Notification retention: prune soft-deleted and old read notifications.
+
+Soft-deleted notifications are removed ``NOTIFICATION_RETENTION_DELETED_DAYS``
+after deletion, read ones ``NOTIFICATION_RETENTION_READ_DAYS`` after they
+were created. Unread notifications are never pruned, so the unread
+counters are unaffected.
+
+``prune`` walks the expired rows oldest first in batches. Each batch is its
+own short transaction (optionally copy to the archive, delete the outbox
+rows with the notifications), so locks are held for one batch at a time
+and autovacuum can reclaim space between batches.
+
+The archive (``NotificationArchive``) is range-partitioned by month on
+PostgreSQL. Partitions are created before rows are copied in, and months
+older than ``NOTIFICATION_ARCHIVE_MONTHS`` are dropped whole instead of
+being deleted row by row. The live table is not partitioned: PostgreSQL
+requires the partition key in every unique constraint, which would break
+the idempotency-key dedupe and the outbox foreign key.
+"""
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+
+ARCHIVE_TABLE = NotificationArchive._meta.db_table
+ARCHIVE_FIELDS = [
+    "id", "recipient_id", "notification_type", "title", "body", "payload",
+    "is_read", "read_at", "created_at", "deleted_at",
+]
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def expired(now: Optional[datetime] = None) -> Dict[str, object]:
+    """Querysets of prunable notifications, each ordered along an index."""
+    now = now or timezone.now()
+    deleted_before = now - timedelta(days=_setting("NOTIFICATION_RETENTION_DELETED_DAYS", 30))
+    read_before = now - timedelta(days=_setting("NOTIFICATION_RETENTION_READ_DAYS", 180))
+    return {
+        "deleted": Notification.objects.filter(deleted_at__lt=deleted_before).order_by("deleted_at"),
+        "read": Notification.objects.filter(
+            is_read=True,
+            deleted_at__isnull=True,
+            created_at__lt=read_before,
+        ).order_by("created_at"),
+    }
+
+
+# -- archive partitions (PostgreSQL) -------------------------------------------
+
+def _month(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{ARCHIVE_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def archive_is_partitioned() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [ARCHIVE_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def ensure_archive_partitions(months: Iterable[date]) -> None:
+    """Create the monthly archive partitions for ``months`` if missing."""
+    with connection.cursor() as cursor:
+        for month in sorted(set(months)):
+            # DDL takes no bind parameters; both bounds are generated dates
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {_partition_name(month)} "
+                f"PARTITION OF {ARCHIVE_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            )
+
+
+def archive_partitions() -> List[date]:
+    """Months that currently have an archive partition, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [ARCHIVE_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f"{ARCHIVE_TABLE}_y"
+    months = []
+    for name in names:
+        if name.startswith(prefix):
+            year, _, month = name[len(prefix):].partition("m")
+            months.append(date(int(year), int(month), 1))
+    return sorted(months)
+
+
+def expire_archive(now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+    """Remove archived notifications older than NOTIFICATION_ARCHIVE_MONTHS."""
+    keep_months = _setting("NOTIFICATION_ARCHIVE_MONTHS", 12)
+    if keep_months <= 0:
+        return 0
+    oldest_kept = _month((now or timezone.now()).date())
+    for _ in range(keep_months - 1):
+        oldest_kept = _month(oldest_kept - timedelta(days=1))
+
+    if archive_is_partitioned():
+        dropped = [month for month in archive_partitions() if month < oldest_kept]
+        with connection.cursor() as cursor:
+            for month in dropped:
+                cursor.execute(f"DROP TABLE IF EXISTS {_partition_name(month)}")
+        return len(dropped)
+
+    batch_size = batch_size or _setting("NOTIFICATION_RETENTION_BATCH_SIZE", 1000)
+    cutoff = timezone.make_aware(datetime.combine(oldest_kept, datetime.min.time()))
+    removed = 0
+    while True:
+        ids = list(
+            NotificationArchive.objects.filter(created_at__lt=cutoff)
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return removed
+        removed += NotificationArchive.objects.filter(pk__in=ids).delete()[0]
+
+
+# -- pruning --------------------------------------------------------------------
+
+def _archive(ids: List, partitioned: bool) -> None:
+    rows = list(Notification.objects.filter(pk__in=ids).values(*ARCHIVE_FIELDS))
+    if partitioned:
+        ensure_archive_partitions(_month(row["created_at"].date()) for row in rows)
+    NotificationArchive.objects.bulk_create(
+        [NotificationArchive(**row) for row in rows],
+        ignore_conflicts=True,
+    )
+
+
+def prune(
+    batch_size: Optional[int] = None,
+    archive: Optional[bool] = None,
+    max_batches: Optional[int] = None,
+    pause: float = 0.0,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Delete (and optionally archive) expired notifications in bounded batches."""
+    batch_size = batch_size or _setting("NOTIFICATION_RETENTION_BATCH_SIZE", 1000)
+    if archive is None:
+        archive = _setting("NOTIFICATION_RETENTION_ARCHIVE", False)
+
+    partitioned = archive and archive_is_partitioned()
+    totals = {"deleted": 0, "read": 0, "batches": 0}
+    for label, queryset in expired(now).items():
+        while max_batches is None or totals["batches"] < max_batches:
+            with transaction.atomic():
+                ids = list(queryset.values_list("id", flat=True)[:batch_size])
+                if not ids:
+                    break
+                if archive:
+                    _archive(ids, partitioned)
+                # Outbox rows go with them (one DELETE each, no per-row work)
+                _, per_model = Notification.objects.filter(pk__in=ids).delete()
+                totals[label] += per_model.get(Notification._meta.label, 0)
+            totals["batches"] += 1
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return totals
+
+
+def stats(now: Optional[datetime] = None) -> Dict[str, object]:
+    """What ``prune`` would remove, plus table sizes on PostgreSQL."""
+    result = {label: queryset.count() for label, queryset in expired(now).items()}
+    result["archived"] = NotificationArchive.objects.count()
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT reltuples::bigint,
+                       pg_size_pretty(pg_table_size(oid)),
+                       pg_size_pretty(pg_indexes_size(oid))
+                FROM pg_class WHERE oid = %s::regclass
+                """,
+                [Notification._meta.db_table],
+            )
+            result["estimated_rows"], result["table_size"], result["index_size"] = cursor.fetchone()
+    else:
+        result["estimated_rows"] = Notification.objects.count()
+    return result
@@ -6,6 +6,13 @@ from .models import Notification, UserDevice, NotificationType
 class NotificationSerializer(serializers.ModelSerializer):
     """Serializer for Notification model."""
     
+    def __init__(self, *args, fields=None, **kwargs):
+        """``fields`` optionally restricts output to a subset of Meta.fields."""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+    
     class Meta:
         model = Notification
         fields = [
@@ -1,10 +1,14 @@
 """Notification service layer for creating and managing notifications."""
 import hashlib
+from collections import Counter
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from django.conf import settings
 from django.utils import timezone
-from django.db import transaction
-from .models import Notification, NotificationType
+from django.db import connection, transaction
+from bookings.models import BookingStatus
+from . import counters, outbox, stream
+from .models import Notification, NotificationType, OutboxChannel
 
 
 class NotificationService:
@@ -24,8 +28,102 @@ class NotificationService:
         key_string = ":".join(components)
         return hashlib.sha256(key_string.encode()).hexdigest()
     
+    @staticmethod
+    def _outbox_channels(send_push: bool) -> List[str]:
+        """Remote delivery channels; the SSE stream is fed in-process instead."""
+        channels = []
+        if getattr(settings, "NOTIFICATION_REALTIME_BACKEND", "supabase") == "supabase":
+            channels.append(OutboxChannel.REALTIME)
+        if send_push:
+            channels.append(OutboxChannel.PUSH)
+        return channels
+    
+    @staticmethod
+    def _insert_if_new(notification: Notification) -> bool:
+        """
+        INSERT ``notification`` unless its idempotency key already exists.
+        
+        Dedupe and insert are one statement (``ON CONFLICT DO NOTHING
+        RETURNING id``), so concurrent callers with the same key cannot race
+        into an IntegrityError. Returns whether the row was inserted.
+        """
+        if connection.vendor not in ("postgresql", "sqlite"):
+            # No ON CONFLICT ... RETURNING; fall back to check-then-insert
+            if Notification.objects.filter(idempotency_key=notification.idempotency_key).exists():
+                return False
+            notification.save(force_insert=True)
+            return True
+        
+        opts = Notification._meta
+        quote = connection.ops.quote_name
+        columns, params = [], []
+        for field in opts.concrete_fields:
+            columns.append(quote(field.column))
+            params.append(field.get_db_prep_save(field.pre_save(notification, add=True), connection))
+        sql = "INSERT INTO %s (%s) VALUES (%s) ON CONFLICT DO NOTHING RETURNING %s" % (
+            quote(opts.db_table),
+            ", ".join(columns),
+            ", ".join(["%s"] * len(columns)),
+            quote(opts.pk.column),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            inserted = cursor.fetchone() is not None
+        if inserted:
+            notification._state.adding = False
+            notification._state.db = connection.alias
+        return inserted
+    
     @classmethod
     @transaction.atomic
+    def create_notification_if_new(
+        cls,
+        recipient,
+        notification_type: str,
+        title: str,
+        body: str,
+        payload: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+        send_push: bool = True
+    ) -> Tuple[Optional[Notification], bool]:
+        """
+        Create a notification unless one with the same idempotency key exists.
+        
+        Takes the same arguments as ``create_notification``.
+        
+        Returns:
+            (notification, created). Delivery is only enqueued when created
+            is True; for a duplicate the existing notification is returned.
+        """
+        notification = Notification(
+            recipient=recipient,
+            notification_type=notification_type,
+            title=title,
+            body=body,
+            payload=payload if payload is not None else {},
+            idempotency_key=idempotency_key
+        )
+        
+        if idempotency_key:
+            created = cls._insert_if_new(notification)
+        else:
+            notification.save(force_insert=True)
+            created = True
+        
+        if not created:
+            existing = Notification.objects.filter(idempotency_key=idempotency_key).first()
+            return existing, False
+        
+        stream.publish_on_commit([notification])
+        counters.adjust({notification.recipient_id: 1})
+        
+        # Record remote deliveries in the outbox; the dispatcher
+        # performs the remote calls after this transaction commits.
+        outbox.enqueue(notification, cls._outbox_channels(send_push))
+        
+        return notification, True
+    
+    @classmethod
     def create_notification(
         cls,
         recipient,
@@ -49,38 +147,17 @@ class NotificationService:
             send_push: Whether to trigger push notification
         
         Returns:
-            Notification instance or None if duplicate detected
+            Notification instance; the existing one if duplicate detected
         """
-        if payload is None:
-            payload = {}
-        
-        # Check for existing notification with same idempotency key
-        if idempotency_key:
-            existing = Notification.objects.filter(
-                idempotency_key=idempotency_key
-            ).first()
-            if existing:
-                return existing
-        
-        # Create notification
-        notification = Notification.objects.create(
+        notification, _ = cls.create_notification_if_new(
             recipient=recipient,
             notification_type=notification_type,
             title=title,
             body=body,
             payload=payload,
-            idempotency_key=idempotency_key
+            idempotency_key=idempotency_key,
+            send_push=send_push
         )
-        
-        # Trigger realtime broadcast
-        from .realtime import trigger_realtime_broadcast
-        trigger_realtime_broadcast(notification)
-        
-        # Queue push notification if requested
-        if send_push:
-            from .tasks import send_push_notification_task
-            send_push_notification_task(notification.id)
-        
         return notification
     
     @classmethod
@@ -375,100 +452,171 @@ class NotificationService:
         )
     
     @classmethod
-    def create_item_deleted_notification(cls, item, affected_bookings) -> None:
+    def create_item_deleted_notification(cls, item, affected_bookings) -> List[Notification]:
         """Create notifications when item is deleted while bookings exist."""
-        for booking in affected_bookings:
-            if booking.status in [BookingStatus.PENDING, BookingStatus.ACCEPTED]:
-                idempotency_key = cls._generate_idempotency_key(
-                    booking.borrower.id,
-                    NotificationType.ITEM_DELETED,
-                    str(booking.id)
-                )
-                
-                cls.create_notification(
-                    recipient=booking.borrower,
-                    notification_type=NotificationType.ITEM_DELETED,
-                    title=f"Item Deleted",
-                    body=f"The item '{item.title}' you requested has been removed by the owner",
-                    payload={
-                        "booking_id": str(booking.id),
-                        "item_id": str(item.id),
-                        "owner_id": str(item.owner.id),
-                    },
-                    idempotency_key=idempotency_key
-                )
+        return cls.create_notifications_bulk(
+            cls._item_notification(
+                item,
+                booking,
+                NotificationType.ITEM_DELETED,
+                title="Item Deleted",
+                body=f"The item '{item.title}' you requested has been removed by the owner",
+            )
+            for booking in affected_bookings
+            if booking.status in (BookingStatus.PENDING, BookingStatus.ACCEPTED)
+        )
     
     @classmethod
-    def create_item_unavailable_notification(cls, item, affected_bookings) -> None:
+    def create_item_unavailable_notification(cls, item, affected_bookings) -> List[Notification]:
         """Create notifications when item is marked unavailable while bookings exist."""
-        for booking in affected_bookings:
-            if booking.status == BookingStatus.PENDING:
-                idempotency_key = cls._generate_idempotency_key(
-                    booking.borrower.id,
-                    NotificationType.ITEM_UNAVAILABLE,
-                    str(booking.id)
-                )
-                
-                cls.create_notification(
-                    recipient=booking.borrower,
-                    notification_type=NotificationType.ITEM_UNAVAILABLE,
-                    title=f"Item Unavailable",
-                    body=f"The item '{item.title}' you requested is no longer available",
-                    payload={
-                        "booking_id": str(booking.id),
-                        "item_id": str(item.id),
-                        "owner_id": str(item.owner.id),
-                    },
-                    idempotency_key=idempotency_key
-                )
+        return cls.create_notifications_bulk(
+            cls._item_notification(
+                item,
+                booking,
+                NotificationType.ITEM_UNAVAILABLE,
+                title="Item Unavailable",
+                body=f"The item '{item.title}' you requested is no longer available",
+            )
+            for booking in affected_bookings
+            if booking.status == BookingStatus.PENDING
+        )
+    
+    @classmethod
+    def _item_notification(cls, item, booking, notification_type: str, title: str, body: str) -> Notification:
+        """Unsaved notification to a borrower about an item they requested."""
+        return Notification(
+            recipient_id=booking.borrower_id,
+            notification_type=notification_type,
+            title=title,
+            body=body,
+            payload={
+                "booking_id": str(booking.id),
+                "item_id": str(item.id),
+                "owner_id": str(item.owner_id),
+            },
+            idempotency_key=cls._generate_idempotency_key(
+                booking.borrower_id,
+                notification_type,
+                str(booking.id)
+            ),
+        )
+    
+    @classmethod
+    @transaction.atomic
+    def create_notifications_bulk(
+        cls,
+        notifications: Iterable[Notification],
+        send_push: bool = True
+    ) -> List[Notification]:
+        """
+        Create many notifications in a constant number of queries.
+        
+        Rows whose idempotency key already exists (in the database or earlier
+        in the batch) are skipped. The rest are inserted with one INSERT that
+        ignores unique-key conflicts, so a concurrent writer creating the
+        same notification is not an error, and delivery is enqueued for all
+        of them in one outbox INSERT.
+        
+        Args:
+            notifications: Unsaved Notification instances
+            send_push: Whether to trigger push notifications
+        
+        Returns:
+            The notifications that were actually created
+        """
+        candidates = []
+        seen_keys = set()
+        for notification in notifications:
+            key = notification.idempotency_key
+            if key:
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+            candidates.append(notification)
+        
+        if seen_keys:
+            existing = set(
+                Notification.objects.filter(idempotency_key__in=seen_keys)
+                .values_list("idempotency_key", flat=True)
+            )
+            candidates = [n for n in candidates if n.idempotency_key not in existing]
+        if not candidates:
+            return []
+        
+        Notification.objects.bulk_create(candidates, ignore_conflicts=True)
+        
+        # With ignore_conflicts the backend does not report which rows were
+        # skipped; ids are generated client-side, so read back the ones that
+        # made it in before pointing outbox rows at them.
+        inserted = set(
+            Notification.objects.filter(id__in=[n.id for n in candidates])
+            .values_list("id", flat=True)
+        )
+        created = [n for n in candidates if n.id in inserted]
+        
+        stream.publish_on_commit(created)
+        counters.adjust(Counter(n.recipient_id for n in created))
+        outbox.enqueue_many(created, cls._outbox_channels(send_push))
+        
+        return created
     
     @classmethod
     def mark_as_read(cls, notification_id: str, user) -> bool:
         """Mark notification as read."""
-        try:
-            notification = Notification.objects.get(
-                id=notification_id,
-                recipient=user,
-                is_read=False
-            )
-            notification.is_read = True
-            notification.read_at = timezone.now()
-            notification.save(update_fields=["is_read", "read_at", "updated_at"])
-            return True
-        except Notification.DoesNotExist:
-            return False
+        return cls.mark_many_as_read([notification_id], user) == 1
     
     @classmethod
+    @transaction.atomic
+    def mark_many_as_read(cls, notification_ids, user) -> int:
+        """Mark the given unread notifications of a user as read."""
+        count = Notification.objects.filter(
+            id__in=notification_ids,
+            recipient=user,
+            is_read=False,
+            deleted_at__isnull=True
+        ).update(
+            is_read=True,
+            read_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        counters.adjust({user.pk: -count})
+        return count
+    
+    @classmethod
+    @transaction.atomic
     def mark_all_as_read(cls, user) -> int:
         """Mark all unread notifications as read for a user."""
         count = Notification.objects.filter(
             recipient=user,
-            is_read=False
+            is_read=False,
+            deleted_at__isnull=True
         ).update(
             is_read=True,
             read_at=timezone.now()
         )
+        counters.adjust({user.pk: -count})
         return count
     
     @classmethod
+    @transaction.atomic
     def delete_notification(cls, notification_id: str, user) -> bool:
         """Soft delete a notification."""
         try:
-            notification = Notification.objects.get(
+            notification = Notification.objects.select_for_update().get(
                 id=notification_id,
                 recipient=user
             )
-            notification.deleted_at = timezone.now()
-            notification.save(update_fields=["deleted_at", "updated_at"])
-            return True
         except Notification.DoesNotExist:
             return False
+        
+        was_counted = notification.deleted_at is None and not notification.is_read
+        notification.deleted_at = timezone.now()
+        notification.save(update_fields=["deleted_at", "updated_at"])
+        if was_counted:
+            counters.adjust({user.pk: -1})
+        return True
     
     @classmethod
     def get_unread_count(cls, user) -> int:
         """Get count of unread notifications for a user."""
-        return Notification.objects.filter(
-            recipient=user,
-            is_read=False,
-            deleted_at__isnull=True
-        ).count()
+        return counters.unread_count(user.pk)
@@ -1,45 +1,53 @@
 """Django signals for automatic notification creation."""
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from bookings.models import Booking, BookingStatus, DepositStatus
+from bookings.models import Booking, BookingStatus
+from bookings.signals import booking_transitioned
 from ratings.models import Rating
+from users.models import User
+from .models import UnreadCounter
 from .services import NotificationService
 
 
+@receiver(post_save, sender=User)
+def unread_counter_handler(sender, instance, created, **kwargs):
+    """Start every new user with an unread counter so writes never seed it."""
+    if created:
+        UnreadCounter.objects.bulk_create([UnreadCounter(user=instance)], ignore_conflicts=True)
+
+
 @receiver(post_save, sender=Booking)
 def booking_notification_handler(sender, instance, created, **kwargs):
-    """Handle notification creation for booking events."""
+    """Notify the owner of a new booking request."""
     
-    # New booking created (PENDING status)
+    # Later changes arrive as booking_transitioned events, not saves
     if created and instance.status == BookingStatus.PENDING:
         NotificationService.create_booking_created_notification(instance)
-    
-    # Booking status changed (not on creation)
-    elif not created:
-        # Use update_fields to track what changed
-        # For now, we'll trigger on status changes
-        
-        if instance.status == BookingStatus.ACCEPTED:
-            NotificationService.create_booking_accepted_notification(instance)
-        
-        elif instance.status == BookingStatus.DECLINED:
-            NotificationService.create_booking_declined_notification(instance)
-        
-        elif instance.status == BookingStatus.ACTIVE:
-            NotificationService.create_booking_started_notification(instance)
-        
-        elif instance.status == BookingStatus.COMPLETED:
-            NotificationService.create_booking_completed_notification(instance)
-        
-        # Deposit status changes
-        if instance.deposit_status == DepositStatus.RECEIVED:
-            NotificationService.create_deposit_paid_notification(instance)
-        
-        if instance.deposit_status == DepositStatus.RETURNED:
-            NotificationService.create_deposit_released_notification(instance)
-        
-        if instance.deposit_status == DepositStatus.KEPT:
-            NotificationService.create_deposit_held_notification(instance)
+
+
+# Notifications sent for each booking state transition
+TRANSITION_NOTIFICATIONS = {
+    "accept": [NotificationService.create_booking_accepted_notification],
+    "decline": [NotificationService.create_booking_declined_notification],
+    "activate": [NotificationService.create_booking_started_notification],
+    "complete": [NotificationService.create_booking_completed_notification],
+    "receive_deposit": [
+        NotificationService.create_booking_started_notification,
+        NotificationService.create_deposit_paid_notification,
+    ],
+    "return_deposit": [
+        NotificationService.create_booking_completed_notification,
+        NotificationService.create_deposit_released_notification,
+    ],
+    "keep_deposit": [NotificationService.create_deposit_held_notification],
+}
+
+
+@receiver(booking_transitioned)
+def booking_transition_notification_handler(sender, booking, transition, **kwargs):
+    """Handle notification creation for booking state transitions."""
+    for notify in TRANSITION_NOTIFICATIONS.get(transition, []):
+        notify(booking)
 
 
 @receiver(post_save, sender=Rating)
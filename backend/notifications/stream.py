@@ -0,0 +1,315 @@
+"""Server-Sent Events stream of a user's notifications.
+
+``GET /api/notifications/stream/`` (an async view, served under ASGI)
+keeps one connection per client open and writes:
+
+* ``event: notification`` with the serialized notification, whose SSE id
+  is its ``created_at`` in microseconds since the epoch;
+* ``event: unread`` with ``{"unread_count": n}`` on connect and whenever
+  the count changes;
+* a ``: heartbeat`` comment every ``NOTIFICATION_STREAM_HEARTBEAT`` seconds.
+
+Events are fanned out by ``broker``, an in-process pub/sub fed by the
+notification service after each write commits. A client reconnecting with
+``Last-Event-ID`` first receives what it missed from the database.
+
+Notifications created by another worker process are picked up by
+``StreamListener``, one thread per process that polls every heartbeat for all
+users with an open stream and hands new rows to ``broker``. Streams never
+query on their own after connecting, and every query closes its database
+connection, so open streams hold no connections.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+QUEUE_SIZE = 100
+CATCH_UP_LIMIT = 100
+CATCH_UP_WINDOW = timedelta(seconds=30)
+SENT_MEMORY = 500
+LISTENER_LIMIT = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def event_id(created_at: datetime) -> str:
+    return str((created_at - EPOCH) // timedelta(microseconds=1))
+
+
+def parse_event_id(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return EPOCH + timedelta(microseconds=int(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def format_event(event: str, data, id: Optional[str] = None) -> str:
+    lines = [f"event: {event}"]
+    if id is not None:
+        lines.append(f"id: {id}")
+    lines.append("data: " + json.dumps(data, cls=JSONEncoder, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+def _serialize(notification) -> dict:
+    from .serializers import NotificationSerializer
+
+    return NotificationSerializer(notification).data
+
+
+class NotificationBroker:
+    """Routes events to the SSE connections of this process, by user."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        # Ids published recently, so the listener skips them
+        self._published = OrderedDict()
+
+    def subscribe(self, user_id) -> asyncio.Queue:
+        """Register a queue on the running event loop for ``user_id``'s events."""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        queue.loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers[str(user_id)].add(queue)
+        start_listener()
+        return queue
+
+    def unsubscribe(self, user_id, queue: asyncio.Queue) -> None:
+        with self._lock:
+            queues = self._subscribers.get(str(user_id))
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[str(user_id)]
+
+    def has_subscribers(self, user_id) -> bool:
+        return str(user_id) in self._subscribers
+
+    def user_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._subscribers)
+
+    def _mark_published(self, notification) -> bool:
+        """Remember ``notification``; False if it was published already."""
+        key = str(notification.pk)
+        with self._lock:
+            if key in self._published:
+                return False
+            self._published[key] = None
+            if len(self._published) > LISTENER_LIMIT:
+                self._published.popitem(last=False)
+        return True
+
+    def publish(self, user_id, event: tuple) -> None:
+        """Hand ``event`` to every connection of ``user_id``; safe from any thread."""
+        with self._lock:
+            queues = list(self._subscribers.get(str(user_id), ()))
+        for queue in queues:
+            try:
+                queue.loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # The connection's event loop is gone
+                self.unsubscribe(user_id, queue)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: tuple) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stalled client; it catches up when it reconnects with Last-Event-ID
+            pass
+
+    def publish_notifications(self, notifications: Iterable, kind: str = "notification") -> List:
+        """Publish ``notifications`` not published before; returns those."""
+        published = []
+        for notification in notifications:
+            if not self.has_subscribers(notification.recipient_id):
+                continue
+            if not self._mark_published(notification):
+                continue
+            published.append(notification)
+            self.publish(
+                notification.recipient_id,
+                (kind, notification.created_at, _serialize(notification)),
+            )
+        return published
+
+    def publish_unread(self, user_ids: Iterable) -> None:
+        from .counters import unread_count
+
+        for user_id in user_ids:
+            if self.has_subscribers(user_id):
+                self.publish(user_id, ("unread", None, {"unread_count": unread_count(user_id)}))
+
+
+broker = NotificationBroker()
+
+
+def publish_on_commit(notifications: List) -> None:
+    """Stream newly created notifications once the current transaction commits."""
+    if notifications:
+        transaction.on_commit(lambda: broker.publish_notifications(notifications))
+
+
+def _missed(user_id, since: datetime) -> List[tuple]:
+    from .models import Notification
+
+    try:
+        notifications = (
+            Notification.objects.filter(
+                recipient_id=user_id,
+                deleted_at__isnull=True,
+                created_at__gt=since,
+            )
+            .order_by("created_at")[:CATCH_UP_LIMIT]
+        )
+        return [("notification", n.created_at, _serialize(n)) for n in notifications]
+    finally:
+        release_connection()
+
+
+def _unread(user_id) -> tuple:
+    from .counters import unread_count
+
+    try:
+        return ("unread", None, {"unread_count": unread_count(user_id)})
+    finally:
+        release_connection()
+
+
+def release_connection() -> None:
+    """Close this thread's connection unless a transaction is using it."""
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+class StreamListener(threading.Thread):
+    """
+    Polls for notifications written by other processes, once per process.
+
+    Every heartbeat, one query fetches the new notifications of all users
+    with an open stream in this process; ``broker`` fans them out.
+    """
+
+    def __init__(self):
+        super().__init__(name="notification-stream-listener", daemon=True)
+        self.since = timezone.now()
+
+    def run(self):
+        while True:
+            time.sleep(max(getattr(settings, "NOTIFICATION_STREAM_HEARTBEAT", 15), 1))
+            close_old_connections()
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Notification stream listener error: {e}")
+            finally:
+                connection.close()
+
+    def poll(self) -> int:
+        """Publish unseen notifications for subscribed users; returns how many."""
+        from .models import Notification
+
+        user_ids = broker.user_ids()
+        started = timezone.now()
+        if not user_ids:
+            self.since = started
+            return 0
+        # Rows are stamped before their transaction commits, so look back
+        # a little; ids already published are skipped
+        notifications = list(
+            Notification.objects.filter(
+                recipient_id__in=user_ids,
+                deleted_at__isnull=True,
+                created_at__gt=self.since - CATCH_UP_WINDOW,
+            )
+            .order_by("created_at")[:LISTENER_LIMIT]
+        )
+        if len(notifications) == LISTENER_LIMIT:
+            self.since = notifications[-1].created_at
+        else:
+            self.since = started
+        published = broker.publish_notifications(notifications, kind="missed")
+        broker.publish_unread({n.recipient_id for n in published})
+        return len(published)
+
+
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def start_listener() -> None:
+    """Start this process's ``StreamListener`` on first use."""
+    global _listener, _listener_pid
+    if _listener is None or _listener_pid != os.getpid():
+        with _listener_lock:
+            if _listener is None or _listener_pid != os.getpid():
+                _listener = StreamListener()
+                _listener_pid = os.getpid()
+                _listener.start()
+
+
+async def event_stream(user_id, last_event_id: Optional[str] = None):
+    """Async iterator of SSE frames for ``user_id`` until the client disconnects."""
+    heartbeat = getattr(settings, "NOTIFICATION_STREAM_HEARTBEAT", 15)
+    # Subscribe before the catch-up query so nothing falls in between
+    queue = broker.subscribe(user_id)
+    resume_from = parse_event_id(last_event_id)
+    # Never replay anything older than the resume point or the connection
+    floor = resume_from or timezone.now()
+    # Recently delivered ids
+    sent = OrderedDict()
+
+    def frame(event) -> Optional[str]:
+        kind, created_at, data = event
+        if kind == "missed":
+            # Found by the listener; anything before the connection is not ours
+            if created_at <= floor:
+                return None
+            kind = "notification"
+        if kind != "notification":
+            return format_event(kind, data)
+        if data["id"] in sent:
+            return None
+        sent[data["id"]] = None
+        if len(sent) > SENT_MEMORY:
+            sent.popitem(last=False)
+        return format_event(kind, data, id=event_id(created_at))
+
+    async def catch_up(since: datetime) -> List[str]:
+        events = await sync_to_async(_missed)(user_id, since)
+        return [chunk for chunk in map(frame, events) if chunk]
+
+    try:
+        yield f"retry: {heartbeat * 1000}\n\n"
+        if resume_from is not None:
+            for chunk in await catch_up(resume_from):
+                yield chunk
+        yield frame(await sync_to_async(_unread)(user_id))
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            chunk = frame(event)
+            if chunk:
+                yield chunk
+    finally:
+        broker.unsubscribe(user_id, queue)
@@ -14,8 +14,14 @@ def send_push_notification_task(notification_id: str):
     For production with Celery/Django-Q, convert this to:
     @shared_task or @task decorator
     
+    The notification is marked as sent when it has no active devices or
+    at least one device received it.
+    
     Args:
         notification_id: UUID of notification to send
+    
+    Returns:
+        The FCMService.send_multicast result, or None if nothing was sent
     """
     from .models import Notification, UserDevice
     from .fcm import FCMService
@@ -28,41 +34,36 @@ def send_push_notification_task(notification_id: str):
         )
     except Notification.DoesNotExist:
         logger.warning(f"Notification {notification_id} not found or already sent")
-        return
+        return None
     
-    # Get active devices for user
-    devices = UserDevice.objects.filter(
-        user=notification.recipient,
-        is_active=True
+    # Get active device tokens for user in one query
+    tokens = list(
+        UserDevice.objects.filter(
+            user=notification.recipient,
+            is_active=True
+        ).values_list('fcm_token', flat=True)
     )
     
-    if not devices.exists():
+    if not tokens:
         logger.info(f"No active devices for user {notification.recipient.username}")
         notification.push_sent = True
         notification.push_sent_at = timezone.now()
         notification.save(update_fields=['push_sent', 'push_sent_at', 'updated_at'])
-        return
+        return None
     
-    # Send to all devices
-    fcm_service = FCMService()
-    success_count = 0
+    # Send to all devices in one batched, pooled multicast
+    result = FCMService().send_multicast(
+        tokens,
+        title=notification.title,
+        body=notification.body,
+        data=notification.payload
+    )
     
-    for device in devices:
-        try:
-            success = fcm_service.send_notification(
-                token=device.fcm_token,
-                title=notification.title,
-                body=notification.body,
-                data=notification.payload
-            )
-            if success:
-                success_count += 1
-        except Exception as e:
-            logger.error(f"Failed to send push to device {device.id}: {str(e)}")
+    logger.info(f"Push notification sent to {result['success']}/{len(tokens)} devices")
     
-    # Mark as sent
-    notification.push_sent = True
-    notification.push_sent_at = timezone.now()
-    notification.save(update_fields=['push_sent', 'push_sent_at', 'updated_at'])
+    if result['success']:
+        notification.push_sent = True
+        notification.push_sent_at = timezone.now()
+        notification.save(update_fields=['push_sent', 'push_sent_at', 'updated_at'])
     
-    logger.info(f"Push notification sent to {success_count}/{devices.count()} devices")
+    return result
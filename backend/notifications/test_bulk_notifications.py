@@ -0,0 +1,126 @@
+"""
+Tests for bulk notification fan-out.
+Run with: python manage.py test notifications
+"""
+
+import uuid
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from bookings.models import Booking, BookingStatus
+from items.models import Item
+from notifications.models import Notification, NotificationOutbox, NotificationType
+from notifications.services import NotificationService
+from users.models import User
+
+
+# Push only, no notification_events row
+@override_settings(NOTIFICATION_REALTIME_BACKEND='sse')
+class BulkNotificationTests(TestCase):
+    """Item deletion/unavailability notifies every borrower in constant queries."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='bulkowner',
+            email='bulkowner@test.com',
+            phone='6000000000'
+        )
+        self.item = Item.objects.create(
+            owner=self.owner,
+            title='Kayak',
+            category='Outdoors',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+
+    def add_bookings(self, count, status=BookingStatus.PENDING):
+        start = Booking.objects.count()
+        for i in range(start, start + count):
+            borrower = User.objects.create_user(
+                id=uuid.uuid4(),
+                username=f'bulkborrower{i}',
+                email=f'bulkborrower{i}@test.com',
+                phone=f'61{i:08d}'
+            )
+            Booking.objects.create(
+                item=self.item,
+                owner=self.owner,
+                borrower=borrower,
+                status=status,
+                start_date=date.today(),
+                return_by_date=date.today() + timedelta(days=2),
+            )
+
+    def notify_unavailable(self):
+        bookings = Booking.objects.filter(item=self.item)
+        return NotificationService.create_item_unavailable_notification(self.item, bookings)
+
+    def test_query_count_does_not_grow_with_bookings(self):
+        self.add_bookings(2)
+        with CaptureQueriesContext(connection) as small:
+            self.notify_unavailable()
+        Notification.objects.all().delete()
+
+        self.add_bookings(10, status=BookingStatus.DECLINED)
+        with CaptureQueriesContext(connection) as large:
+            self.notify_unavailable()
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_only_pending_borrowers_are_notified_once(self):
+        self.add_bookings(3)
+        self.add_bookings(2, status=BookingStatus.DECLINED)
+
+        created = self.notify_unavailable()
+        again = self.notify_unavailable()
+
+        self.assertEqual(len(created), 3)
+        self.assertEqual(again, [])
+        self.assertEqual(
+            Notification.objects.filter(notification_type=NotificationType.ITEM_UNAVAILABLE).count(),
+            3,
+        )
+        self.assertEqual(
+            NotificationOutbox.objects.filter(notification__in=created).count(),
+            3,
+        )
+
+    def test_skips_existing_and_duplicate_keys(self):
+        key = NotificationService._generate_idempotency_key(self.owner.id, NotificationType.ITEM_DELETED, 'x')
+        NotificationService.create_notification(
+            recipient=self.owner,
+            notification_type=NotificationType.ITEM_DELETED,
+            title='Old',
+            body='Old',
+            idempotency_key=key,
+        )
+        fresh_key = NotificationService._generate_idempotency_key(self.owner.id, NotificationType.ITEM_DELETED, 'y')
+
+        created = NotificationService.create_notifications_bulk(
+            Notification(
+                recipient=self.owner,
+                notification_type=NotificationType.ITEM_DELETED,
+                title='New',
+                body='New',
+                idempotency_key=k,
+            )
+            for k in (key, fresh_key, fresh_key)
+        )
+
+        self.assertEqual([n.idempotency_key for n in created], [fresh_key])
+        self.assertEqual(Notification.objects.filter(idempotency_key=fresh_key).count(), 1)
+
+    def test_deleting_item_notifies_borrowers(self):
+        self.add_bookings(2, status=BookingStatus.ACCEPTED)
+
+        self.item.delete()
+
+        self.assertEqual(
+            Notification.objects.filter(notification_type=NotificationType.ITEM_DELETED).count(),
+            2,
+        )
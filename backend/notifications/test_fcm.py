@@ -0,0 +1,52 @@
+"""
+Tests for FCMService against the local fake FCM server.
+Run with: python manage.py test notifications
+"""
+
+import uuid
+
+from django.test import TestCase, override_settings
+
+from notifications.fake_fcm import FakeFCMServer
+from notifications.fcm import FCMService
+from notifications.models import UserDevice
+from users.models import User
+
+
+class FCMMulticastTests(TestCase):
+    """Batched multicast sends, per-token results and invalid-token cleanup."""
+
+    def setUp(self):
+        self.server = FakeFCMServer(invalid_tokens={'stale-1', 'stale-2'}).start()
+        self.addCleanup(self.server.stop)
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='fcmuser',
+            email='fcm@test.com',
+            phone='4444444444'
+        )
+        for token in ('good-1', 'stale-1', 'stale-2'):
+            UserDevice.objects.create(user=self.user, fcm_token=token, device_type='android')
+
+    def test_multicast_collects_results_and_deactivates_invalid_tokens(self):
+        tokens = ['good-1', 'stale-1', 'stale-2', 'good-2', 'good-3']
+
+        with override_settings(FCM_URL=self.server.url, FCM_SERVER_KEY='test', FCM_BATCH_SIZE=2):
+            result = FCMService().send_multicast(tokens, 'Title', 'Body', {'booking_id': 1})
+
+        self.assertEqual(result['success'], 3)
+        self.assertEqual(result['failure'], 2)
+        self.assertEqual(result['invalid'], 2)
+        self.assertEqual([r.token for r in result['results']], tokens)
+        # 5 tokens in batches of 2 -> 3 requests
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.requests[0]['data'], {'booking_id': '1'})
+        self.assertEqual(
+            set(UserDevice.objects.filter(is_active=False).values_list('fcm_token', flat=True)),
+            {'stale-1', 'stale-2'}
+        )
+
+    def test_send_notification_single_token(self):
+        with override_settings(FCM_URL=self.server.url, FCM_SERVER_KEY='test'):
+            self.assertTrue(FCMService().send_notification('good-1', 'Title', 'Body'))
+            self.assertFalse(FCMService().send_notification('stale-1', 'Title', 'Body'))
@@ -0,0 +1,84 @@
+"""
+Tests for idempotent notification creation.
+Run with: python manage.py test notifications
+"""
+
+import uuid
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from notifications.models import Notification, NotificationOutbox, NotificationType
+from notifications.services import NotificationService
+from users.models import User
+
+
+# Push only, no notification_events row
+@override_settings(NOTIFICATION_REALTIME_BACKEND='sse')
+class CreateNotificationIdempotencyTests(TestCase):
+    """Dedupe and insert happen in one statement; duplicates enqueue nothing."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='idemuser',
+            email='idem@test.com',
+            phone='7000000000'
+        )
+        self.key = NotificationService._generate_idempotency_key(
+            self.user.id, NotificationType.BOOKING_CREATED, 'booking-1'
+        )
+
+    def create(self, title='Title'):
+        return NotificationService.create_notification_if_new(
+            recipient=self.user,
+            notification_type=NotificationType.BOOKING_CREATED,
+            title=title,
+            body='Body',
+            payload={'booking_id': 'booking-1'},
+            idempotency_key=self.key,
+        )
+
+    def test_new_notification_is_one_insert(self):
+        with CaptureQueriesContext(connection) as ctx:
+            notification, created = self.create()
+
+        self.assertTrue(created)
+        statements = [
+            q['sql'] for q in ctx.captured_queries
+            if not q['sql'].upper().startswith(('SAVEPOINT', 'RELEASE'))
+        ]
+        # INSERT ... ON CONFLICT for the notification, UPDATE of the unread
+        # counter, INSERT for the outbox
+        self.assertEqual(len(statements), 3)
+        self.assertIn('ON CONFLICT DO NOTHING', statements[0])
+
+        stored = Notification.objects.get(pk=notification.pk)
+        self.assertEqual(stored.payload, {'booking_id': 'booking-1'})
+        self.assertIsNotNone(stored.created_at)
+        self.assertEqual(NotificationOutbox.objects.filter(notification=stored).count(), 1)
+
+    def test_duplicate_returns_existing_without_delivery(self):
+        first, _ = self.create()
+
+        second, created = self.create(title='Other')
+
+        self.assertFalse(created)
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.title, 'Title')
+        self.assertEqual(Notification.objects.filter(idempotency_key=self.key).count(), 1)
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+    def test_create_notification_returns_existing_on_duplicate(self):
+        first, _ = self.create()
+
+        again = NotificationService.create_notification(
+            recipient=self.user,
+            notification_type=NotificationType.BOOKING_CREATED,
+            title='Title',
+            body='Body',
+            idempotency_key=self.key,
+        )
+
+        self.assertEqual(again.pk, first.pk)
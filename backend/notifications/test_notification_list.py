@@ -0,0 +1,88 @@
+"""
+Tests for the notification list: cursor paging, since= and fields=.
+Run with: python manage.py test notifications
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+from notifications.models import Notification, NotificationType
+from users.models import User
+
+
+class NotificationListTests(APITestCase):
+    """The list pages by keyset and can be trimmed and refreshed incrementally."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='listuser',
+            email='list@test.com',
+            phone='9100000000'
+        )
+        self.client.force_authenticate(user=self.user)
+        now = timezone.now()
+        for i in range(5):
+            notification = Notification.objects.create(
+                recipient=self.user,
+                notification_type=NotificationType.BOOKING_CREATED,
+                title=f'Title {i}',
+                body='Body',
+                payload={'i': i},
+            )
+            Notification.objects.filter(pk=notification.pk).update(
+                created_at=now - timedelta(minutes=5 - i)
+            )
+        self.deleted = Notification.objects.create(
+            recipient=self.user,
+            notification_type=NotificationType.BOOKING_CREATED,
+            title='Deleted',
+            body='Body',
+            deleted_at=now,
+        )
+
+    def test_cursor_pages_without_count(self):
+        titles = []
+        url = '/api/notifications/?pagination=cursor&page_size=2'
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+            titles += [row['title'] for row in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(titles, [f'Title {i}' for i in range(4, -1, -1)])
+
+    def test_since_returns_only_newer(self):
+        cutoff = Notification.objects.get(title='Title 2').created_at
+        since = cutoff.isoformat().replace('+', '%2B')
+
+        response = self.client.get(f'/api/notifications/?pagination=cursor&since={since}')
+
+        self.assertEqual(
+            [row['title'] for row in response.data['results']],
+            ['Title 4', 'Title 3'],
+        )
+        self.assertEqual(self.client.get('/api/notifications/?since=later').status_code, 400)
+
+    def test_fields_trims_output(self):
+        response = self.client.get('/api/notifications/?pagination=cursor&fields=id,title,is_read')
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'is_read'})
+        self.assertEqual(
+            self.client.get('/api/notifications/?fields=title,secret').status_code,
+            400,
+        )
+
+    def test_default_list_is_unchanged(self):
+        response = self.client.get('/api/notifications/')
+
+        self.assertEqual(response.data['count'], 5)
+        self.assertIn('body', response.data['results'][0])
@@ -0,0 +1,137 @@
+"""
+Tests for the notification delivery outbox.
+Run with: python manage.py test notifications
+"""
+
+import uuid
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from notifications import outbox
+from notifications.fcm import FCMResult, FCMService
+from notifications.models import (
+    Notification,
+    NotificationOutbox,
+    NotificationType,
+    OutboxChannel,
+    OutboxStatus,
+    UserDevice,
+)
+from notifications.services import NotificationService
+from users.models import User
+
+
+@override_settings(NOTIFICATION_REALTIME_BACKEND='supabase')
+class NotificationOutboxTests(TestCase):
+    """Side effects are recorded in the outbox and delivered by drain()."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='outboxuser',
+            email='outbox@test.com',
+            phone='3333333333'
+        )
+
+    def create_notification(self, send_push=True):
+        return NotificationService.create_notification(
+            recipient=self.user,
+            notification_type=NotificationType.BOOKING_CREATED,
+            title='Title',
+            body='Body',
+            send_push=send_push,
+        )
+
+    @mock.patch('notifications.realtime.requests.post')
+    @mock.patch('notifications.fcm.requests.post')
+    def test_create_notification_only_writes_outbox(self, fcm_post, realtime_post):
+        notification = self.create_notification()
+
+        channels = set(
+            NotificationOutbox.objects.filter(notification=notification)
+            .values_list('channel', flat=True)
+        )
+        self.assertEqual(channels, {OutboxChannel.REALTIME, OutboxChannel.PUSH})
+        fcm_post.assert_not_called()
+        realtime_post.assert_not_called()
+
+    def test_drain_marks_entries_sent(self):
+        self.create_notification(send_push=False)
+        handler = mock.Mock()
+
+        with mock.patch.dict(outbox.HANDLERS, {OutboxChannel.REALTIME: handler}):
+            result = outbox.drain()
+
+        self.assertEqual(result['sent'], 1)
+        handler.assert_called_once()
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, OutboxStatus.SENT)
+        self.assertEqual(entry.attempts, 1)
+
+    def test_failed_delivery_is_retried_then_dead_lettered(self):
+        self.create_notification(send_push=False)
+        failing = mock.Mock(side_effect=outbox.DeliveryError('boom'))
+
+        with self.settings(NOTIFICATION_OUTBOX_MAX_ATTEMPTS=2), \
+                mock.patch.dict(outbox.HANDLERS, {OutboxChannel.REALTIME: failing}):
+            self.assertEqual(outbox.drain()['retried'], 1)
+            entry = NotificationOutbox.objects.get()
+            self.assertEqual(entry.status, OutboxStatus.PENDING)
+            self.assertIn('boom', entry.last_error)
+
+            # Not due yet: backoff hides it from the next drain
+            self.assertEqual(outbox.drain()['claimed'], 0)
+
+            NotificationOutbox.objects.update(next_attempt_at=entry.created_at)
+            self.assertEqual(outbox.drain()['dead'], 1)
+
+        self.assertEqual(NotificationOutbox.objects.get().status, OutboxStatus.DEAD)
+
+
+@override_settings(NOTIFICATION_REALTIME_BACKEND='sse', FCM_SERVER_KEY='test')
+class PushDeliveryTests(TestCase):
+    """The push channel is retried unless some device received the push."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='pushuser',
+            email='push@test.com',
+            phone='3333333334'
+        )
+        for token in ('device-1', 'device-2'):
+            UserDevice.objects.create(user=self.user, fcm_token=token, device_type='android')
+        self.notification = NotificationService.create_notification(
+            recipient=self.user,
+            notification_type=NotificationType.BOOKING_CREATED,
+            title='Title',
+            body='Body',
+        )
+
+    def drain_with(self, *errors):
+        results = [
+            FCMResult(token, error is None, error)
+            for token, error in zip(('device-1', 'device-2'), errors)
+        ]
+        with mock.patch.object(FCMService, '_send_batch', return_value=results):
+            return outbox.drain()
+
+    def test_transient_failure_is_retried(self):
+        result = self.drain_with('HTTP503', 'HTTP503')
+
+        self.assertEqual(result['retried'], 1)
+        self.assertIn('HTTP503', NotificationOutbox.objects.get().last_error)
+        self.assertFalse(Notification.objects.get().push_sent)
+
+    def test_partial_success_marks_sent(self):
+        result = self.drain_with(None, 'Unavailable')
+
+        self.assertEqual(result['sent'], 1)
+        self.assertTrue(Notification.objects.get().push_sent)
+
+    def test_permanent_failure_is_not_retried(self):
+        result = self.drain_with('NotRegistered', 'InvalidRegistration')
+
+        self.assertEqual(result['sent'], 1)
+        self.assertFalse(Notification.objects.get().push_sent)
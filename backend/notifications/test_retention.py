@@ -0,0 +1,100 @@
+"""
+Tests for notification retention.
+Run with: python manage.py test notifications
+"""
+
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from notifications import retention
+from notifications.models import (
+    Notification,
+    NotificationArchive,
+    NotificationOutbox,
+    NotificationType,
+    UnreadCounter,
+)
+from notifications.services import NotificationService
+from users.models import User
+
+
+@override_settings(NOTIFICATION_RETENTION_DELETED_DAYS=30, NOTIFICATION_RETENTION_READ_DAYS=180)
+class NotificationRetentionTests(TestCase):
+    """Expired rows are removed in batches; unread ones are never touched."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='retentionuser',
+            email='retention@test.com',
+            phone='9200000000'
+        )
+        now = timezone.now()
+        self.old_deleted = [self.make('Deleted', deleted_at=now - timedelta(days=40)) for _ in range(3)]
+        self.recent_deleted = self.make('Recently deleted', deleted_at=now - timedelta(days=1))
+        self.old_read = [self.make('Old read', is_read=True, age=200) for _ in range(2)]
+        self.old_unread = self.make('Old unread', age=400)
+
+    def make(self, title, age=0, **fields):
+        notification = NotificationService.create_notification(
+            recipient=self.user,
+            notification_type=NotificationType.BOOKING_CREATED,
+            title=title,
+            body='Body',
+        )
+        Notification.objects.filter(pk=notification.pk).update(
+            created_at=timezone.now() - timedelta(days=age),
+            **fields
+        )
+        return notification
+
+    def test_prunes_expired_in_batches(self):
+        unread_before = UnreadCounter.objects.get(user=self.user).unread_count
+
+        totals = retention.prune(batch_size=2, archive=False)
+
+        self.assertEqual(totals, {'deleted': 3, 'read': 2, 'batches': 3})
+        self.assertEqual(
+            set(Notification.objects.values_list('title', flat=True)),
+            {'Recently deleted', 'Old unread'},
+        )
+        self.assertFalse(
+            NotificationOutbox.objects.filter(notification_id__in=[n.id for n in self.old_read]).exists()
+        )
+        self.assertEqual(UnreadCounter.objects.get(user=self.user).unread_count, unread_before)
+
+    def test_max_batches_bounds_a_run(self):
+        totals = retention.prune(batch_size=2, archive=False, max_batches=1)
+
+        self.assertEqual(totals['batches'], 1)
+        self.assertEqual(Notification.objects.count(), 5)
+
+    def test_archive_keeps_a_copy(self):
+        retention.prune(archive=True)
+
+        archived = NotificationArchive.objects.get(pk=self.old_read[0].pk)
+        self.assertEqual(archived.title, 'Old read')
+        self.assertTrue(archived.is_read)
+        self.assertEqual(NotificationArchive.objects.count(), 5)
+
+    @override_settings(NOTIFICATION_ARCHIVE_MONTHS=3)
+    def test_expire_archive_drops_old_months(self):
+        retention.prune(archive=True)
+
+        removed = retention.expire_archive()
+
+        self.assertEqual(removed, 2)
+        self.assertFalse(NotificationArchive.objects.filter(title='Old read').exists())
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command('prune_notifications', '--dry-run', stdout=out)
+
+        self.assertIn('deleted: 3', out.getvalue())
+        self.assertIn('read: 2', out.getvalue())
+        self.assertEqual(Notification.objects.count(), 7)
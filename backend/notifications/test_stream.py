@@ -0,0 +1,125 @@
+"""
+Tests for the Server-Sent Events notification stream.
+Run with: python manage.py test notifications
+"""
+
+import json
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from notifications.models import Notification, NotificationType
+from notifications.services import NotificationService
+from notifications.stream import StreamListener, broker, event_id, event_stream
+from users.models import User
+
+
+def parse(frame):
+    fields = dict(line.split(': ', 1) for line in frame.strip().splitlines())
+    return fields['event'], fields.get('id'), json.loads(fields['data'])
+
+
+class NotificationStreamTests(TestCase):
+    """The stream pushes notifications and unread counts, and can resume."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='streamuser',
+            email='stream@test.com',
+            phone='9000000000'
+        )
+
+    def notify(self, title='Title'):
+        return NotificationService.create_notification(
+            recipient=self.user,
+            notification_type=NotificationType.BOOKING_CREATED,
+            title=title,
+            body='Body',
+            send_push=False,
+        )
+
+    def notify_and_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.notify()
+
+    def test_requires_authentication(self):
+        response = self.client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_response_headers(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(response.streaming)
+
+    async def test_pushes_notifications_after_commit(self):
+        stream = event_stream(self.user.pk)
+        self.assertTrue((await anext(stream)).startswith('retry:'))
+        self.assertEqual(parse(await anext(stream))[0], 'unread')
+        self.assertTrue(broker.has_subscribers(self.user.pk))
+
+        notification = await sync_to_async(self.notify_and_commit)()
+
+        kind, id, data = parse(await anext(stream))
+        self.assertEqual(kind, 'notification')
+        self.assertEqual(id, event_id(notification.created_at))
+        self.assertEqual(data['id'], str(notification.id))
+        self.assertEqual(parse(await anext(stream)), ('unread', None, {'unread_count': 1}))
+
+        await stream.aclose()
+        self.assertFalse(broker.has_subscribers(self.user.pk))
+
+    async def test_resumes_from_last_event_id(self):
+        older = await sync_to_async(self.notify)('Older')
+        newer = await sync_to_async(self.notify)('Newer')
+        await Notification.objects.filter(pk=older.pk).aupdate(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        older = await Notification.objects.aget(pk=older.pk)
+
+        stream = event_stream(self.user.pk, event_id(older.created_at))
+        await anext(stream)
+        kind, _, data = parse(await anext(stream))
+        self.assertEqual((kind, data['title']), ('notification', 'Newer'))
+        self.assertEqual(parse(await anext(stream))[2], {'unread_count': 2})
+        await stream.aclose()
+
+    async def test_listener_delivers_notifications_from_other_processes(self):
+        stream = event_stream(self.user.pk)
+        await anext(stream)
+        await anext(stream)
+
+        # Created without publishing, as if by another worker
+        notification = await sync_to_async(self.notify)()
+        await Notification.objects.filter(pk=notification.pk).aupdate(
+            created_at=timezone.now() + timedelta(seconds=1)
+        )
+        # That worker dropped the cached badge count when it committed
+        await sync_to_async(cache.clear)()
+        listener = StreamListener()
+        self.assertEqual(await sync_to_async(listener.poll)(), 1)
+        # Seen once, never again
+        self.assertEqual(await sync_to_async(listener.poll)(), 0)
+
+        kind, _, data = parse(await anext(stream))
+        self.assertEqual((kind, data['id']), ('notification', str(notification.id)))
+        self.assertEqual(parse(await anext(stream)), ('unread', None, {'unread_count': 1}))
+        await stream.aclose()
+
+    @override_settings(NOTIFICATION_STREAM_HEARTBEAT=0)
+    async def test_heartbeat_does_not_query(self):
+        stream = event_stream(self.user.pk)
+        await anext(stream)
+        await anext(stream)
+
+        await sync_to_async(self.notify)()
+        self.assertEqual(await anext(stream), ': heartbeat\n\n')
+        self.assertEqual(await anext(stream), ': heartbeat\n\n')
+        await stream.aclose()
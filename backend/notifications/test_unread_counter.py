@@ -0,0 +1,108 @@
+"""
+Tests for the denormalized unread notification counter.
+Run with: python manage.py test notifications
+"""
+
+import uuid
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+
+from notifications.models import Notification, NotificationType, UnreadCounter
+from notifications.services import NotificationService
+from users.models import User
+
+
+class UnreadCounterTests(APITestCase):
+    """Every service write keeps UnreadCounter equal to the real count."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='badgeuser',
+            email='badge@test.com',
+            phone='8000000000'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def notify(self, count=1):
+        return [
+            NotificationService.create_notification(
+                recipient=self.user,
+                notification_type=NotificationType.BOOKING_CREATED,
+                title='Title',
+                body='Body',
+                send_push=False,
+            )
+            for _ in range(count)
+        ]
+
+    def counter(self):
+        return UnreadCounter.objects.get(user=self.user).unread_count
+
+    def test_writes_keep_counter_in_sync(self):
+        first, second, third, fourth = self.notify(4)
+        self.assertEqual(self.counter(), 4)
+
+        NotificationService.mark_as_read(first.id, self.user)
+        NotificationService.mark_as_read(first.id, self.user)
+        self.assertEqual(self.counter(), 3)
+
+        NotificationService.delete_notification(second.id, self.user)
+        NotificationService.delete_notification(first.id, self.user)
+        self.assertEqual(self.counter(), 2)
+
+        NotificationService.mark_all_as_read(self.user)
+        self.assertEqual(self.counter(), 0)
+
+    def test_endpoint_reads_counter_and_supports_etag(self):
+        self.notify(2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/notifications/unread_count/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['unread_count'], 2)
+        self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get(
+                '/api/notifications/unread_count/',
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            )
+        self.assertEqual(cached.status_code, 304)
+        self.assertFalse(any('notification_unread_counters' in q['sql'] for q in ctx.captured_queries))
+
+    def test_mark_as_read_invalidates_cached_count(self):
+        notification, = self.notify()
+        self.client.get('/api/notifications/unread_count/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                '/api/notifications/mark_as_read/',
+                {'notification_ids': [str(notification.id)]},
+                format='json',
+            )
+
+        response = self.client.get('/api/notifications/unread_count/')
+        self.assertEqual(response.data['unread_count'], 0)
+
+    def test_missing_counter_is_seeded(self):
+        self.notify(2)
+        UnreadCounter.objects.all().delete()
+
+        self.assertEqual(NotificationService.get_unread_count(self.user), 2)
+        self.assertEqual(self.counter(), 2)
+
+    def test_reconcile_fixes_drift(self):
+        self.notify(3)
+        UnreadCounter.objects.filter(user=self.user).update(unread_count=42)
+        Notification.objects.filter(recipient=self.user).update(is_read=True)
+
+        call_command('reconcile_unread_counts', stdout=open('/dev/null', 'w'))
+
+        self.assertEqual(self.counter(), 0)
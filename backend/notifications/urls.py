@@ -1,12 +1,14 @@
 """URL configuration for notifications app."""
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import NotificationViewSet, UserDeviceViewSet
+from .views import NotificationViewSet, UserDeviceViewSet, notification_stream
 
 router = DefaultRouter()
 router.register(r'notifications', NotificationViewSet, basename='notification')
 router.register(r'devices', UserDeviceViewSet, basename='device')
 
 urlpatterns = [
+    # Before the router so "stream" is not taken for a notification id
+    path('notifications/stream/', notification_stream, name='notification-stream'),
     path('', include(router.urls)),
 ]
@@ -1,9 +1,15 @@
 """Views for notification API endpoints."""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework import viewsets, status
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.utils import timezone
+
+from items.cache import compute_etag, etag_matches
+from pagination import KeysetPagination, parse_since
+from users.authentication import SupabaseAuthentication
 
 from .models import Notification, UserDevice
 from .serializers import (
@@ -15,6 +21,13 @@ from .serializers import (
 )
 from .permissions import IsNotificationRecipient, IsDeviceOwner
 from .services import NotificationService
+from .stream import event_stream, release_connection
+
+
+class NotificationCursorPagination(KeysetPagination):
+    """Keyset pagination over the partial (recipient, -created_at, -id) index."""
+    
+    ordering = ("-created_at", "-id")
 
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
@@ -28,23 +41,71 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     - Mark all as read (POST /api/notifications/mark_all_as_read/)
     - Delete notification (DELETE /api/notifications/{id}/)
     - Get unread count (GET /api/notifications/unread_count/)
+    - Stream notifications (GET /api/notifications/stream/, see notification_stream)
+    
+    The list accepts ?since=<ISO datetime> (only newer notifications),
+    ?fields=id,title,... (sparse output; any NotificationSerializer field)
+    and opts into cursor paging with ?pagination=cursor or ?cursor=.
     """
     
     permission_classes = [IsAuthenticated, IsNotificationRecipient]
     
+    @property
+    def paginator(self):
+        """Use keyset pagination (no COUNT, no OFFSET) when the client opts in."""
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("cursor") or params.get("pagination") == "cursor":
+                self._paginator = NotificationCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+    
     def get_queryset(self):
         """Return notifications for current user, excluding soft-deleted."""
-        return Notification.objects.filter(
+        queryset = Notification.objects.filter(
             recipient=self.request.user,
             deleted_at__isnull=True
-        ).order_by('-created_at')
+        ).order_by('-created_at', '-id')
+        
+        if self.action == 'list':
+            raw_since = self.request.query_params.get('since')
+            if raw_since:
+                since = parse_since(raw_since)
+                if since is None:
+                    raise ValidationError({"since": "since must be an ISO 8601 date or datetime"})
+                queryset = queryset.filter(created_at__gt=since)
+            
+            fields = self.requested_fields()
+            if fields is not None:
+                # Skip loading body/payload when they are not wanted
+                queryset = queryset.only('id', 'created_at', *fields)
+        return queryset
+    
+    def requested_fields(self):
+        """Fields asked for with ?fields=, or None for the default list output."""
+        raw = self.request.query_params.get('fields', '')
+        fields = [f.strip() for f in raw.split(',') if f.strip()]
+        if not fields:
+            return None
+        unknown = set(fields) - set(NotificationSerializer.Meta.fields)
+        if unknown:
+            raise ValidationError({"fields": f"Unknown field(s): {', '.join(sorted(unknown))}"})
+        return fields
     
     def get_serializer_class(self):
         """Use lightweight serializer for list view."""
-        if self.action == 'list':
+        if self.action == 'list' and self.requested_fields() is None:
             return NotificationListSerializer
         return NotificationSerializer
     
+    def get_serializer(self, *args, **kwargs):
+        if self.action == 'list':
+            fields = self.requested_fields()
+            if fields is not None:
+                kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+    
     def destroy(self, request, *args, **kwargs):
         """Soft delete a notification."""
         notification = self.get_object()
@@ -81,15 +142,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Mark notifications as read
-        updated = Notification.objects.filter(
-            id__in=notification_ids,
-            recipient=request.user,
-            is_read=False
-        ).update(
-            is_read=True,
-            read_at=timezone.now()
-        )
+        updated = NotificationService.mark_many_as_read(notification_ids, request.user)
         
         return Response({
             "marked_as_read": updated
@@ -106,11 +159,23 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        """Get count of unread notifications."""
+        """
+        Get count of unread notifications.
+        
+        Served from the per-user counter; clients polling the badge should
+        send If-None-Match and get 304 while the count is unchanged.
+        """
         count = NotificationService.get_unread_count(request.user)
         serializer = UnreadCountSerializer({"unread_count": count})
+        etag = compute_etag(serializer.data)
         
-        return Response(serializer.data)
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(serializer.data)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
 
 class UserDeviceViewSet(viewsets.ModelViewSet):
@@ -134,3 +199,50 @@ class UserDeviceViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Associate device with current user."""
         serializer.save(user=self.request.user)
+
+
+def _authenticate(request):
+    try:
+        return SupabaseAuthentication().authenticate(request)
+    finally:
+        # The stream stays open for hours; don't hold a connection for it
+        release_connection()
+
+
+async def _stream_user(request):
+    """Authenticate like the DRF views: Supabase bearer token, then session."""
+    try:
+        result = await sync_to_async(_authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    if result is not None:
+        return result[0]
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+async def notification_stream(request):
+    """
+    Server-Sent Events stream of the current user's notifications.
+    
+    GET /api/notifications/stream/ (send Last-Event-ID to resume).
+    Served by the ASGI stream process (see asgi.py); see
+    notifications/stream.py for the protocol.
+    """
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed."}, status=405)
+    user = await _stream_user(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=401
+        )
+    
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("lastEventId")
+    response = StreamingHttpResponse(
+        event_stream(user.pk, last_event_id),
+        content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,227 @@
+"""Keyset (cursor) pagination shared by the list endpoints.
+
+Unlike PageNumberPagination this never runs COUNT(*) and never uses
+OFFSET: each page is fetched with a filter on the ordering columns, so
+deep pages cost the same as the first one when a matching index exists.
+When every ordering column is a model field sorted in the same direction,
+as with ``-created_at, -id``, the filter is a real row comparison,
+``WHERE (created_at, id) < (%s, %s)``, which PostgreSQL serves as a
+single range scan of the matching composite index. Mixed directions and
+annotations (``distance_km, id``; ``-search_rank, -id``) use the
+equivalent ``a < x OR (a = x AND b < y)`` expansion instead.
+
+Cursors are opaque url-safe tokens encoding the ordering values of the
+last row on the page. Only forward paging is supported, which is what
+infinite-scroll clients need.
+"""
+import base64
+import json
+from datetime import datetime, time
+from typing import Any, List, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import BooleanField, Expression, F, Q, Value
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def parse_since(value: str) -> Optional[datetime]:
+    """Parse an incremental-refresh bound (ISO date or datetime); None if invalid."""
+    # '+' in a raw query string arrives as a space
+    value = value.strip().replace(" ", "+")
+    try:
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            since = datetime.combine(day, time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+class RowComparison(Expression):
+    """``(a, b, ...) < (x, y, ...)`` (or ``>``) over model fields, for ``filter()``."""
+
+    conditional = True
+
+    def __init__(self, fields: List[str], values: List[Any], operator: str):
+        super().__init__(output_field=BooleanField())
+        self.lhs = [F(name) for name in fields]
+        self.rhs = list(values)
+        self.operator = operator
+
+    def get_source_expressions(self):
+        return [*self.lhs, *self.rhs]
+
+    def set_source_expressions(self, exprs):
+        half = len(exprs) // 2
+        self.lhs, self.rhs = list(exprs[:half]), list(exprs[half:])
+
+    def resolve_expression(self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False):
+        clone = self.copy()
+        clone.lhs = [e.resolve_expression(query, allow_joins, reuse, summarize, for_save) for e in self.lhs]
+        # Bind each value to its column's field so it is adapted like one
+        clone.rhs = [
+            (value if hasattr(value, "resolve_expression") else Value(value, output_field=column.output_field))
+            .resolve_expression(query, allow_joins, reuse, summarize, for_save)
+            for column, value in zip(clone.lhs, self.rhs)
+        ]
+        return clone
+
+    def as_sql(self, compiler, connection):
+        sides, params = [], []
+        for exprs in (self.lhs, self.rhs):
+            parts = []
+            for expr in exprs:
+                sql, expr_params = compiler.compile(expr)
+                parts.append(sql)
+                params.extend(expr_params)
+            sides.append(f"({', '.join(parts)})")
+        return f"{sides[0]} {self.operator} {sides[1]}", params
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over ``ordering``.
+
+    ``ordering`` must be unique as a whole (end it with the primary key)
+    so that rows sharing a timestamp are neither skipped nor repeated.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_params = ("page_size", "pageSize")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+
+    def get_page_size(self, request) -> int:
+        for param in self.page_size_query_params:
+            raw = request.query_params.get(param)
+            if raw:
+                try:
+                    size = int(raw)
+                except ValueError:
+                    continue
+                if size > 0:
+                    return min(size, self.max_page_size)
+        return self.page_size
+
+    def encode_cursor(self, instance) -> str:
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip("-"))
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            elif not isinstance(value, (int, float, str)):
+                value = str(value)
+            values.append(value)
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, token: str, model) -> List[Any]:
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self._to_python(model, field.lstrip("-"), value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _to_python(model, name, value):
+        """Coerce a cursor value; annotations (e.g. distances) stay JSON-native."""
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            if not isinstance(value, (int, float)):
+                raise ValueError(name)
+            return value
+        return field.to_python(value)
+
+    def keyset_filter(self, values: List[Any], model=None):
+        """Rows strictly after ``values`` in ``ordering`` (lexicographic).
+
+        A row comparison when ``model`` has every ordering field and they
+        share one direction; otherwise the OR-of-ANDs expansion.
+        """
+        names = [field.lstrip("-") for field in self.ordering]
+        directions = {field.startswith("-") for field in self.ordering}
+        if model is not None and len(directions) == 1 and all(
+            self._is_column(model, name) for name in names
+        ):
+            return RowComparison(names, values, "<" if directions.pop() else ">")
+
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    @staticmethod
+    def _is_column(model, name) -> bool:
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return getattr(field, "concrete", False) and not field.is_relation
+
+    def paginate_queryset(self, queryset, request, view=None) -> Optional[list]:
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            values = self.decode_cursor(token, queryset.model)
+            queryset = queryset.filter(self.keyset_filter(values, queryset.model))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        self.next_cursor = self.encode_cursor(self.page[-1]) if self.has_next else None
+        return self.page
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, "page")
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "next_cursor": self.next_cursor,
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "next_cursor": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,60 @@
+"""Recompute users' rating_sum and rating_count from the ratings table."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from items.cache import item_response_cache
+from ratings.models import Rating
+from users.models import User
+from users.token_cache import token_cache
+
+
+def _received(aggregate):
+    """Correlated subquery computing ``aggregate`` over a user's received ratings."""
+    return Coalesce(
+        Subquery(
+            Rating.objects.filter(target_user_id=OuterRef("pk"))
+            .order_by()
+            .values("target_user_id")
+            .annotate(value=aggregate)
+            .values("value")
+        ),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+class Command(BaseCommand):
+    help = "Fix drifted user rating stats with one set-based UPDATE."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many users have drifted stats.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = list(
+                User.objects.annotate(
+                    expected_sum=_received(Sum("stars")),
+                    expected_count=_received(Count("id")),
+                )
+                .filter(~Q(rating_sum=F("expected_sum")) | ~Q(rating_count=F("expected_count")))
+                .values_list("pk", flat=True)
+            )
+            if options["dry_run"] or not drifted:
+                self.stdout.write(f"{len(drifted)} user(s) with drifted rating stats")
+                return
+
+            updated = User.objects.filter(pk__in=drifted).update(
+                rating_sum=_received(Sum("stars")),
+                rating_count=_received(Count("id")),
+            )
+
+        for user_id in drifted:
+            token_cache.invalidate_user(user_id)
+        item_response_cache.invalidate_owners(drifted)
+        self.stdout.write(self.style.SUCCESS(f"Reconciled rating stats for {updated} user(s)"))
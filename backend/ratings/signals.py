@@ -1,29 +1,73 @@
-"""Signals for ratings app."""
-from django.db.models import Sum
-from django.db.models.signals import post_save, post_delete
+"""Signals for ratings app.
+
+User rating stats are maintained incrementally with atomic
+``F()`` updates, so a new rating costs one single-row UPDATE instead of a
+scan over all of the user's ratings, and concurrent rating writes cannot
+overwrite each other's totals. ``python manage.py reconcile_rating_stats``
+recomputes the totals from the ratings table if they ever drift.
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from items.cache import item_response_cache
+from users.models import User
+from users.token_cache import token_cache
 from .models import Rating
 
 
-def update_user_rating_stats(user):
-    """Recalculate and save user rating statistics."""
-    ratings = Rating.objects.filter(target_user=user)
-    count = ratings.count()
-    total_stars = ratings.aggregate(Sum("stars"))["stars__sum"] or 0
-    
-    user.rating_count = count
-    user.rating_sum = total_stars
-    user.save(update_fields=["rating_count", "rating_sum"])
+def apply_rating_delta(user_id, stars_delta: int, count_delta: int):
+    """Atomically add the deltas to a user's rating_sum and rating_count."""
+    if not stars_delta and not count_delta:
+        return
+    User.objects.filter(pk=user_id).update(
+        rating_sum=F("rating_sum") + stars_delta,
+        rating_count=F("rating_count") + count_delta,
+    )
+    # QuerySet.update() sends no signals: drop what User post_save would have
+    token_cache.invalidate_user(user_id)
+    item_response_cache.invalidate_owners([user_id])
+
+
+def _refresh_target_stats(instance):
+    """Keep an already-loaded target user in sync for the API response."""
+    if Rating.target_user.is_cached(instance):
+        try:
+            instance.target_user.refresh_from_db(fields=["rating_sum", "rating_count"])
+        except User.DoesNotExist:
+            pass
+
+
+@receiver(pre_save, sender=Rating)
+def rating_saving(sender, instance, **kwargs):
+    """Remember the stored target and stars so an edit can apply a delta."""
+    instance._previous_rating = None
+    if not instance._state.adding:
+        instance._previous_rating = (
+            Rating.objects.filter(pk=instance.pk)
+            .values_list("target_user_id", "stars")
+            .first()
+        )
 
 
 @receiver(post_save, sender=Rating)
 def rating_saved(sender, instance, created, **kwargs):
     """Update stats when a rating is created or updated."""
-    update_user_rating_stats(instance.target_user)
+    previous = getattr(instance, "_previous_rating", None)
+    if created or previous is None:
+        apply_rating_delta(instance.target_user_id, instance.stars, 1)
+    else:
+        old_target_id, old_stars = previous
+        if old_target_id == instance.target_user_id:
+            apply_rating_delta(instance.target_user_id, instance.stars - old_stars, 0)
+        else:
+            apply_rating_delta(old_target_id, -old_stars, -1)
+            apply_rating_delta(instance.target_user_id, instance.stars, 1)
+    _refresh_target_stats(instance)
 
 
 @receiver(post_delete, sender=Rating)
 def rating_deleted(sender, instance, **kwargs):
     """Update stats when a rating is deleted."""
-    update_user_rating_stats(instance.target_user)
+    apply_rating_delta(instance.target_user_id, -instance.stars, -1)
+    _refresh_target_stats(instance)
@@ -0,0 +1,96 @@
+"""
+Tests for incremental user rating stats and their reconciliation.
+Run with: python manage.py test ratings
+"""
+
+import uuid
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from bookings.models import Booking
+from items.models import Item
+from ratings.models import Rating
+from users.models import User
+
+
+class RatingStatsTests(TestCase):
+    """rating_sum/rating_count follow creates, edits and deletes."""
+
+    def setUp(self):
+        self.owner = self.create_user('owner', '2000000001')
+        self.borrower = self.create_user('borrower', '2000000002')
+        self.other = self.create_user('other', '2000000003')
+        self.item = Item.objects.create(
+            owner=self.owner,
+            title='Ladder',
+            category='Tools',
+            description='Test',
+            estimated_value=100,
+            deposit_amount=10,
+        )
+
+    def create_user(self, username, phone):
+        return User.objects.create_user(
+            id=uuid.uuid4(),
+            username=username,
+            email=f'{username}@test.com',
+            phone=phone
+        )
+
+    def rate(self, rater, target, stars):
+        booking = Booking.objects.create(
+            item=self.item,
+            owner=self.owner,
+            borrower=self.borrower,
+            start_date=date.today(),
+            return_by_date=date.today() + timedelta(days=3),
+        )
+        return Rating.objects.create(booking=booking, rater=rater, target_user=target, stars=stars)
+
+    def assertStats(self, user, rating_sum, rating_count):
+        user.refresh_from_db()
+        self.assertEqual((user.rating_sum, user.rating_count), (rating_sum, rating_count))
+
+    def test_create_adds_without_scanning_ratings(self):
+        self.rate(self.borrower, self.owner, 4)
+        rating = self.rate(self.borrower, self.owner, 5)
+
+        self.assertStats(self.owner, 9, 2)
+        # The in-memory target reflects the update for the API response
+        self.assertEqual(rating.target_user.rating_sum, 9)
+
+    def test_edit_applies_difference(self):
+        rating = self.rate(self.borrower, self.owner, 2)
+        rating.stars = 5
+        rating.save()
+        self.assertStats(self.owner, 5, 1)
+
+    def test_retarget_moves_stats(self):
+        rating = self.rate(self.borrower, self.owner, 3)
+        rating.target_user = self.other
+        rating.save()
+        self.assertStats(self.owner, 0, 0)
+        self.assertStats(self.other, 3, 1)
+
+    def test_delete_subtracts(self):
+        self.rate(self.borrower, self.owner, 4)
+        rating = self.rate(self.borrower, self.owner, 1)
+        rating.delete()
+        self.assertStats(self.owner, 4, 1)
+
+    def test_reconcile_fixes_drift(self):
+        self.rate(self.borrower, self.owner, 4)
+        self.rate(self.owner, self.borrower, 2)
+        User.objects.filter(pk=self.owner.pk).update(rating_sum=100, rating_count=7)
+        User.objects.filter(pk=self.other.pk).update(rating_sum=3, rating_count=1)
+
+        out = StringIO()
+        call_command('reconcile_rating_stats', stdout=out)
+
+        self.assertIn('2 user(s)', out.getvalue())
+        self.assertStats(self.owner, 4, 1)
+        self.assertStats(self.other, 0, 0)
+        self.assertStats(self.borrower, 2, 1)
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "corsheaders",
     "rest_framework",
     "users",
@@ -107,7 +108,9 @@ DATABASES = {
         "OPTIONS": {
             "sslmode": os.getenv("SUPABASE_DB_SSLMODE", "require"),
         },
-        "CONN_MAX_AGE": 600,  # Keep connections alive for 10 minutes
+        # Keep connections alive for 10 minutes under WSGI; the ASGI stream
+        # process sets DB_CONN_MAX_AGE=0 (see asgi.py)
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "600")),
         "CONN_HEALTH_CHECKS": True,  # Check connection health before use
     }
 }
@@ -151,8 +154,101 @@ SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "zHhSOVlj/BQ6paZTPtfKFz7P
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
+# Verified-token cache used by SupabaseAuthentication (per worker process).
+# Entries live until the token's exp, capped at MAX_TTL seconds so profile
+# changes made through another worker are picked up reasonably quickly.
+SUPABASE_AUTH_CACHE_SIZE = int(os.getenv("SUPABASE_AUTH_CACHE_SIZE", "1024"))
+SUPABASE_AUTH_CACHE_MAX_TTL = int(os.getenv("SUPABASE_AUTH_CACHE_MAX_TTL", "300"))
+
+# Shared Supabase client pool (see supabase_client.py), per worker process
+SUPABASE_HTTP_MAX_CONNECTIONS = int(os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", "20"))
+SUPABASE_HTTP_MAX_KEEPALIVE = int(os.getenv("SUPABASE_HTTP_MAX_KEEPALIVE", "10"))
+SUPABASE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_HTTP_KEEPALIVE_EXPIRY", "60"))
+SUPABASE_HTTP_TIMEOUT = float(os.getenv("SUPABASE_HTTP_TIMEOUT", "20"))
+
 # Firebase Cloud Messaging for push notifications
 FCM_SERVER_KEY = os.getenv("FCM_SERVER_KEY")
+FCM_URL = os.getenv("FCM_URL", "https://fcm.googleapis.com/fcm/send")
+FCM_BATCH_SIZE = int(os.getenv("FCM_BATCH_SIZE", "500"))  # legacy API allows up to 1000
+FCM_MAX_CONCURRENCY = int(os.getenv("FCM_MAX_CONCURRENCY", "8"))
+
+# Notification outbox dispatcher (notifications/outbox.py).
+# "inline" drains from a daemon thread in each web worker; set to "off" when
+# running `python manage.py dispatch_notifications` as a separate process.
+NOTIFICATION_OUTBOX_WORKER = os.getenv("NOTIFICATION_OUTBOX_WORKER", "inline")
+NOTIFICATION_OUTBOX_BATCH_SIZE = int(os.getenv("NOTIFICATION_OUTBOX_BATCH_SIZE", "50"))
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", "8"))
+NOTIFICATION_OUTBOX_POLL_INTERVAL = float(os.getenv("NOTIFICATION_OUTBOX_POLL_INTERVAL", "30"))
+# Notification retention (python manage.py prune_notifications): soft-deleted
+# rows go after DELETED_DAYS, read ones after READ_DAYS; unread are kept.
+# ARCHIVE copies pruned rows to notifications_archive, which keeps
+# ARCHIVE_MONTHS whole months (0 = forever).
+NOTIFICATION_RETENTION_DELETED_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DELETED_DAYS", "30"))
+NOTIFICATION_RETENTION_READ_DAYS = int(os.getenv("NOTIFICATION_RETENTION_READ_DAYS", "180"))
+NOTIFICATION_RETENTION_BATCH_SIZE = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "1000"))
+NOTIFICATION_RETENTION_ARCHIVE = os.getenv("NOTIFICATION_RETENTION_ARCHIVE", "False").lower() in ("true", "1", "yes")
+NOTIFICATION_ARCHIVE_MONTHS = int(os.getenv("NOTIFICATION_ARCHIVE_MONTHS", "12"))
+# Live notifications always go out over /api/notifications/stream/ (SSE,
+# served by the separate ASGI process; see asgi.py). "supabase" also inserts each one into the
+# notification_events table, which the shipped app subscribes to; switch to
+# "sse" only once clients use the stream.
+NOTIFICATION_REALTIME_BACKEND = os.getenv("NOTIFICATION_REALTIME_BACKEND", "supabase")
+NOTIFICATION_STREAM_HEARTBEAT = int(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", "15"))
+# Seconds the unread badge count may be served from the default cache
+NOTIFICATION_UNREAD_CACHE_TIMEOUT = int(os.getenv("NOTIFICATION_UNREAD_CACHE_TIMEOUT", "5"))
+
+# Booking codes (bookings/codes.py): the permutation key must never change
+# once codes are issued; each worker reserves BLOCK_SIZE codes per query.
+BOOKING_CODE_KEY = int(os.getenv("BOOKING_CODE_KEY", "24305"))
+BOOKING_CODE_BLOCK_SIZE = int(os.getenv("BOOKING_CODE_BLOCK_SIZE", "100"))
+
+# Object storage (storage.py): "supabase" or "local". The local backend
+# keeps each bucket under STORAGE_LOCAL_ROOT/<bucket>/ for offline runs.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+STORAGE_LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT", str(MEDIA_ROOT))
+STORAGE_LOCAL_BASE_URL = os.getenv("STORAGE_LOCAL_BASE_URL", "http://localhost:8000" + MEDIA_URL)
+
+# Storage deletion queue (item_images/deletion.py). "inline" drains from a
+# daemon thread in each web worker; set to "off" when running
+# `python manage.py drain_storage_deletions` as a separate process.
+STORAGE_DELETION_WORKER = os.getenv("STORAGE_DELETION_WORKER", "inline")
+STORAGE_DELETION_BATCH_SIZE = int(os.getenv("STORAGE_DELETION_BATCH_SIZE", "200"))
+STORAGE_DELETION_MAX_ATTEMPTS = int(os.getenv("STORAGE_DELETION_MAX_ATTEMPTS", "8"))
+STORAGE_DELETION_POLL_INTERVAL = float(os.getenv("STORAGE_DELETION_POLL_INTERVAL", "60"))
+
+# Item photo processing (item_images/processing.py). Uploads are re-encoded
+# as thumb/card/full variants; WebP falls back to JPEG if Pillow lacks it.
+ITEM_IMAGE_FORMAT = os.getenv("ITEM_IMAGE_FORMAT", "webp")
+ITEM_IMAGE_QUALITY = int(os.getenv("ITEM_IMAGE_QUALITY", "80"))
+ITEM_IMAGE_MAX_UPLOAD_BYTES = int(os.getenv("ITEM_IMAGE_MAX_UPLOAD_BYTES", str(15 * 1024 * 1024)))
+ITEM_IMAGE_MAX_PIXELS = int(os.getenv("ITEM_IMAGE_MAX_PIXELS", "40000000"))
+
+# Public item feed/detail response cache (items/cache.py). Set
+# ITEM_RESPONSE_CACHE_URL (redis://..., needs the redis package) to share
+# entries and invalidations across workers. Without it each worker would
+# only see its own invalidations, so responses are not cached unless
+# ITEM_RESPONSE_CACHE_LOCAL_TIMEOUT (seconds, e.g. for a single worker)
+# allows a per-process cache; ETag revalidation works either way.
+ITEM_RESPONSE_CACHE = "items"
+ITEM_RESPONSE_CACHE_URL = os.getenv("ITEM_RESPONSE_CACHE_URL", "")
+ITEM_RESPONSE_CACHE_TIMEOUT = int(os.getenv("ITEM_RESPONSE_CACHE_TIMEOUT", "300"))
+ITEM_RESPONSE_CACHE_LOCAL_TIMEOUT = int(os.getenv("ITEM_RESPONSE_CACHE_LOCAL_TIMEOUT", "0"))
+ITEM_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("ITEM_RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    ITEM_RESPONSE_CACHE: {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": ITEM_RESPONSE_CACHE_URL,
+        "KEY_PREFIX": "sellefli",
+    } if ITEM_RESPONSE_CACHE_URL else {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "item-responses",
+        "OPTIONS": {"MAX_ENTRIES": ITEM_RESPONSE_CACHE_MAX_ENTRIES},
+    },
+}
 
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
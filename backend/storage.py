@@ -0,0 +1,309 @@
+"""Object storage behind one small interface.
+
+Call sites ask ``get_storage(bucket)`` for a backend and never talk to
+Supabase directly. ``STORAGE_BACKEND`` picks the implementation:
+
+- ``"supabase"`` (default): Supabase Storage through the pooled service-role
+  client from ``supabase_client``.
+- ``"local"``: files under ``STORAGE_LOCAL_ROOT/<bucket>/`` (MEDIA_ROOT by
+  default), served from ``STORAGE_LOCAL_BASE_URL``. Needs no network, so
+  tests and ``manage.py benchmark_storage`` can run offline.
+
+Every backend supports:
+
+- ``put(path, content, content_type)``: ``content`` is bytes or a file
+  object. File objects are streamed, never read into memory in one piece.
+  ``overwrite=True`` replaces an existing object instead of failing.
+- ``read(path)``: the object's bytes.
+- ``delete(path)`` and ``delete_many(paths)``. ``delete_many`` removes up to
+  ``MAX_DELETE_BATCH`` paths per request.
+- ``public_url(path)`` and ``signed_url(path, expires_in)``.
+- ``path_from_url(url)``, the inverse of ``public_url``.
+- ``list(prefix)``, one page of the objects under a prefix, and
+  ``walk(prefix)``, every object below it, listed page by page.
+"""
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone as dt_timezone
+from io import BufferedReader, FileIO
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.utils.dateparse import parse_datetime
+
+from supabase_client import get_supabase_client
+
+# Supabase Storage accepts at most 1000 prefixes per remove request
+MAX_DELETE_BATCH = 1000
+COPY_CHUNK_SIZE = 1024 * 1024
+
+Content = Union[bytes, object]
+
+
+class StorageError(Exception):
+    """A storage request failed."""
+
+
+def _chunks(paths: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(paths), size):
+        yield paths[start:start + size]
+
+
+class StorageBackend:
+    """A single bucket. Subclasses implement the object operations."""
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+
+    def put(
+        self,
+        path: str,
+        content: Content,
+        content_type: str,
+        cache_control: Optional[str] = None,
+        overwrite: bool = False,
+    ) -> str:
+        """Store ``content`` at ``path``; returns ``path``."""
+        raise NotImplementedError
+
+    def read(self, path: str) -> bytes:
+        raise NotImplementedError
+
+    def delete(self, path: str) -> int:
+        return self.delete_many([path])
+
+    def delete_many(self, paths: Iterable[str]) -> int:
+        """Remove ``paths``; missing objects are ignored. Returns how many went."""
+        raise NotImplementedError
+
+    def public_url(self, path: str) -> str:
+        raise NotImplementedError
+
+    def signed_url(self, path: str, expires_in: int = 3600) -> str:
+        raise NotImplementedError
+
+    def list(self, prefix: str = "", limit: int = 1000, offset: int = 0) -> List[Dict]:
+        """One page of objects directly under ``prefix``, sorted by name.
+
+        Entries are ``{"name": ..., "is_dir": bool, "updated_at": datetime}``
+        (``updated_at`` is None for directories); directories are listed,
+        not descended into.
+        """
+        raise NotImplementedError
+
+    def walk(self, prefix: str = "", page_size: int = 1000) -> Iterator[Dict]:
+        """Every object below ``prefix``, depth first, with its ``path``.
+
+        Holds one listing page per directory level in memory, however
+        large the bucket is.
+        """
+        offset = 0
+        while True:
+            page = self.list(prefix, limit=page_size, offset=offset)
+            for entry in page:
+                path = f"{prefix}/{entry['name']}" if prefix else entry["name"]
+                if entry["is_dir"]:
+                    yield from self.walk(path, page_size)
+                else:
+                    yield {**entry, "path": path}
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    def path_from_url(self, url: str) -> Optional[str]:
+        """The object path behind a ``public_url``, or None for other URLs."""
+        base = self.public_url("")
+        if url and url.startswith(base) and len(url) > len(base):
+            return url[len(base):].split("?", 1)[0]
+        return None
+
+
+class SupabaseStorage(StorageBackend):
+    """A Supabase Storage bucket."""
+
+    def __init__(self, bucket: str, client):
+        super().__init__(bucket)
+        self._bucket = client.storage.from_(bucket)
+
+    def put(self, path, content, content_type, cache_control=None, overwrite=False):
+        options = {"content-type": content_type}
+        if cache_control:
+            options["cache-control"] = cache_control
+        if overwrite:
+            options["upsert"] = "true"
+        # storage3 streams BufferedReader/FileIO bodies and takes bytes as is
+        if hasattr(content, "temporary_file_path"):
+            content = open(content.temporary_file_path(), "rb")
+        elif not isinstance(content, (bytes, BufferedReader, FileIO)):
+            content.seek(0)
+            content = content.read()
+        try:
+            self._bucket.upload(path=path, file=content, file_options=options)
+        except Exception as exc:
+            raise StorageError(f"upload of {path} failed: {exc}") from exc
+        finally:
+            if isinstance(content, BufferedReader):
+                content.close()
+        return path
+
+    def read(self, path):
+        try:
+            return self._bucket.download(path)
+        except Exception as exc:
+            raise StorageError(f"download of {path} failed: {exc}") from exc
+
+    def delete_many(self, paths):
+        removed = 0
+        for batch in _chunks(list(dict.fromkeys(paths)), MAX_DELETE_BATCH):
+            try:
+                removed += len(self._bucket.remove(batch) or [])
+            except Exception as exc:
+                raise StorageError(f"remove of {len(batch)} object(s) failed: {exc}") from exc
+        return removed
+
+    def public_url(self, path):
+        return self._bucket.get_public_url(path)
+
+    def path_from_url(self, url):
+        # The SDK may append "?" to public URLs, so match on the bucket segment
+        marker = f"/{self.bucket}/"
+        if url and marker in url:
+            return url.split(marker, 1)[1].split("?", 1)[0] or None
+        return None
+
+    def signed_url(self, path, expires_in=3600):
+        try:
+            response = self._bucket.create_signed_url(path, expires_in)
+        except Exception as exc:
+            raise StorageError(f"signing {path} failed: {exc}") from exc
+        return response.get("signedURL") or response.get("signedUrl")
+
+    def list(self, prefix="", limit=1000, offset=0):
+        try:
+            rows = self._bucket.list(
+                prefix or None,
+                {"limit": limit, "offset": offset, "sortBy": {"column": "name", "order": "asc"}},
+            )
+        except Exception as exc:
+            raise StorageError(f"listing {prefix or '/'} failed: {exc}") from exc
+        # Folders come back without an id
+        return [
+            {
+                "name": row["name"],
+                "is_dir": row.get("id") is None,
+                "updated_at": parse_datetime(row["updated_at"]) if row.get("updated_at") else None,
+            }
+            for row in rows
+        ]
+
+
+class LocalStorage(StorageBackend):
+    """A directory on the local filesystem standing in for a bucket."""
+
+    def __init__(self, bucket: str, root=None, base_url: Optional[str] = None):
+        super().__init__(bucket)
+        root = root or getattr(settings, "STORAGE_LOCAL_ROOT", None) or settings.MEDIA_ROOT
+        self.root = (Path(root) / bucket).resolve()
+        base_url = base_url or getattr(settings, "STORAGE_LOCAL_BASE_URL", "http://localhost:8000/media/")
+        self.base_url = base_url.rstrip("/") + f"/{bucket}/"
+
+    def _file(self, path: str) -> Path:
+        target = (self.root / path).resolve()
+        if self.root not in target.parents:
+            raise StorageError(f"invalid object path: {path!r}")
+        return target
+
+    def put(self, path, content, content_type, cache_control=None, overwrite=False):
+        target = self._file(path)
+        if not overwrite and target.exists():
+            raise StorageError(f"{path} already exists")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write next to the target and rename, so readers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                if isinstance(content, bytes):
+                    out.write(content)
+                else:
+                    content.seek(0)
+                    shutil.copyfileobj(content, out, COPY_CHUNK_SIZE)
+            os.replace(tmp, target)
+        except OSError as exc:
+            Path(tmp).unlink(missing_ok=True)
+            raise StorageError(f"upload of {path} failed: {exc}") from exc
+        return path
+
+    def read(self, path):
+        try:
+            return self._file(path).read_bytes()
+        except OSError as exc:
+            raise StorageError(f"download of {path} failed: {exc}") from exc
+
+    def delete_many(self, paths):
+        removed = 0
+        for path in dict.fromkeys(paths):
+            try:
+                self._file(path).unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                raise StorageError(f"remove of {path} failed: {exc}") from exc
+        return removed
+
+    def public_url(self, path):
+        return self.base_url + path
+
+    def signed_url(self, path, expires_in=3600):
+        expires = int(time.time()) + expires_in
+        token = signing.dumps({"b": self.bucket, "p": path, "e": expires}, salt="storage")
+        return f"{self.public_url(path)}?{urlencode({'token': token})}"
+
+    def verify_signed(self, path: str, token: str) -> bool:
+        """Whether ``token`` (from ``signed_url``) grants access to ``path`` now."""
+        try:
+            data = signing.loads(token, salt="storage")
+        except signing.BadSignature:
+            return False
+        return data == {"b": self.bucket, "p": path, "e": data.get("e")} and data["e"] >= time.time()
+
+    def list(self, prefix="", limit=1000, offset=0):
+        directory = self._file(prefix) if prefix else self.root
+        try:
+            names = sorted(
+                entry for entry in os.listdir(directory) if not entry.startswith(".upload-")
+            )
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names[offset:offset + limit]:
+            entry = directory / name
+            is_dir = entry.is_dir()
+            entries.append({
+                "name": name,
+                "is_dir": is_dir,
+                "updated_at": None if is_dir else datetime.fromtimestamp(entry.stat().st_mtime, tz=dt_timezone.utc),
+            })
+        return entries
+
+
+def get_storage(bucket: str) -> Optional[StorageBackend]:
+    """Backend for ``bucket`` per STORAGE_BACKEND.
+
+    Returns None when the Supabase backend is selected but credentials are
+    missing, so callers can keep their own "misconfigured" responses.
+    """
+    backend = getattr(settings, "STORAGE_BACKEND", "supabase")
+    if backend == "local":
+        return LocalStorage(bucket)
+    if backend != "supabase":
+        raise StorageError(f"unknown STORAGE_BACKEND {backend!r}")
+    client = get_supabase_client()
+    if client is None:
+        return None
+    return SupabaseStorage(bucket, client)
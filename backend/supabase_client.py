@@ -0,0 +1,169 @@
+"""Process-wide Supabase client registry.
+
+Building a ``supabase.Client`` creates fresh HTTP connection pools for
+auth, storage and PostgREST, so creating one per request costs a TLS
+handshake on every call. This module builds each named client once per
+worker process, on first use, and shares one keep-alive ``httpx.Client``
+between its sub-clients.
+
+The shared ``"admin"`` client is the service-role client for storage and
+``auth.admin``; it only makes stateless calls.
+
+Signing in is not stateless: ``sign_in_with_password`` stores the user's
+session on the client and swaps its Authorization header, so a shared
+client would run later requests, on any thread, as the last user to log
+in. ``auth_client()`` therefore returns a fresh, lightweight GoTrue
+client per call. Only its keep-alive ``httpx.Client`` (``"auth"``) is
+shared.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+from django.conf import settings
+from supabase import Client, ClientOptions, create_client
+from supabase_auth import SyncGoTrueClient
+
+logger = logging.getLogger(__name__)
+
+ADMIN = "admin"
+AUTH = "auth"
+
+_lock = threading.Lock()
+_clients: Dict[str, Client] = {}
+_http_clients: Dict[str, httpx.Client] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+_pid: Optional[int] = None
+
+
+def _pool_settings() -> Dict[str, float]:
+    return {
+        "max_connections": getattr(settings, "SUPABASE_HTTP_MAX_CONNECTIONS", 20),
+        "max_keepalive_connections": getattr(settings, "SUPABASE_HTTP_MAX_KEEPALIVE", 10),
+        "keepalive_expiry": getattr(settings, "SUPABASE_HTTP_KEEPALIVE_EXPIRY", 60),
+        "timeout": getattr(settings, "SUPABASE_HTTP_TIMEOUT", 20),
+    }
+
+
+def _new_http_client() -> httpx.Client:
+    pool = _pool_settings()
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=pool["max_connections"],
+            max_keepalive_connections=pool["max_keepalive_connections"],
+            keepalive_expiry=pool["keepalive_expiry"],
+        ),
+        timeout=pool["timeout"],
+    )
+
+
+def _build(name: str, url: str, key: str) -> Client:
+    http_client = _new_http_client()
+    options = ClientOptions(
+        auto_refresh_token=False,
+        persist_session=False,
+        httpx_client=http_client,
+    )
+    client = create_client(url, key, options=options)
+    _http_clients[name] = http_client
+    logger.info(f"Built Supabase client '{name}' (pid {os.getpid()})")
+    return client
+
+
+def _reset_after_fork() -> None:
+    """Forget clients inherited from a parent process; caller holds the lock."""
+    global _pid
+    if _pid != os.getpid():
+        _clients.clear()
+        _http_clients.clear()
+        _stats.clear()
+        _pid = os.getpid()
+
+
+def get_supabase_client(name: str = ADMIN) -> Optional[Client]:
+    """Return the shared client ``name``, building it on first use.
+
+    Returns None when SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY is unset,
+    so callers can keep their own "misconfigured" responses.
+    """
+    url = settings.SUPABASE_URL
+    key = settings.SUPABASE_SERVICE_ROLE_KEY
+    if not url or not key:
+        return None
+
+    client = _clients.get(name) if _pid == os.getpid() else None
+    if client is None:
+        with _lock:
+            _reset_after_fork()
+            client = _clients.get(name)
+            if client is None:
+                client = _build(name, url, key)
+                _clients[name] = client
+                _stats[name] = {"created_at": time.time(), "uses": 0}
+    stats = _stats.get(name)
+    if stats is not None:
+        stats["uses"] += 1
+    return client
+
+
+def auth_client() -> Optional[SyncGoTrueClient]:
+    """A new session-holding GoTrue client for one sign-in, on the shared pool.
+
+    Returns None when SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY is unset.
+    """
+    url = settings.SUPABASE_URL
+    key = settings.SUPABASE_SERVICE_ROLE_KEY
+    if not url or not key:
+        return None
+
+    http_client = _http_clients.get(AUTH) if _pid == os.getpid() else None
+    if http_client is None:
+        with _lock:
+            _reset_after_fork()
+            http_client = _http_clients.get(AUTH)
+            if http_client is None:
+                http_client = _new_http_client()
+                _http_clients[AUTH] = http_client
+                _stats[AUTH] = {"created_at": time.time(), "uses": 0}
+    stats = _stats.get(AUTH)
+    if stats is not None:
+        stats["uses"] += 1
+    return SyncGoTrueClient(
+        url=f"{url.rstrip('/')}/auth/v1",
+        headers={"apiKey": key, "Authorization": f"Bearer {key}"},
+        auto_refresh_token=False,
+        persist_session=False,
+        http_client=http_client,
+    )
+
+
+def close_clients() -> None:
+    """Close every pooled connection and drop the cached clients."""
+    with _lock:
+        for http_client in _http_clients.values():
+            try:
+                http_client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Supabase HTTP client: {e}")
+        _clients.clear()
+        _http_clients.clear()
+        _stats.clear()
+
+
+def client_stats() -> Dict[str, object]:
+    """Pool configuration and per-client usage for the health endpoint."""
+    pool = _pool_settings()
+    clients = {}
+    for name, stats in list(_stats.items()):
+        clients[name] = {
+            "uses": int(stats["uses"]),
+            "age_seconds": int(time.time() - stats["created_at"]),
+        }
+    return {
+        "pid": os.getpid(),
+        "pool": pool,
+        "clients": clients,
+    }
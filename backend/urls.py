@@ -5,6 +5,9 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
 
+from supabase_client import client_stats
+from users.token_cache import token_cache
+
 
 def health_check(request):
     """Health check endpoint for Render."""
@@ -23,6 +26,8 @@ def health_check(request):
         "supabase_key_set": bool(supabase_key),
         "jwt_secret_set": bool(jwt_secret),
         "jwt_secret_length": len(jwt_secret) if jwt_secret else 0,
+        "supabase_clients": client_stats(),
+        "auth_token_cache": token_cache.stats(),
     })
 
 
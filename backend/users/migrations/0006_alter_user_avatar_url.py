@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_user_email"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="avatar_url",
+            field=models.URLField(blank=True, db_index=True, null=True),
+        ),
+    ]
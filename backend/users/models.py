@@ -40,7 +40,7 @@ class User(AbstractBaseUser, PermissionsMixin):
 	username = models.CharField(max_length=150, unique=True)
 	email = models.EmailField(unique=True, null=True, blank=True)
 	phone = models.CharField(max_length=20, unique=True, null=True, blank=True)
-	avatar_url = models.URLField(blank=True, null=True)
+	avatar_url = models.URLField(blank=True, null=True, db_index=True)
 	rating_sum = models.IntegerField(default=0)
 	rating_count = models.IntegerField(default=0)
 	is_active = models.BooleanField(default=True)
@@ -0,0 +1,13 @@
+"""Signals for users app."""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+from .token_cache import token_cache
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed_handler(sender, instance, **kwargs):
+    """Drop cached auth entries so the next request reloads the user."""
+    token_cache.invalidate_user(instance.pk)
@@ -0,0 +1,96 @@
+"""
+Tests for SupabaseAuthentication and its verified-token cache.
+Run with: python manage.py test users
+"""
+
+import time
+import uuid
+
+import jwt
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from users.authentication import SupabaseAuthentication
+from users.models import User
+from users.token_cache import TokenCache, token_cache
+
+JWT_SECRET = "test-secret"
+
+
+def make_token(user_id, exp_in=3600):
+    return jwt.encode(
+        {"sub": str(user_id), "exp": int(time.time()) + exp_in, "aud": "authenticated"},
+        JWT_SECRET,
+        algorithm="HS256",
+    )
+
+
+@override_settings(SUPABASE_JWT_SECRET=JWT_SECRET)
+class SupabaseAuthenticationCacheTests(TestCase):
+    """Verified tokens are served from the cache until invalidated."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(
+            id=uuid.uuid4(),
+            username='cacheuser',
+            email='cache@test.com',
+            phone='5555555555'
+        )
+
+    def authenticate(self, token):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return SupabaseAuthentication().authenticate(request)
+
+    def test_second_request_skips_user_query(self):
+        token = make_token(self.user.id)
+        user, _ = self.authenticate(token)
+        self.assertEqual(user.pk, self.user.pk)
+
+        with self.assertNumQueries(0):
+            cached_user, _ = self.authenticate(token)
+
+        self.assertEqual(cached_user.pk, self.user.pk)
+        self.assertEqual(token_cache.stats()['hits'], 1)
+        self.assertEqual(token_cache.stats()['misses'], 1)
+
+    def test_user_save_invalidates_entry(self):
+        token = make_token(self.user.id)
+        self.authenticate(token)
+
+        self.user.username = 'renamed'
+        self.user.save()
+
+        user, _ = self.authenticate(token)
+        self.assertEqual(user.username, 'renamed')
+
+    def test_invalid_signature_is_not_cached(self):
+        token = jwt.encode({"sub": str(self.user.id)}, "wrong", algorithm="HS256")
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+        self.assertEqual(token_cache.stats()['size'], 0)
+
+
+class TokenCacheTests(TestCase):
+    """LRU and expiry behaviour of TokenCache."""
+
+    def make_user(self):
+        return User(id=uuid.uuid4(), username=str(uuid.uuid4()))
+
+    def test_evicts_least_recently_used(self):
+        cache = TokenCache(max_size=2, max_ttl=60)
+        cache.set('a', {}, self.make_user())
+        cache.set('b', {}, self.make_user())
+        cache.get('a')
+        cache.set('c', {}, self.make_user())
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_entry_expires_with_token(self):
+        cache = TokenCache(max_size=10, max_ttl=60)
+        cache.set('a', {'exp': time.time() - 1}, self.make_user())
+        self.assertIsNone(cache.get('a'))
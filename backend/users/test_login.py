@@ -0,0 +1,67 @@
+"""
+Tests for the login endpoint's Supabase sign-in.
+Run with: python manage.py test users
+"""
+
+import json
+import uuid
+from unittest import mock
+
+import httpx
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+import supabase_client
+
+SERVICE_KEY = 'service-role-key'
+
+
+def gotrue_transport(requests):
+    def handler(request):
+        requests.append(request)
+        email = json.loads(request.content)['email']
+        return httpx.Response(200, json={
+            'access_token': f'jwt-for-{email}',
+            'refresh_token': 'refresh',
+            'token_type': 'bearer',
+            'expires_in': 3600,
+            'expires_at': 2000000000,
+            'user': {
+                'id': str(uuid.uuid4()),
+                'aud': 'authenticated',
+                'email': email,
+                'created_at': '2026-01-01T00:00:00Z',
+                'app_metadata': {},
+                'user_metadata': {},
+            },
+        })
+    return httpx.MockTransport(handler)
+
+
+@override_settings(SUPABASE_URL='https://project.supabase.test', SUPABASE_SERVICE_ROLE_KEY=SERVICE_KEY)
+class LoginTests(TestCase):
+    """Each sign-in gets its own session; no user's token leaks into the next call."""
+
+    def setUp(self):
+        supabase_client.close_clients()
+        self.addCleanup(supabase_client.close_clients)
+        self.requests = []
+        http_client = httpx.Client(transport=gotrue_transport(self.requests))
+        patcher = mock.patch('supabase_client._new_http_client', return_value=http_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, email):
+        return APIClient().post('/api/users/login/', {'email': email, 'password': 'secret'}, format='json')
+
+    def test_logins_do_not_share_session_state(self):
+        first = self.login('first@test.com')
+        second = self.login('second@test.com')
+
+        self.assertEqual(first.data['access_token'], 'jwt-for-first@test.com')
+        self.assertEqual(second.data['access_token'], 'jwt-for-second@test.com')
+        self.assertEqual(
+            [request.headers['Authorization'] for request in self.requests],
+            [f'Bearer {SERVICE_KEY}'] * 2,
+        )
+        self.assertEqual(supabase_client.client_stats()['clients']['auth']['uses'], 2)
@@ -0,0 +1,121 @@
+"""In-process cache of verified Supabase access tokens.
+
+Entries are keyed by the SHA-256 of the raw bearer token so the token
+itself never sits in memory longer than the request that carried it.
+Each entry keeps the verified claims and the resolved user until the
+token's ``exp`` (capped by ``SUPABASE_AUTH_CACHE_MAX_TTL``), and the
+least recently used entry is evicted once ``SUPABASE_AUTH_CACHE_SIZE``
+is reached.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+
+
+class TokenCache:
+    """Bounded, TTL-aware LRU cache of ``(claims, user)`` per token."""
+
+    def __init__(self, max_size: int = 1024, max_ttl: int = 300):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], Any]]" = OrderedDict()
+        self._user_keys: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Tuple[Dict[str, Any], Any]]:
+        """Return ``(claims, user)`` for a cached token, or None.
+
+        The user is a shallow copy so per-request mutations of
+        ``request.user`` never leak into other requests.
+        """
+        key = self.key_for(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims, user = entry
+            if expires_at <= now:
+                self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return claims, copy.copy(user)
+
+    def set(self, token: str, claims: Dict[str, Any], user) -> None:
+        """Cache verified claims and the resolved user for a token."""
+        if self.max_size <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.max_ttl
+        exp = claims.get("exp")
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+
+        key = self.key_for(token)
+        user_id = str(user.pk)
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (expires_at, claims, copy.copy(user))
+            self._user_keys.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id) -> None:
+        """Drop every cached token that resolved to ``user_id``."""
+        with self._lock:
+            for key in list(self._user_keys.get(str(user_id), ())):
+                self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _discard(self, key: str) -> None:
+        """Remove an entry; caller must hold the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = str(entry[2].pk)
+        keys = self._user_keys.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[user_id]
+
+
+token_cache = TokenCache(
+    max_size=getattr(settings, "SUPABASE_AUTH_CACHE_SIZE", 1024),
+    max_ttl=getattr(settings, "SUPABASE_AUTH_CACHE_MAX_TTL", 300),
+)
@@ -1,10 +1,9 @@
 """DRF views for users."""
-from django.conf import settings
-from supabase import create_client, Client
 from rest_framework import permissions, status, viewsets, views
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from supabase_client import ADMIN, auth_client, get_supabase_client
 from .models import User
 from .serializers import UserSerializer, UserPublicSerializer, UserRegistrationSerializer, UserLoginSerializer
 
@@ -24,20 +23,15 @@ class LoginView(views.APIView):
         email = serializer.validated_data['email']
         password = serializer.validated_data['password']
 
-        # Init Supabase Client
-        url = settings.SUPABASE_URL
-        key = settings.SUPABASE_SERVICE_ROLE_KEY # Ideally use ANON key for client-side ops proxying, but SERVICE is okay if careful 
-        # Actually for sign_in, we should use the CLIENT/ANON key usually, but here request is server-side.
-        # However, supabase-py client handles this.
-        
-        if not url or not key:
+        # A client of its own: signing in stores the session on the client.
+        # Only the underlying connection pool is shared.
+        auth = auth_client()
+        if auth is None:
              return Response({"error": "Configuration error"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        supabase: Client = create_client(url, key)
-
         try:
             # Login
-            response = supabase.auth.sign_in_with_password({
+            response = auth.sign_in_with_password({
                 "email": email,
                 "password": password
             })
@@ -83,18 +77,14 @@ class RegisterView(views.APIView):
         username = serializer.validated_data['username']
         phone = serializer.validated_data['phone']
 
-        # Init Supabase Admin Client
-        url = settings.SUPABASE_URL
-        key = settings.SUPABASE_SERVICE_ROLE_KEY
-        
-        if not url or not key:
+        # Shared Supabase Admin Client
+        supabase = get_supabase_client(ADMIN)
+        if supabase is None:
             return Response(
                 {"error": "Server configuration error: Missing Supabase credentials."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        supabase: Client = create_client(url, key)
-
         # 1. Create User in Supabase Auth
         try:
             # Create user with admin privileges (bypasses email confirm if desired, or sends it)